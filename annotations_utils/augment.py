@@ -0,0 +1,295 @@
+import os
+import sys
+import json
+import random
+import hashlib
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+import cv2
+import numpy as np
+
+from annotations_utils.label_transforms import format_labels, load_labels, rotate_labels, rotated_size, scale_pad_labels
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp', '.tiff')
+MANIFEST_NAME = '.augment_manifest.json'
+
+# Same variants the one-off scripts produced: rotate_img_ann.py, desfocar.py and resized_annotations.py
+DEFAULT_PIPELINE = [
+    {"suffix": "rotated_-90", "ops": [{"op": "rotate", "angle": -90}]},
+    {"suffix": "rotated_180", "ops": [{"op": "rotate", "angle": 180}]},
+    {"suffix": "rotated_-270", "ops": [{"op": "rotate", "angle": -270}]},
+    {"suffix": "blurred", "ops": [{"op": "blur", "kernel": [3, 43]}]},
+    {"suffix": "zoom_out", "ops": [{"op": "resize_pad", "size": [128, 128], "padded_size": [256, 256]}]},
+]
+
+
+def rotate(image, annotations, rng, angle):
+    """
+    Rotate counter-clockwise by angle degrees, expanding the canvas like PIL's rotate(angle, expand=True)
+
+    Boxes are replaced by the box enclosing their rotated corners.
+    """
+    size = image.shape[:2]
+    height, width = size
+    if angle % 90 == 0:
+        # Lossless for right angles
+        rotated = np.ascontiguousarray(np.rot90(image, int(angle // 90) % 4))
+    else:
+        new_height, new_width = rotated_size(size, angle)
+        matrix = cv2.getRotationMatrix2D((width / 2, height / 2), angle, 1.0)
+        matrix[0, 2] += new_width / 2 - width / 2
+        matrix[1, 2] += new_height / 2 - height / 2
+        rotated = cv2.warpAffine(image, matrix, (new_width, new_height), flags=cv2.INTER_LINEAR,
+                                 borderMode=cv2.BORDER_CONSTANT, borderValue=(0, 0, 0))
+
+    return rotated, rotate_labels(annotations, size, angle, new_size=rotated.shape[:2])
+
+
+def blur(image, annotations, rng, kernel=43):
+    """Box blur, kernel is a size or a [min, max] range sampled per image (odd sizes only)"""
+    if isinstance(kernel, (list, tuple)):
+        kernel = rng.choice(range(kernel[0] | 1, kernel[1] + 1, 2))
+    return cv2.blur(image, (int(kernel), int(kernel))), annotations
+
+
+def resize_pad(image, annotations, rng, size=(128, 128), padded_size=(256, 256)):
+    """Resize to size (height, width), then pad with black to padded_size, centered"""
+    resized_height, resized_width = size
+    padded_height, padded_width = padded_size
+    original_size = image.shape[:2]
+
+    resized = cv2.resize(image, (resized_width, resized_height), interpolation=cv2.INTER_LINEAR)
+    top, left = max(0, padded_height - resized_height) // 2, max(0, padded_width - resized_width) // 2
+    padded = cv2.copyMakeBorder(
+        resized,
+        top, max(0, padded_height - resized_height) - top,
+        left, max(0, padded_width - resized_width) - left,
+        cv2.BORDER_CONSTANT, value=(0, 0, 0),
+    )
+    return padded, scale_pad_labels(annotations, original_size, (resized_height, resized_width), padded.shape[:2])
+
+
+# op name -> fn(image, (N, 5) label array, rng, **params) returning (image, label array)
+OPS = {
+    'rotate': rotate,
+    'blur': blur,
+    'resize_pad': resize_pad,
+}
+
+
+def validate_pipeline(pipeline):
+    """Fail early on unknown ops or duplicated suffixes instead of inside the workers"""
+    suffixes = set()
+    for variant in pipeline:
+        suffix = variant.get('suffix')
+        if not suffix:
+            raise ValueError(f"Variant without a suffix: {variant}")
+        if suffix in suffixes:
+            raise ValueError(f"Duplicated suffix: {suffix}")
+        suffixes.add(suffix)
+        for step in variant.get('ops', []):
+            if step.get('op') not in OPS:
+                raise ValueError(f"Unknown op {step.get('op')!r} in variant {suffix}, expected one of {sorted(OPS)}")
+
+
+def variant_hash(variant):
+    """Changes whenever the ops or their parameters change, so the outputs are regenerated"""
+    return hashlib.sha1(json.dumps(variant['ops'], sort_keys=True).encode()).hexdigest()[:16]
+
+
+def write_atomic(path, data):
+    """Write bytes to a temporary file next to path and rename it, readers never see partial files"""
+    temp_path = f"{path}.tmp{os.getpid()}"
+    with open(temp_path, 'wb') as f:
+        f.write(data)
+    os.replace(temp_path, path)
+
+
+def augment_image(task):
+    """
+    Produce every out-of-date variant of one source image (runs in a worker process)
+
+    Returns:
+        dict: Manifest entries of the variants written, plus counters and errors
+    """
+    image_path, label_path, output_images_dir, output_labels_dir, pipeline, previous = task
+    name, ext = os.path.splitext(os.path.basename(image_path))
+    report = {'entries': {}, 'written': 0, 'skipped': 0, 'error': None}
+
+    try:
+        with open(image_path, 'rb') as f:
+            image_bytes = f.read()
+        label_bytes = b''
+        if label_path is not None:
+            with open(label_path, 'rb') as f:
+                label_bytes = f.read()
+        source_hash = hashlib.sha1(image_bytes + b'\0' + label_bytes).hexdigest()
+
+        image = None
+        annotations = load_labels(label_path) if label_path is not None else np.zeros((0, 5))
+        for variant in pipeline:
+            output_name = f"{name}_{variant['suffix']}"
+            output_image = os.path.join(output_images_dir, output_name + ext)
+            output_label = os.path.join(output_labels_dir, output_name + '.txt')
+            entry = {'source': source_hash, 'pipeline': variant_hash(variant)}
+
+            up_to_date = (
+                previous.get(output_name) == entry
+                and os.path.exists(output_image)
+                and (label_path is None or os.path.exists(output_label))
+            )
+            if up_to_date:
+                report['entries'][output_name] = entry
+                report['skipped'] += 1
+                continue
+
+            if image is None:
+                image = cv2.imdecode(np.frombuffer(image_bytes, dtype=np.uint8), cv2.IMREAD_COLOR)
+                if image is None:
+                    raise ValueError("not a readable image")
+
+            # Seeded by the content, so ranged parameters are reproducible
+            rng = random.Random(f"{source_hash}:{variant['suffix']}")
+            augmented, augmented_annotations = image, annotations
+            for step in variant['ops']:
+                params = {key: value for key, value in step.items() if key != 'op'}
+                augmented, augmented_annotations = OPS[step['op']](augmented, augmented_annotations, rng, **params)
+
+            ok, buffer = cv2.imencode(ext, augmented)
+            if not ok:
+                raise ValueError(f"could not encode {ext}")
+            write_atomic(output_image, buffer.tobytes())
+            if label_path is not None:
+                write_atomic(output_label, format_labels(augmented_annotations).encode())
+            report['entries'][output_name] = entry
+            report['written'] += 1
+    except Exception as e:
+        report['error'] = f"{image_path}: {e}"
+    return report
+
+
+def load_manifest(path):
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r') as f:
+        return json.load(f).get('outputs', {})
+
+
+def save_manifest(path, outputs):
+    write_atomic(path, json.dumps({'version': 1, 'outputs': outputs}, indent=1, sort_keys=True).encode())
+
+
+def augment_dataset(images_dir, labels_dir=None, output_images_dir=None, output_labels_dir=None,
+                    pipeline=None, workers=None, require_labels=True, force=False):
+    """
+    Apply every variant of the pipeline to every source image, in parallel
+
+    Sources are the images of images_dir that are not themselves outputs of
+    the pipeline. Outputs whose source content and variant definition are
+    unchanged since the last run (per the manifest kept in
+    output_images_dir) are skipped.
+
+    Args:
+        images_dir (str): Source images
+        labels_dir (str, optional): Source YOLO labels, defaults to images_dir
+        output_images_dir (str, optional): Defaults to images_dir
+        output_labels_dir (str, optional): Defaults to labels_dir
+        pipeline (list, optional): Variants ({"suffix": ..., "ops": [{"op": ..., **params}]}),
+            defaults to DEFAULT_PIPELINE
+        workers (int, optional): Worker processes, defaults to the number of cores
+        require_labels (bool): Skip images without a label file instead of augmenting the image alone
+        force (bool): Regenerate everything
+
+    Returns:
+        dict: Counts of written, skipped and failed outputs
+    """
+    pipeline = DEFAULT_PIPELINE if pipeline is None else pipeline
+    validate_pipeline(pipeline)
+    labels_dir = labels_dir or images_dir
+    output_images_dir = output_images_dir or images_dir
+    output_labels_dir = output_labels_dir or labels_dir
+    os.makedirs(output_images_dir, exist_ok=True)
+    os.makedirs(output_labels_dir, exist_ok=True)
+
+    manifest_path = os.path.join(output_images_dir, MANIFEST_NAME)
+    manifest = {} if force else load_manifest(manifest_path)
+
+    # Outputs written into the source folder are not augmented again
+    output_suffixes = tuple(f"_{variant['suffix']}" for variant in pipeline)
+    tasks = []
+    missing_labels = 0
+    for filename in sorted(os.listdir(images_dir)):
+        name, ext = os.path.splitext(filename)
+        if ext.lower() not in IMAGE_EXTENSIONS or name.endswith(output_suffixes):
+            continue
+        label_path = os.path.join(labels_dir, name + '.txt')
+        if not os.path.exists(label_path):
+            missing_labels += 1
+            if require_labels:
+                continue
+            label_path = None
+        previous = {
+            f"{name}_{variant['suffix']}": manifest.get(f"{name}_{variant['suffix']}")
+            for variant in pipeline
+        }
+        tasks.append((os.path.join(images_dir, filename), label_path, output_images_dir, output_labels_dir,
+                      pipeline, previous))
+
+    print(f"{len(tasks)} source images, {len(pipeline)} variants each"
+          + (f", {missing_labels} without labels" + (" skipped" if require_labels else "") if missing_labels else ""))
+
+    counts = {'written': 0, 'skipped': 0, 'failed': 0}
+    workers = max(1, min(workers or os.cpu_count() or 1, len(tasks) or 1))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        reports = executor.map(augment_image, tasks, chunksize=max(1, min(16, len(tasks) // (workers * 4) or 1)))
+        for done, report in enumerate(reports, 1):
+            manifest.update(report['entries'])
+            counts['written'] += report['written']
+            counts['skipped'] += report['skipped']
+            if report['error']:
+                counts['failed'] += 1
+                print(f"\nError processing {report['error']}")
+            # Checkpoint so an interrupted run does not redo finished images
+            if done % 200 == 0:
+                save_manifest(manifest_path, manifest)
+            print(f"{done} / {len(tasks)} images", end='\r')
+
+    save_manifest(manifest_path, manifest)
+    print(f"\n{counts['written']} outputs written, {counts['skipped']} up to date, {counts['failed']} images failed")
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate augmented copies of a YOLO dataset (rotations, blur, zoom out)")
+    parser.add_argument("images", help="Folder with the source images")
+    parser.add_argument("--labels", help="Folder with the source YOLO labels, defaults to the images folder")
+    parser.add_argument("--output-images", help="Defaults to the images folder")
+    parser.add_argument("--output-labels", help="Defaults to the labels folder")
+    parser.add_argument("--pipeline", help="JSON file with the variants, defaults to the built-in rotate/blur/zoom out set")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes, defaults to the number of cores")
+    parser.add_argument("--allow-unlabeled", action="store_true", help="Also augment images without a label file")
+    parser.add_argument("--force", action="store_true", help="Regenerate outputs even if they are up to date")
+    args = parser.parse_args()
+
+    pipeline = None
+    if args.pipeline:
+        with open(args.pipeline, 'r') as f:
+            pipeline = json.load(f)
+
+    counts = augment_dataset(
+        args.images,
+        labels_dir=args.labels,
+        output_images_dir=args.output_images,
+        output_labels_dir=args.output_labels,
+        pipeline=pipeline,
+        workers=args.workers,
+        require_labels=not args.allow_unlabeled,
+        force=args.force,
+    )
+    if counts['failed']:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
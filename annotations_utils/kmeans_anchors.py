@@ -1,8 +1,6 @@
 import yaml
 import numpy as np
 import os
-import matplotlib.pyplot as plt
-from sklearn.cluster import KMeans
 
 def debug_bounding_boxes(bboxes):
     """
@@ -32,6 +30,8 @@ def debug_bounding_boxes(bboxes):
     print(f"  Std:    {bboxes[:, 1].std()}")
     
     # Visualize distribution
+    import matplotlib.pyplot as plt
+
     plt.figure(figsize=(12, 5))
     
     # Width distribution
@@ -73,6 +73,8 @@ def generate_anchors(bboxes, num_anchors=9):
     # Ensure enough unique bounding boxes for clustering
     num_anchors = min(num_anchors, len(set(tuple(box) for box in bboxes)))
     
+    from sklearn.cluster import KMeans
+
     # Perform K-means on original scale (not normalized)
     kmeans = KMeans(
         n_clusters=num_anchors, 
@@ -166,5 +168,6 @@ def custom_anchor_generation(dataset_path):
         return None
 
 
-dataset_yaml_path = 'dataset.yaml'
-custom_anchor_generation(dataset_yaml_path)
\ No newline at end of file
+if __name__ == "__main__":
+    dataset_yaml_path = 'dataset.yaml'
+    custom_anchor_generation(dataset_yaml_path)
@@ -0,0 +1,332 @@
+import os
+import re
+import json
+import argparse
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import numpy as np
+import yaml
+
+from annotations_utils.label_transforms import CLASS, WIDTH, HEIGHT
+
+
+def find_label_files(labels_dirs):
+    label_files = []
+    for labels_dir in labels_dirs:
+        for root, _, files in os.walk(labels_dir):
+            label_files.extend(os.path.join(root, f) for f in files if f.endswith('.txt'))
+    return sorted(label_files)
+
+
+def _read_bytes(path):
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+def values_per_line(text):
+    """Number of whitespace-separated values on each non-empty line of a bytes buffer, vectorized"""
+    chars = np.frombuffer(text, dtype=np.uint8)
+    # Spaces, tabs, \r and \n (every byte up to 0x20) separate values, like str.split
+    space = chars <= 32
+    # A value starts at every non-space byte that follows a space, or at the start of the buffer
+    starts = np.flatnonzero(~space[1:] & space[:-1]) + 1
+    if chars.size and not space[0]:
+        starts = np.concatenate(([0], starts))
+    newlines = np.flatnonzero(chars == ord('\n'))
+    # Values before each newline, differenced into values per line (the last line may lack a newline)
+    counts = np.diff(np.searchsorted(starts, newlines), prepend=0, append=starts.size)
+    return counts[counts > 0]
+
+
+def load_dataset_labels(labels_dirs, workers=16):
+    """
+    Parse every YOLO label file under the folders into one (N, 5) array
+
+    The files are read concurrently and parsed in a single numpy pass once
+    every line is checked to hold exactly five values; otherwise it falls
+    back to parsing line by line (keeping the first five values of each
+    line), so a 4-value and a 6-value line never merge into shifted boxes.
+
+    Returns:
+        tuple: ((N, 5) array, number of label files)
+    """
+    label_files = find_label_files(labels_dirs)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        text = b"\n".join(executor.map(_read_bytes, label_files))
+
+    counts = values_per_line(text)
+    if (counts == 5).all():
+        values = np.fromstring(text, sep=' ') if counts.size else np.zeros(0)
+        # Fewer values means a token that is not a number, parse line by line to report it
+        if values.size == counts.size * 5:
+            return values.reshape(-1, 5), len(label_files)
+
+    rows = []
+    for line in text.decode().splitlines():
+        parts = line.split()
+        if len(parts) < 5:
+            if parts:
+                print(f"Skipping malformed label line: {line}")
+            continue
+        rows.append(parts[:5])
+    return np.array(rows, dtype=np.float64).reshape(-1, 5), len(label_files)
+
+
+def valid_boxes(labels):
+    """Rows with a width and height in (0, 1]"""
+    keep = (labels[:, WIDTH] > 0) & (labels[:, WIDTH] <= 1) & (labels[:, HEIGHT] > 0) & (labels[:, HEIGHT] <= 1)
+    return labels[keep]
+
+
+def class_statistics(labels, names=None, bins=20):
+    """
+    Box count, size percentiles and width/height histograms ([0, 1] in bins steps) per class
+
+    Returns:
+        dict: {class name: statistics}
+    """
+    names = names or {}
+    edges = np.linspace(0, 1, bins + 1)
+    classes = labels[:, CLASS].astype(np.int64)
+    statistics = {}
+    for class_id in np.unique(classes):
+        boxes = labels[classes == class_id]
+        widths, heights = boxes[:, WIDTH], boxes[:, HEIGHT]
+        statistics[names.get(int(class_id), str(class_id))] = {
+            'class_id': int(class_id),
+            'count': int(len(boxes)),
+            'width': {'mean': float(widths.mean()), **_percentiles(widths)},
+            'height': {'mean': float(heights.mean()), **_percentiles(heights)},
+            'width_histogram': np.histogram(widths, bins=edges)[0].tolist(),
+            'height_histogram': np.histogram(heights, bins=edges)[0].tolist(),
+        }
+    return statistics
+
+
+def _percentiles(values):
+    p5, p50, p95 = np.percentile(values, [5, 50, 95])
+    return {'p5': float(p5), 'p50': float(p50), 'p95': float(p95)}
+
+
+def wh_iou(boxes, anchors):
+    """(N, k) IoU of (N, 2) widths/heights against (k, 2) anchors, both aligned at the same corner"""
+    widths, heights = boxes[:, 0:1], boxes[:, 1:2]
+    intersection = np.minimum(widths, anchors[:, 0]) * np.minimum(heights, anchors[:, 1])
+    return intersection / (widths * heights + anchors[:, 0] * anchors[:, 1] - intersection)
+
+
+def quantize_boxes(boxes, grid=1e-3):
+    """
+    Collapse widths/heights onto a grid, counting the boxes of each cell
+
+    With the default 1/1000 grid (under a pixel at 640) there are at most a
+    million cells however large the dataset is, so clustering cost stops
+    growing with the number of boxes.
+
+    Returns:
+        tuple: ((M, 2) cell widths/heights, (M,) number of boxes per cell)
+    """
+    steps = int(round(1 / grid))
+    cells = np.clip(np.rint(boxes / grid), 1, steps).astype(np.int64)
+    occupied, counts = np.unique(cells[:, 0] * (steps + 1) + cells[:, 1], return_counts=True)
+    cells = np.stack((occupied // (steps + 1), occupied % (steps + 1)), axis=1) * grid
+    return cells, counts.astype(np.float64)
+
+
+def mean_best_iou(boxes, anchors, weights=None, chunk_size=1_000_000):
+    """(Weighted) average IoU of every box with its closest anchor, in chunks to bound memory"""
+    weights = np.ones(len(boxes)) if weights is None else weights
+    total = 0.0
+    for start in range(0, len(boxes), chunk_size):
+        best = wh_iou(boxes[start:start + chunk_size], anchors).max(axis=1)
+        total += best @ weights[start:start + chunk_size]
+    return total / weights.sum()
+
+
+def _init_anchors(boxes, weights, k, rng):
+    """k-means++ seeding with 1 - IoU as the distance"""
+    probabilities = weights / weights.sum()
+    anchors = [boxes[rng.choice(len(boxes), p=probabilities)]]
+    for _ in range(1, k):
+        distance = (1 - wh_iou(boxes, np.array(anchors)).max(axis=1)) * weights
+        total = distance.sum()
+        if total <= 0:
+            anchors.append(boxes[rng.choice(len(boxes), p=probabilities)])
+            continue
+        anchors.append(boxes[rng.choice(len(boxes), p=distance / total)])
+    return np.array(anchors, dtype=np.float64)
+
+
+def _cluster_sums(boxes, weights, assignment, k):
+    """Per-cluster total weight and weighted width/height sums"""
+    counts = np.bincount(assignment, weights=weights, minlength=k)
+    sums = np.stack((
+        np.bincount(assignment, weights=boxes[:, 0] * weights, minlength=k),
+        np.bincount(assignment, weights=boxes[:, 1] * weights, minlength=k),
+    ), axis=1)
+    return counts, sums
+
+
+def kmeans_iou(boxes, k=9, weights=None, max_iter=300, seed=0, batch_size=None, tol=1e-4):
+    """
+    k-means on box widths/heights with 1 - IoU as the distance
+
+    With batch_size (and more boxes than that) each step uses a random
+    mini-batch and moves the anchors by a per-anchor decaying learning rate,
+    like sklearn's MiniBatchKMeans; otherwise every step assigns all boxes
+    and moves each anchor to the mean of its cluster. Either way it stops
+    once no anchor moves by more than tol (anchors are normalized, dataset.yaml
+    keeps two decimals).
+
+    Args:
+        boxes (np.ndarray): (N, 2) widths/heights
+        k (int): Number of anchors
+        weights (np.ndarray, optional): (N,) box counts, see quantize_boxes
+
+    Returns:
+        tuple: ((k, 2) anchors sorted by area, weighted mean best IoU)
+    """
+    rng = np.random.default_rng(seed)
+    weights = np.ones(len(boxes)) if weights is None else weights
+    anchors = _init_anchors(boxes, weights, k, rng)
+
+    if batch_size and len(boxes) > batch_size:
+        cumulative = np.cumsum(weights)
+        seen = np.zeros(k)
+        for _ in range(max_iter):
+            # Boxes sampled in proportion to their weight, so every batch counts as unweighted
+            batch = boxes[np.searchsorted(cumulative, rng.random(batch_size) * cumulative[-1])]
+            counts, sums = _cluster_sums(batch, np.ones(len(batch)), wh_iou(batch, anchors).argmax(axis=1), k)
+            present = counts > 0
+            seen += counts
+            rate = (counts[present] / seen[present])[:, None]
+            previous = anchors.copy()
+            anchors[present] = (1 - rate) * anchors[present] + rate * sums[present] / counts[present, None]
+            if np.abs(anchors - previous).max() < tol:
+                break
+    else:
+        for _ in range(max_iter):
+            counts, sums = _cluster_sums(boxes, weights, wh_iou(boxes, anchors).argmax(axis=1), k)
+            present = counts > 0
+            previous = anchors.copy()
+            anchors[present] = sums[present] / counts[present, None]
+            if np.abs(anchors - previous).max() < tol:
+                break
+
+    anchors = anchors[np.argsort(anchors[:, 0] * anchors[:, 1])]
+    return anchors, mean_best_iou(boxes, anchors, weights)
+
+
+def _kmeans_restart(args):
+    boxes, weights, k, max_iter, seed, batch_size = args
+    return kmeans_iou(boxes, k=k, weights=weights, max_iter=max_iter, seed=seed, batch_size=batch_size)
+
+
+def cluster_anchors(boxes, k=9, restarts=8, max_iter=300, batch_size=None, workers=None, seed=0, grid=1e-3):
+    """
+    Best of several IoU k-means runs with different seeds, run on a process pool
+
+    Boxes are first quantized (see quantize_boxes) and clustered as weighted cells.
+
+    Args:
+        batch_size (int, optional): Mini-batch size, used when there are more occupied cells than that
+
+    Returns:
+        tuple: ((k, 2) anchors sorted by area, mean best IoU over the boxes)
+    """
+    cells, weights = quantize_boxes(boxes, grid)
+    k = min(k, len(cells))
+    if k == 0:
+        raise ValueError("No valid bounding boxes found")
+    tasks = [(cells, weights, k, max_iter, seed + restart, batch_size) for restart in range(restarts)]
+
+    workers = max(1, min(workers or os.cpu_count() or 1, restarts))
+    if workers == 1:
+        runs = list(map(_kmeans_restart, tasks))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            runs = list(executor.map(_kmeans_restart, tasks))
+    anchors, _ = max(runs, key=lambda run: run[1])
+    return anchors, mean_best_iou(boxes, anchors)
+
+
+def anchors_yaml(anchors):
+    """anchors: block in the format of dataset.yaml"""
+    return "anchors:\n" + "".join(f"  - [{w:.2f},{h:.2f}]\n" for w, h in anchors)
+
+
+def write_anchors(dataset_path, anchors):
+    """Replace (or append) the anchors: block of dataset.yaml, leaving the rest of the file untouched"""
+    with open(dataset_path, 'r') as f:
+        content = f.read()
+    block = anchors_yaml(anchors)
+    pattern = re.compile(r"^anchors:[^\n]*\n(?:[ \t]+-[^\n]*(?:\n|$))*", re.MULTILINE)
+    if pattern.search(content):
+        content = pattern.sub(lambda _: block, content, count=1)
+    else:
+        content = content.rstrip('\n') + "\n\n" + block
+    temp_path = f"{dataset_path}.tmp"
+    with open(temp_path, 'w') as f:
+        f.write(content)
+    os.replace(temp_path, dataset_path)
+
+
+def print_statistics(statistics):
+    print(f"{'class':<10}{'boxes':>8}{'w p5':>8}{'w p50':>8}{'w p95':>8}{'h p5':>8}{'h p50':>8}{'h p95':>8}")
+    for name, stats in statistics.items():
+        w, h = stats['width'], stats['height']
+        print(f"{name:<10}{stats['count']:>8}{w['p5']:>8.3f}{w['p50']:>8.3f}{w['p95']:>8.3f}"
+              f"{h['p5']:>8.3f}{h['p50']:>8.3f}{h['p95']:>8.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Label statistics and IoU k-means anchors of a YOLO dataset")
+    parser.add_argument("--data", default="dataset.yaml", help="Dataset YAML, for the class names and the train labels folder")
+    parser.add_argument("--labels", nargs='+', help="Label folders, defaults to the train labels of --data")
+    parser.add_argument("--anchors", type=int, default=9, help="Number of anchors")
+    parser.add_argument("--restarts", type=int, default=8, help="k-means runs with different seeds, the best is kept")
+    parser.add_argument("--max-iter", type=int, default=300)
+    parser.add_argument("--batch-size", type=int, default=16384,
+                        help="Mini-batch size, used when the boxes fall in more distinct size cells than that")
+    parser.add_argument("--workers", type=int, default=None, help="Processes for the restarts, defaults to the number of cores")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write the statistics and anchors to this JSON file")
+    parser.add_argument("--write", action="store_true", help="Replace the anchors: block of --data")
+    args = parser.parse_args()
+
+    names = {}
+    labels_dirs = args.labels
+    if os.path.exists(args.data):
+        with open(args.data, 'r') as f:
+            dataset_config = yaml.safe_load(f)
+        names = dict(enumerate(dataset_config.get('names', [])))
+        if not labels_dirs:
+            labels_dirs = [dataset_config['train'].replace('images', 'labels')]
+    if not labels_dirs:
+        parser.error("No label folders: pass --labels or a --data file with a train entry")
+
+    labels, files = load_dataset_labels(labels_dirs)
+    labels = valid_boxes(labels)
+    print(f"{len(labels)} boxes in {files} label files")
+    statistics = class_statistics(labels, names)
+    print_statistics(statistics)
+
+    boxes = labels[:, [WIDTH, HEIGHT]]
+    anchors, fitness = cluster_anchors(
+        boxes, k=args.anchors, restarts=max(1, args.restarts), max_iter=args.max_iter,
+        batch_size=args.batch_size, workers=args.workers, seed=args.seed,
+    )
+    print(f"\nMean best IoU: {fitness:.4f}\n")
+    print(anchors_yaml(anchors), end='')
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'boxes': int(len(labels)), 'files': files, 'classes': statistics,
+                       'anchors': anchors.round(4).tolist(), 'mean_best_iou': fitness}, f, indent=2)
+    if args.write:
+        write_anchors(args.data, anchors)
+        print(f"Anchors written to {args.data}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+import os
+
+import numpy as np
+
+# Columns of a label array: class, x center, y center, width, height (coordinates normalized to [0, 1])
+CLASS, X_CENTER, Y_CENTER, WIDTH, HEIGHT = range(5)
+
+
+def load_labels(path):
+    """
+    Read a YOLO label file into an (N, 5) float array
+
+    Returns:
+        np.ndarray: One row per box, (0, 5) for an empty or missing file
+    """
+    if not os.path.exists(path):
+        return np.zeros((0, 5))
+    with open(path, 'r') as f:
+        rows = [line.split()[:5] for line in f if line.strip()]
+    return np.array(rows, dtype=np.float64).reshape(-1, 5)
+
+
+def load_split(labels_dir):
+    """
+    Read every label file of a folder into one array
+
+    Returns:
+        tuple: (file names without extension, (M, 5) array of all boxes, boxes per file)
+    """
+    names = sorted(os.path.splitext(f)[0] for f in os.listdir(labels_dir) if f.endswith('.txt'))
+    arrays = [load_labels(os.path.join(labels_dir, name + '.txt')) for name in names]
+    counts = np.array([len(array) for array in arrays], dtype=np.int64)
+    labels = np.concatenate(arrays) if arrays else np.zeros((0, 5))
+    return names, labels, counts
+
+
+def split_labels(labels, counts):
+    """Inverse of the concatenation done by load_split: one array per file"""
+    return np.split(labels, np.cumsum(counts)[:-1]) if len(counts) else []
+
+
+def format_labels(labels):
+    """YOLO label file contents of an (N, 5) array"""
+    return "".join(
+        f"{int(cls)} {x_c:.6f} {y_c:.6f} {w:.6f} {h:.6f}\n" for cls, x_c, y_c, w, h in labels.tolist()
+    )
+
+
+def save_labels(path, labels):
+    with open(path, 'w') as f:
+        f.write(format_labels(labels))
+
+
+def to_corners(labels, size):
+    """(N, 5) normalized labels -> (N, 4, 2) pixel corners"""
+    height, width = size
+    x_c, y_c = labels[:, X_CENTER] * width, labels[:, Y_CENTER] * height
+    half_w, half_h = labels[:, WIDTH] * width / 2, labels[:, HEIGHT] * height / 2
+    signs = np.array([(-1, -1), (-1, 1), (1, -1), (1, 1)], dtype=np.float64)
+    centers = np.stack((x_c, y_c), axis=1)[:, None, :]
+    halves = np.stack((half_w, half_h), axis=1)[:, None, :]
+    return centers + signs[None] * halves
+
+
+def from_corners(classes, corners, size):
+    """(N, 4, 2) pixel corners -> (N, 5) normalized labels of the boxes enclosing them"""
+    height, width = size
+    minimum, maximum = corners.min(axis=1), corners.max(axis=1)
+    return np.column_stack((
+        classes,
+        (minimum[:, 0] + maximum[:, 0]) / 2 / width,
+        (minimum[:, 1] + maximum[:, 1]) / 2 / height,
+        (maximum[:, 0] - minimum[:, 0]) / width,
+        (maximum[:, 1] - minimum[:, 1]) / height,
+    ))
+
+
+def rotated_size(size, angle):
+    """(height, width) of the canvas after a rotation with expand, like PIL's rotate(angle, expand=True)"""
+    height, width = size
+    radians = np.radians(angle)
+    cos, sin = abs(np.cos(radians)), abs(np.sin(radians))
+    return int(round(width * sin + height * cos)), int(round(width * cos + height * sin))
+
+
+def rotate_labels(labels, size, angle, new_size=None):
+    """
+    Rotate boxes counter-clockwise by angle degrees around the image center, expanding the canvas
+
+    Each box is replaced by the box enclosing its rotated corners, clipped to
+    the new canvas.
+
+    Args:
+        labels (np.ndarray): (N, 5) labels of the original image
+        size (tuple): (height, width) of the original image
+        angle (float): Degrees, counter-clockwise like PIL and OpenCV
+        new_size (tuple, optional): (height, width) of the rotated image, defaults to rotated_size
+
+    Returns:
+        np.ndarray: (N, 5) labels normalized to the rotated image
+    """
+    height, width = size
+    new_height, new_width = new_size or rotated_size(size, angle)
+    if not len(labels):
+        return np.zeros((0, 5))
+
+    # Counter-clockwise on screen is clockwise in math coordinates because y points down
+    radians = np.radians(-angle)
+    rotation = np.array([[np.cos(radians), np.sin(radians)], [-np.sin(radians), np.cos(radians)]])
+    center = np.array([width / 2, height / 2])
+    new_center = np.array([new_width / 2, new_height / 2])
+
+    corners = (to_corners(labels, size) - center) @ rotation + new_center
+    corners[..., 0] = corners[..., 0].clip(0, new_width)
+    corners[..., 1] = corners[..., 1].clip(0, new_height)
+    return from_corners(labels[:, CLASS], corners, (new_height, new_width))
+
+
+def scale_pad_labels(labels, original_size, resized_size, padded_size):
+    """
+    Labels after resizing to resized_size and padding (centered) to padded_size, all (height, width)
+
+    Same result as adjust_annotations in resized_annotations.py, for every box at once.
+    """
+    orig_h, orig_w = original_size
+    resized_h, resized_w = resized_size
+    padded_h, padded_w = padded_size
+
+    scale = np.array([resized_w / padded_w, resized_h / padded_h])
+    offset = np.array([(padded_w - resized_w) / 2 / padded_w, (padded_h - resized_h) / 2 / padded_h])
+
+    adjusted = labels.astype(np.float64, copy=True)
+    adjusted[:, [X_CENTER, Y_CENTER]] = adjusted[:, [X_CENTER, Y_CENTER]] * scale + offset
+    adjusted[:, [WIDTH, HEIGHT]] = adjusted[:, [WIDTH, HEIGHT]] * scale
+    return adjusted
+
+
+def clip_labels(labels, min_size=0.0):
+    """
+    Clip boxes to the image and drop the ones left narrower or shorter than min_size (normalized)
+    """
+    x_min = (labels[:, X_CENTER] - labels[:, WIDTH] / 2).clip(0, 1)
+    y_min = (labels[:, Y_CENTER] - labels[:, HEIGHT] / 2).clip(0, 1)
+    x_max = (labels[:, X_CENTER] + labels[:, WIDTH] / 2).clip(0, 1)
+    y_max = (labels[:, Y_CENTER] + labels[:, HEIGHT] / 2).clip(0, 1)
+
+    clipped = np.column_stack((labels[:, CLASS], (x_min + x_max) / 2, (y_min + y_max) / 2, x_max - x_min, y_max - y_min))
+    keep = (clipped[:, WIDTH] > min_size) & (clipped[:, HEIGHT] > min_size)
+    return clipped[keep]
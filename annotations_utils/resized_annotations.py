@@ -1,6 +1,5 @@
 import os
 import cv2
-import albumentations as A
 
 # Função para ajustar as anotações após transformação
 def adjust_annotations(annotations, original_size, resized_size, padded_size):
@@ -46,70 +45,73 @@ def read_annotations(file_path):
             annotations.append((cls, x_c, y_c, w, h))
     return annotations
 
-# Configuração de transformações
-resize_height, resize_width = 128, 128
-padded_height, padded_width = 256, 256
-augmentation = A.Compose([
-    A.Resize(height=resize_height, width=resize_width),
-    A.PadIfNeeded(min_height=padded_height, min_width=padded_width, border_mode=cv2.BORDER_CONSTANT, value=(0, 0, 0)),
-])
-
-# Caminhos das pastas
-images_folder = r"C:\Users\anoca\Documents\GitHub\analogic-watch-detector\dataset\images\train"
-labels_folder = r"C:\Users\anoca\Documents\GitHub\analogic-watch-detector\dataset\labels\train"
-output_images_folder = r"C:\Users\anoca\Documents\GitHub\analogic-watch-detector\dataset\images\train"
-output_labels_folder = r"C:\Users\anoca\Documents\GitHub\analogic-watch-detector\dataset\labels\train"
-
-# Certificar-se de que as pastas de saída existem
-os.makedirs(output_images_folder, exist_ok=True)
-os.makedirs(output_labels_folder, exist_ok=True)
-
-# Processar todos os arquivos na pasta
-for image_filename in os.listdir(images_folder):
-    # Pular arquivos com "rotated" no nome
-    if "rotated" in image_filename:
-        print(f"Pulado: {image_filename} (contém 'rotated').")
-        continue
-
-    if image_filename.endswith((".jpg", ".png", ".jpeg")):  # Verifica formatos de imagem
-        image_path = os.path.join(images_folder, image_filename)
-        label_path = os.path.join(labels_folder, image_filename.replace(".jpg", ".txt").replace(".png", ".txt").replace(".jpeg", ".txt"))
-
-        # Verificar se o arquivo de anotações correspondente existe
-        if not os.path.exists(label_path):
-            print(f"Anotação não encontrada para {image_filename}, pulando.")
+if __name__ == "__main__":
+    import albumentations as A
+
+    # Configuração de transformações
+    resize_height, resize_width = 128, 128
+    padded_height, padded_width = 256, 256
+    augmentation = A.Compose([
+        A.Resize(height=resize_height, width=resize_width),
+        A.PadIfNeeded(min_height=padded_height, min_width=padded_width, border_mode=cv2.BORDER_CONSTANT, value=(0, 0, 0)),
+    ])
+
+    # Caminhos das pastas
+    images_folder = r"C:\Users\anoca\Documents\GitHub\analogic-watch-detector\dataset\images\train"
+    labels_folder = r"C:\Users\anoca\Documents\GitHub\analogic-watch-detector\dataset\labels\train"
+    output_images_folder = r"C:\Users\anoca\Documents\GitHub\analogic-watch-detector\dataset\images\train"
+    output_labels_folder = r"C:\Users\anoca\Documents\GitHub\analogic-watch-detector\dataset\labels\train"
+
+    # Certificar-se de que as pastas de saída existem
+    os.makedirs(output_images_folder, exist_ok=True)
+    os.makedirs(output_labels_folder, exist_ok=True)
+
+    # Processar todos os arquivos na pasta
+    for image_filename in os.listdir(images_folder):
+        # Pular arquivos com "rotated" no nome
+        if "rotated" in image_filename:
+            print(f"Pulado: {image_filename} (contém 'rotated').")
             continue
 
-        # Carregar a imagem e as anotações
-        image = cv2.imread(image_path)
-        original_size = image.shape[:2]  # (altura, largura)
-        annotations = read_annotations(label_path)
-
-        # Aplicar transformações
-        augmented = augmentation(image=image)
-        augmented_image = augmented["image"]
-
-        # Ajustar as anotações
-        new_annotations = adjust_annotations(
-            annotations,
-            original_size=(original_size[0], original_size[1]),
-            resized_size=(resize_height, resize_width),
-            padded_size=(padded_height, padded_width)
-        )
-
-        # Criar novo nome para a imagem e as anotações
-        base_name, ext = os.path.splitext(image_filename)
-        new_image_name = f"{base_name}_zoom_out{ext}"
-        new_label_name = f"{base_name}_zoom_out.txt"
-
-        # Salvar imagem transformada
-        output_image_path = os.path.join(output_images_folder, new_image_name)
-        cv2.imwrite(output_image_path, augmented_image)
-
-        # Salvar anotações transformadas
-        output_label_path = os.path.join(output_labels_folder, new_label_name)
-        with open(output_label_path, "w") as f:
-            for ann in new_annotations:
-                f.write(f"{ann[0]} {ann[1]:.6f} {ann[2]:.6f} {ann[3]:.6f} {ann[4]:.6f}\n")
-
-        print(f"Processado e salvo como: {new_image_name}")
+        if image_filename.endswith((".jpg", ".png", ".jpeg")):  # Verifica formatos de imagem
+            image_path = os.path.join(images_folder, image_filename)
+            label_path = os.path.join(labels_folder, image_filename.replace(".jpg", ".txt").replace(".png", ".txt").replace(".jpeg", ".txt"))
+
+            # Verificar se o arquivo de anotações correspondente existe
+            if not os.path.exists(label_path):
+                print(f"Anotação não encontrada para {image_filename}, pulando.")
+                continue
+
+            # Carregar a imagem e as anotações
+            image = cv2.imread(image_path)
+            original_size = image.shape[:2]  # (altura, largura)
+            annotations = read_annotations(label_path)
+
+            # Aplicar transformações
+            augmented = augmentation(image=image)
+            augmented_image = augmented["image"]
+
+            # Ajustar as anotações
+            new_annotations = adjust_annotations(
+                annotations,
+                original_size=(original_size[0], original_size[1]),
+                resized_size=(resize_height, resize_width),
+                padded_size=(padded_height, padded_width)
+            )
+
+            # Criar novo nome para a imagem e as anotações
+            base_name, ext = os.path.splitext(image_filename)
+            new_image_name = f"{base_name}_zoom_out{ext}"
+            new_label_name = f"{base_name}_zoom_out.txt"
+
+            # Salvar imagem transformada
+            output_image_path = os.path.join(output_images_folder, new_image_name)
+            cv2.imwrite(output_image_path, augmented_image)
+
+            # Salvar anotações transformadas
+            output_label_path = os.path.join(output_labels_folder, new_label_name)
+            with open(output_label_path, "w") as f:
+                for ann in new_annotations:
+                    f.write(f"{ann[0]} {ann[1]:.6f} {ann[2]:.6f} {ann[3]:.6f} {ann[4]:.6f}\n")
+
+            print(f"Processado e salvo como: {new_image_name}")
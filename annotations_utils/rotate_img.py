@@ -47,10 +47,10 @@ def rotate_images(input_dir, output_dir):
         except Exception as e:
             print(f"Erro ao processar {filename}: {e}")
 
-# Configurações
-input_directory = r"C:\Users\anoca\Documents\GitHub\analogic-watch-detector\dataset\images\train\novos\rodados"  # Substitua pelo diretório das imagens originais
-output_directory = r"C:\Users\anoca\Documents\GitHub\analogic-watch-detector\dataset\images\train\novos\rodados"  # Substitua pelo diretório de saída
-
-# Executar o script
-rotate_images(input_directory, output_directory)
+if __name__ == "__main__":
+    # Configurações
+    input_directory = r"C:\Users\anoca\Documents\GitHub\analogic-watch-detector\dataset\images\train\novos\rodados"  # Substitua pelo diretório das imagens originais
+    output_directory = r"C:\Users\anoca\Documents\GitHub\analogic-watch-detector\dataset\images\train\novos\rodados"  # Substitua pelo diretório de saída
 
+    # Executar o script
+    rotate_images(input_directory, output_directory)
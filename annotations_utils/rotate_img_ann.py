@@ -142,7 +142,8 @@ def rotate_images_and_annotations(input_dir, output_dir):
                 print(f"Erro ao processar {filename}: {e}")
 
 
-# Configurações
-input_directory = r"C:\Users\anoca\Downloads\Nova pasta"
-output_directory = r"C:\Users\anoca\Downloads\Nova pasta\rotated"
-rotate_images_and_annotations(input_directory, output_directory)
+if __name__ == "__main__":
+    # Configurações
+    input_directory = r"C:\Users\anoca\Downloads\Nova pasta"
+    output_directory = r"C:\Users\anoca\Downloads\Nova pasta\rotated"
+    rotate_images_and_annotations(input_directory, output_directory)
@@ -0,0 +1,230 @@
+import os
+import re
+import sys
+import hashlib
+import argparse
+
+from annotations_utils.augment import DEFAULT_PIPELINE, IMAGE_EXTENSIONS, MANIFEST_NAME, load_manifest
+from annotations_utils.voc_to_yolo import label_path_for
+
+SPLITS = ('train', 'val')
+
+# Augmented copies (watch12_rotated_-90, watch12_blurred, ...) belong with their original
+AUGMENTED_SUFFIX = re.compile(
+    r"(?:_rotated_-?\d+|" + "|".join(re.escape(f"_{variant['suffix']}") for variant in DEFAULT_PIPELINE) + r")+$"
+)
+
+
+def base_name(filename):
+    """Name of the original image an (augmented) image was made from"""
+    return AUGMENTED_SUFFIX.sub('', os.path.splitext(filename)[0])
+
+
+def find_augmented(names, manifest_path=None):
+    """
+    {augmented image name: name of its original} among the image names (without extension)
+
+    With an augment.py manifest, only the outputs it lists count as augmented
+    copies; without one, any name that strips to the name of another image
+    does. Either way the original must be one of the images, so a photo that
+    merely ends in _blurred is never taken for a copy.
+    """
+    outputs = load_manifest(manifest_path) if manifest_path else {}
+    names = set(names)
+    augmented = {}
+    for name in names:
+        original = base_name(name)
+        if original != name and original in names and (not outputs or name in outputs):
+            augmented[name] = original
+    return augmented
+
+
+def assign_split(name, val_ratio, salt=''):
+    """'val' or 'train' from a hash of the name, the same on every machine and every run"""
+    digest = hashlib.sha1(f"{salt}{name}".encode()).digest()
+    return 'val' if int.from_bytes(digest[:8], 'big') / 2**64 < val_ratio else 'train'
+
+
+def plan_split(images_dir, labels_dir=None, val_ratio=0.2, salt='', augmented_in_val=False, require_labels=True,
+               manifest_path=None):
+    """
+    Decide the split of every image, grouping augmented copies with their original
+
+    Augmented copies of validation images are left out of both splits unless
+    augmented_in_val, so no variant of a validation photo is trained on.
+    Copies are found with find_augmented, from the augment.py manifest
+    (defaults to the one in images_dir) when there is one.
+
+    Returns:
+        dict: {'train': [(image path, label path or None)], 'val': [...], 'excluded': [...]}
+    """
+    plan = {'train': [], 'val': [], 'excluded': []}
+    filenames = [f for f in sorted(os.listdir(images_dir)) if f.lower().endswith(IMAGE_EXTENSIONS)]
+    if manifest_path is None:
+        manifest_path = os.path.join(images_dir, MANIFEST_NAME)
+    augmented = find_augmented((os.path.splitext(f)[0] for f in filenames), manifest_path)
+
+    missing_labels = 0
+    for filename in filenames:
+        image_path = os.path.join(images_dir, filename)
+        label_path = label_path_for(image_path, images_dir, labels_dir)
+        if not os.path.exists(label_path):
+            missing_labels += 1
+            if require_labels:
+                continue
+            label_path = None
+
+        name = os.path.splitext(filename)[0]
+        split = assign_split(augmented.get(name, name), val_ratio, salt)
+        if split == 'val' and name in augmented and not augmented_in_val:
+            split = 'excluded'
+        plan[split].append((image_path, label_path))
+
+    if missing_labels:
+        print(f"{missing_labels} images without labels" + (" skipped" if require_labels else ""))
+    return plan
+
+
+def _same_link(link_path, source, link):
+    if not os.path.lexists(link_path):
+        return False
+    if link == 'symlink':
+        return os.path.islink(link_path) and os.readlink(link_path) == source
+    return not os.path.islink(link_path) and os.path.samefile(link_path, source)
+
+
+def link_file(source, link_path, link='hard'):
+    """
+    Hard link (or symlink) source at link_path, leaving an identical link in place
+
+    Hard links fall back to symlinks across filesystems.
+
+    Returns:
+        bool: True if a link was created
+    """
+    source = os.path.abspath(source)
+    if _same_link(link_path, source, link):
+        return False
+    if os.path.lexists(link_path):
+        os.remove(link_path)
+    if link == 'hard':
+        try:
+            os.link(source, link_path)
+            return True
+        except OSError:
+            pass
+    os.symlink(source, link_path)
+    return True
+
+
+def materialize_split(plan, output_dir, link='hard'):
+    """
+    Link the images and labels of each split under output_dir and write the YOLO list files
+
+    output_dir/images/<split> and output_dir/labels/<split> hold links only;
+    links of images that left a split are removed. output_dir/<split>.txt
+    lists one image path per line, which dataset.yaml can use as train/val.
+
+    Returns:
+        dict: {split: path of the list file}
+    """
+    list_files = {}
+    for split in SPLITS:
+        image_paths = []
+        if link == 'none':
+            image_paths = [os.path.abspath(image_path) for image_path, _ in plan[split]]
+        else:
+            images_out = os.path.join(output_dir, 'images', split)
+            labels_out = os.path.join(output_dir, 'labels', split)
+            os.makedirs(images_out, exist_ok=True)
+            os.makedirs(labels_out, exist_ok=True)
+
+            created = 0
+            wanted = {'images': set(), 'labels': set()}
+            for image_path, label_path in plan[split]:
+                image_link = os.path.join(images_out, os.path.basename(image_path))
+                created += link_file(image_path, image_link, link)
+                wanted['images'].add(os.path.basename(image_link))
+                if label_path is not None:
+                    label_link = os.path.join(labels_out, os.path.basename(label_path))
+                    created += link_file(label_path, label_link, link)
+                    wanted['labels'].add(os.path.basename(label_link))
+                image_paths.append(os.path.abspath(image_link))
+
+            removed = 0
+            for kind, folder in (('images', images_out), ('labels', labels_out)):
+                for filename in os.listdir(folder):
+                    if filename not in wanted[kind]:
+                        os.remove(os.path.join(folder, filename))
+                        removed += 1
+            print(f"{split}: {len(plan[split])} images, {created} links created, {removed} removed")
+
+        list_path = os.path.join(output_dir, f"{split}.txt")
+        temp_path = f"{list_path}.tmp"
+        with open(temp_path, 'w') as f:
+            f.writelines(f"{path}\n" for path in image_paths)
+        os.replace(temp_path, list_path)
+        list_files[split] = os.path.abspath(list_path)
+    return list_files
+
+
+def write_dataset_yaml(dataset_path, list_files):
+    """Point the train: and val: entries of dataset.yaml at the list files, keeping the rest of the file"""
+    with open(dataset_path, 'r') as f:
+        content = f.read()
+    for split, list_path in list_files.items():
+        line = f"{split}: {list_path}"
+        content, replaced = re.subn(rf"^{split}:.*$", lambda _: line, content, count=1, flags=re.MULTILINE)
+        if not replaced:
+            content = f"{line}\n" + content
+    temp_path = f"{dataset_path}.tmp"
+    with open(temp_path, 'w') as f:
+        f.write(content)
+    os.replace(temp_path, dataset_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Split a YOLO dataset into train/val by a stable hash of each image's name")
+    parser.add_argument("images", help="Folder with all the images")
+    parser.add_argument("--labels", help="Folder with the YOLO labels, defaults to the images folder with images/ swapped for labels/")
+    parser.add_argument("--output", default="dataset/splits", help="Where the linked split folders and list files go")
+    parser.add_argument("--val-ratio", type=float, default=0.2)
+    parser.add_argument("--salt", default="", help="Change it to draw a different (still stable) split")
+    parser.add_argument("--link", choices=('hard', 'symlink', 'none'), default='hard',
+                        help="How images are placed in the split folders; none only writes list files of the original paths")
+    parser.add_argument("--augmented-in-val", action="store_true",
+                        help="Keep augmented copies of validation images in val (by default they are left out)")
+    parser.add_argument("--augment-manifest",
+                        help="Manifest of augment.py listing the augmented copies, defaults to the one in the images folder")
+    parser.add_argument("--allow-unlabeled", action="store_true", help="Include images without a label file (as background)")
+    parser.add_argument("--data", help="Dataset YAML whose train:/val: entries are pointed at the list files")
+    args = parser.parse_args()
+
+    if not 0 <= args.val_ratio <= 1:
+        parser.error("--val-ratio must be between 0 and 1")
+
+    plan = plan_split(
+        args.images,
+        labels_dir=args.labels,
+        val_ratio=args.val_ratio,
+        salt=args.salt,
+        augmented_in_val=args.augmented_in_val,
+        require_labels=not args.allow_unlabeled,
+        manifest_path=args.augment_manifest,
+    )
+    if not plan['train'] and not plan['val']:
+        print(f"No labelled images found in {args.images}")
+        sys.exit(1)
+
+    list_files = materialize_split(plan, args.output, link=args.link)
+    print(f"train: {len(plan['train'])}, val: {len(plan['val'])}, "
+          f"augmented copies of val images left out: {len(plan['excluded'])}")
+    if args.data:
+        write_dataset_yaml(args.data, list_files)
+        print(f"{args.data} now points at {list_files['train']} and {list_files['val']}")
+    else:
+        print(f"train: {list_files['train']}\nval: {list_files['val']}")
+
+
+if __name__ == "__main__":
+    main()
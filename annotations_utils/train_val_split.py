@@ -37,11 +37,12 @@ def split_dataset(images_dir, labels_dir, val_images_dir, val_labels_dir, val_ra
 
     print(f"Divisão concluída! {len(val_images)} imagens movidas para validação.")
 
-# Exemplos de uso
-split_dataset(
-    images_dir="dataset/images/train",
-    labels_dir="dataset/labels/train",
-    val_images_dir="dataset/images/val",
-    val_labels_dir="dataset/labels/val",
-    val_ratio=0.2
-)
+if __name__ == "__main__":
+    # Exemplos de uso
+    split_dataset(
+        images_dir="dataset/images/train",
+        labels_dir="dataset/labels/train",
+        val_images_dir="dataset/images/val",
+        val_labels_dir="dataset/labels/val",
+        val_ratio=0.2
+    )
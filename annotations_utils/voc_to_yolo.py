@@ -0,0 +1,240 @@
+import os
+import sys
+import json
+import hashlib
+import argparse
+import xml.etree.ElementTree as ET
+from concurrent.futures import ProcessPoolExecutor
+
+import yaml
+
+from annotations_utils.xml_to_txt import class_mapping as DEFAULT_CLASS_MAPPING
+
+MANIFEST_NAME = '.voc_manifest.json'
+
+
+def load_class_mapping(dataset_path=None):
+    """
+    Class name -> id, from the names of dataset.yaml when given
+
+    The names the model is trained with win; a mismatch with the mapping of
+    xml_to_txt.py is reported because it means old conversions used other ids.
+    """
+    if not dataset_path or not os.path.exists(dataset_path):
+        return dict(DEFAULT_CLASS_MAPPING)
+
+    with open(dataset_path, 'r') as f:
+        names = yaml.safe_load(f).get('names', [])
+    if isinstance(names, dict):
+        mapping = {name: int(class_id) for class_id, name in names.items()}
+    else:
+        mapping = {name: class_id for class_id, name in enumerate(names)}
+    if mapping != DEFAULT_CLASS_MAPPING:
+        print(f"Warning: classes of {dataset_path} {mapping} differ from xml_to_txt.py {DEFAULT_CLASS_MAPPING}")
+    return mapping
+
+
+def parse_voc(xml_path):
+    """
+    Stream a Pascal VOC file, keeping only the image size and the objects
+
+    Returns:
+        tuple: (width, height, [(class name, xmin, ymin, xmax, ymax), ...])
+    """
+    width = height = None
+    objects = []
+    for _, element in ET.iterparse(xml_path, events=('end',)):
+        if element.tag == 'size':
+            width = float(element.findtext('width'))
+            height = float(element.findtext('height'))
+            element.clear()
+        elif element.tag == 'object':
+            box = element.find('bndbox')
+            objects.append((
+                (element.findtext('name') or '').strip(),
+                float(box.findtext('xmin')),
+                float(box.findtext('ymin')),
+                float(box.findtext('xmax')),
+                float(box.findtext('ymax')),
+            ))
+            # Done with this object, do not keep it in the tree
+            element.clear()
+    if not width or not height:
+        raise ValueError("missing or zero image size")
+    return width, height, objects
+
+
+def voc_to_yolo_lines(width, height, objects, class_mapping, skip_unknown=False):
+    """
+    YOLO label lines of the parsed objects, boxes clipped to the image
+
+    Raises:
+        ValueError: Unknown class names (unless skip_unknown) or empty boxes
+    """
+    unknown = sorted({name for name, *_ in objects if name not in class_mapping})
+    if unknown and not skip_unknown:
+        raise ValueError(f"unknown classes {unknown}, expected one of {list(class_mapping)}")
+
+    lines = []
+    for name, xmin, ymin, xmax, ymax in objects:
+        if name not in class_mapping:
+            continue
+        xmin, xmax = min(max(xmin, 0), width), min(max(xmax, 0), width)
+        ymin, ymax = min(max(ymin, 0), height), min(max(ymax, 0), height)
+        if xmax <= xmin or ymax <= ymin:
+            raise ValueError(f"empty box for {name}: {xmin, ymin, xmax, ymax}")
+
+        x_center = ((xmin + xmax) / 2) / width
+        y_center = ((ymin + ymax) / 2) / height
+        lines.append(f"{class_mapping[name]} {x_center:.6f} {y_center:.6f} "
+                     f"{(xmax - xmin) / width:.6f} {(ymax - ymin) / height:.6f}\n")
+    return lines
+
+
+def file_digest(path):
+    with open(path, 'rb') as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+def label_path_for(xml_path, input_root, output_root=None):
+    """
+    Where the labels of an XML go
+
+    Under output_root with the same relative path if given, otherwise next to
+    the XML with the last images/ folder of the path swapped for labels/
+    (dataset/images/train/x.xml -> dataset/labels/train/x.txt).
+    """
+    name = os.path.splitext(os.path.relpath(xml_path, input_root))[0] + '.txt'
+    if output_root:
+        return os.path.join(output_root, name)
+
+    parts = os.path.normpath(os.path.abspath(xml_path)).split(os.sep)
+    if 'images' in parts[:-1]:
+        index = len(parts) - 2 - parts[-2::-1].index('images')
+        parts[index] = 'labels'
+    return os.path.splitext(os.sep.join(parts))[0] + '.txt'
+
+
+def convert_file(task):
+    """Convert one XML (runs in a worker process), writing the labels atomically"""
+    xml_path, txt_path, class_mapping, skip_unknown = task
+    try:
+        width, height, objects = parse_voc(xml_path)
+        lines = voc_to_yolo_lines(width, height, objects, class_mapping, skip_unknown)
+        os.makedirs(os.path.dirname(txt_path) or '.', exist_ok=True)
+        temp_path = f"{txt_path}.tmp{os.getpid()}"
+        with open(temp_path, 'w') as f:
+            f.writelines(lines)
+        os.replace(temp_path, txt_path)
+        return xml_path, len(lines), None
+    except Exception as e:
+        return xml_path, 0, str(e)
+
+
+def convert_dataset(input_root, output_root=None, dataset_path='dataset.yaml', workers=None,
+                    force=False, skip_unknown=False):
+    """
+    Convert every Pascal VOC XML under input_root to YOLO labels, only redoing the ones that changed
+
+    A manifest in input_root records the mtime, size and hash of each XML
+    converted; an XML is reconverted only if its content changed (or its
+    labels file is gone), and everything is reconverted when the class
+    mapping changes.
+
+    Returns:
+        dict: Counts of converted, unchanged and failed files
+    """
+    class_mapping = load_class_mapping(dataset_path)
+    mapping_hash = hashlib.sha1(json.dumps(class_mapping, sort_keys=True).encode()).hexdigest()
+
+    manifest_path = os.path.join(input_root, MANIFEST_NAME)
+    manifest = {'class_mapping': mapping_hash, 'files': {}}
+    if os.path.exists(manifest_path) and not force:
+        with open(manifest_path, 'r') as f:
+            manifest = json.load(f)
+        if manifest.get('class_mapping') != mapping_hash:
+            print("Class mapping changed, reconverting everything")
+            manifest = {'class_mapping': mapping_hash, 'files': {}}
+    previous = manifest['files']
+
+    files = {}
+    tasks = []
+    unchanged = 0
+    for root, _, filenames in os.walk(input_root):
+        for filename in sorted(filenames):
+            if not filename.lower().endswith('.xml'):
+                continue
+            xml_path = os.path.join(root, filename)
+            key = os.path.relpath(xml_path, input_root).replace(os.sep, '/')
+            txt_path = label_path_for(xml_path, input_root, output_root)
+            stat = os.stat(xml_path)
+            entry = {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size, 'labels': txt_path}
+
+            known = previous.get(key)
+            if known and known.get('labels') == txt_path and os.path.exists(txt_path):
+                if (known['mtime_ns'], known['size']) == (entry['mtime_ns'], entry['size']):
+                    files[key] = known
+                    unchanged += 1
+                    continue
+                # Touched but maybe not edited: compare contents before reconverting
+                entry['sha1'] = file_digest(xml_path)
+                if known.get('sha1') == entry['sha1']:
+                    files[key] = entry
+                    unchanged += 1
+                    continue
+            files[key] = entry
+            tasks.append((xml_path, txt_path, class_mapping, skip_unknown))
+
+    print(f"{len(files)} XML files, {unchanged} unchanged, {len(tasks)} to convert")
+
+    counts = {'converted': 0, 'unchanged': unchanged, 'failed': 0}
+    if tasks:
+        workers = max(1, min(workers or os.cpu_count() or 1, len(tasks)))
+        chunksize = max(1, len(tasks) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for xml_path, boxes, error in executor.map(convert_file, tasks, chunksize=chunksize):
+                key = os.path.relpath(xml_path, input_root).replace(os.sep, '/')
+                if error:
+                    # Left out of the manifest so the next run retries it
+                    counts['failed'] += 1
+                    files.pop(key, None)
+                    print(f"Error processing {xml_path}: {error}")
+                    continue
+                files[key].setdefault('sha1', file_digest(xml_path))
+                counts['converted'] += 1
+
+    # Deleted XMLs drop out of the manifest, their labels are left alone
+    manifest = {'class_mapping': mapping_hash, 'files': files}
+    temp_path = f"{manifest_path}.tmp"
+    with open(temp_path, 'w') as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(temp_path, manifest_path)
+
+    print(f"{counts['converted']} converted, {counts['unchanged']} unchanged, {counts['failed']} failed")
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert Pascal VOC XML annotations (labelImg) to YOLO labels")
+    parser.add_argument("input", help="Folder (searched recursively) with the XML files, e.g. dataset/images")
+    parser.add_argument("--output", help="Labels root mirroring the input tree, defaults to swapping images/ for labels/")
+    parser.add_argument("--data", default="dataset.yaml", help="Dataset YAML whose names give the class ids")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes, defaults to the number of cores")
+    parser.add_argument("--force", action="store_true", help="Reconvert every XML")
+    parser.add_argument("--skip-unknown", action="store_true", help="Drop objects of unknown classes instead of failing the file")
+    args = parser.parse_args()
+
+    counts = convert_dataset(
+        args.input,
+        output_root=args.output,
+        dataset_path=args.data,
+        workers=args.workers,
+        force=args.force,
+        skip_unknown=args.skip_unknown,
+    )
+    if counts['failed']:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -41,19 +41,20 @@ def convert_xml_to_yolo(xml_file, output_file):
     with open(output_file, 'w') as f:
         f.write("\n".join(yolo_annotations))
 
-# Processar todos os arquivos XML no diretório
-for filename in os.listdir(input_dir):
-    if filename.endswith(".xml"):
-        xml_path = os.path.join(input_dir, filename)
-        txt_filename = os.path.splitext(filename)[0] + ".txt"
-        txt_path = os.path.join(input_dir, txt_filename)
-        
-        try:
-            convert_xml_to_yolo(xml_path, txt_path)
-            print(f"Convertido: {xml_path} -> {txt_path}")
-            
-            # Apagar o arquivo XML após a conversão
-            os.remove(xml_path)
-            print(f"Arquivo XML apagado: {xml_path}")
-        except Exception as e:
-            print(f"Erro ao processar {xml_path}: {e}")
+if __name__ == "__main__":
+    # Processar todos os arquivos XML no diretório
+    for filename in os.listdir(input_dir):
+        if filename.endswith(".xml"):
+            xml_path = os.path.join(input_dir, filename)
+            txt_filename = os.path.splitext(filename)[0] + ".txt"
+            txt_path = os.path.join(input_dir, txt_filename)
+
+            try:
+                convert_xml_to_yolo(xml_path, txt_path)
+                print(f"Convertido: {xml_path} -> {txt_path}")
+
+                # Apagar o arquivo XML após a conversão
+                os.remove(xml_path)
+                print(f"Arquivo XML apagado: {xml_path}")
+            except Exception as e:
+                print(f"Erro ao processar {xml_path}: {e}")
@@ -1,37 +1,182 @@
-from fastapi import FastAPI, File, UploadFile, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, File, UploadFile, HTTPException, Query, Request
+from fastapi.responses import JSONResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
-from PIL import Image
 import io
 import base64
 import cv2
 import numpy as np
-from pathlib import Path
-import tempfile
 import os
+import time
+import zipfile
+from typing import List, Optional
 import uvicorn
 # clock detection functions
-from utils.detections_utils import run_detection
-from utils.clock_utils import process_clock_time, draw_clock, get_box_center, calculate_angle
+from utils.detections_utils import average_confidence, run_batch_detection
+from utils.clock_utils import process_clock_time, process_clock_with_zoom, draw_clock, get_box_center, calculate_angle, best_detections_by_class
+from utils.clock_geometry import clock_times_from_detections
+from utils.model_registry import get_model
+from utils.inference_cache import configure_inference_cache
+from utils.batch_scheduler import MicroBatcher
+from utils.metrics import REGISTRY, CONTENT_TYPE
+from starlette.concurrency import run_in_threadpool
 
 app = FastAPI()
 
-def encode_image_to_base64(image_path):
+# Images stacked into one forward pass by the batch endpoint
+BATCH_SIZE = int(os.environ.get("BATCH_SIZE", 8))
+# Upper bound on images accepted by a single batch request
+MAX_BATCH_IMAGES = int(os.environ.get("MAX_BATCH_IMAGES", 64))
+# Upper bound on the (uncompressed) bytes of the images of a single batch request
+MAX_BATCH_BYTES = int(os.environ.get("MAX_BATCH_BYTES", 256 * 1024 * 1024))
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp')
+# Retry on a crop of the clock circle when the full image cannot be read (one extra inference)
+ZOOM_FALLBACK = os.environ.get("ZOOM_FALLBACK", "0").lower() in ("1", "true", "yes")
+# Classes process_clock_time cannot do without
+REQUIRED_CLASSES = ('hours', 'minutes', '12', 'circle')
+
+# Served in the Prometheus text format on /metrics
+REQUEST_SECONDS = REGISTRY.histogram(
+    "clock_api_request_seconds", "End-to-end request latency", ("endpoint", "status")
+)
+STAGE_SECONDS = REGISTRY.histogram(
+    "clock_api_stage_seconds", "Time spent per stage of /api/detect-time", ("stage",)
+)
+BATCH_SIZE_OBSERVED = REGISTRY.histogram(
+    "clock_api_inference_batch_size", "Images per micro-batched forward pass",
+    buckets=(1, 2, 4, 8, 16, 32, 64),
+)
+MISSING_CLASS_TOTAL = REGISTRY.counter(
+    "clock_api_missing_class_total", "Clock readings that failed because a required class was not detected", ("class_name",)
+)
+FALLBACK_TOTAL = REGISTRY.counter(
+    "clock_api_zoom_fallback_total", "Zoom fallback attempts by outcome", ("outcome",)
+)
+
+
+def observe_batch(batch_size, speeds, seconds):
+    """Record the model's own preprocess/inference/NMS split of every micro-batch"""
+    BATCH_SIZE_OBSERVED.observe(batch_size)
+    STAGE_SECONDS.observe(seconds, stage="batch_inference")
+    for speed in speeds:
+        for name, stage in (('preprocess', 'preprocess'), ('inference', 'inference'), ('postprocess', 'nms')):
+            if speed.get(name) is not None:
+                STAGE_SECONDS.observe(speed[name] / 1000, stage=stage)
+
+
+# Concurrent /api/detect-time requests are coalesced into batched inference
+batcher = MicroBatcher(
+    max_batch_size=int(os.environ.get("MICRO_BATCH_SIZE", 8)),
+    max_wait_ms=float(os.environ.get("MICRO_BATCH_WAIT_MS", 10)),
+    confidence=0.01,
+    observer=observe_batch,
+)
+
+@app.middleware("http")
+async def record_request_latency(request: Request, call_next):
+    started = time.perf_counter()
+    status = 500
     try:
-        with open(image_path, "rb") as image_file:
-            return base64.b64encode(image_file.read()).decode()
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        # Labelled by route template, not raw path, so the number of series stays bounded
+        route = request.scope.get("route")
+        endpoint = route.path if route is not None else "unmatched"
+        if endpoint != "/metrics":
+            REQUEST_SECONDS.observe(time.perf_counter() - started, endpoint=endpoint, status=status)
+
+@app.get("/metrics")
+async def metrics():
+    return Response(REGISTRY.render(), media_type=CONTENT_TYPE)
+
+@app.on_event("startup")
+async def load_model():
+    # Re-uploads of the same photo are answered from the inference cache
+    configure_inference_cache(
+        int(os.environ.get("INFERENCE_CACHE_SIZE", 512)),
+        os.environ.get("INFERENCE_CACHE_DIR") or None,
+    )
+    # Load and warm up the shared model once, before the first request
+    await run_in_threadpool(get_model)
+    await batcher.start()
+
+@app.on_event("shutdown")
+async def stop_batcher():
+    await batcher.stop()
+
+def encode_image_to_base64(image):
+    """JPEG-encode a BGR image in memory and return it as base64"""
+    try:
+        ok, buffer = cv2.imencode(".jpg", image)
+        if not ok:
+            print("Error encoding image: JPEG encoding failed")
+            return None
+        return base64.b64encode(buffer.tobytes()).decode()
     except Exception as e:
         print(f"Error encoding image: {e}")
         return None
 
-def draw_clock_visualization(image_path, detections_by_class, result, output_path):
-    """Helper function to generate clock visualization"""
+def decode_image(contents):
+    """Decode uploaded image bytes into a BGR array, None if not an image"""
+    buffer = np.frombuffer(contents, dtype=np.uint8)
+    if buffer.size == 0:
+        return None
+    return cv2.imdecode(buffer, cv2.IMREAD_COLOR)
+
+def check_batch_limits(image_count, total_bytes):
+    """Reject a batch request with 413 once it holds too many images or too many bytes"""
+    if image_count > MAX_BATCH_IMAGES:
+        message, technical_details = "Too many images", f"At most {MAX_BATCH_IMAGES} images per request"
+    elif total_bytes > MAX_BATCH_BYTES:
+        message, technical_details = "Images too large", f"At most {MAX_BATCH_BYTES} bytes of (uncompressed) images per request"
+    else:
+        return
+    raise HTTPException(
+        status_code=413,
+        detail={
+            "message": message,
+            "technical_details": technical_details
+        }
+    )
+
+async def read_batch_uploads(files):
+    """
+    Read uploads (plain images or zip archives) into (filename, bytes) pairs in memory
+
+    Zip members are counted and sized from the archive directory before any
+    of them is decompressed, so an oversized archive (or a zip bomb) is
+    rejected without inflating it.
+    """
+    uploads = []
+    total_bytes = 0
+    for upload in files:
+        contents = await upload.read()
+        if zipfile.is_zipfile(io.BytesIO(contents)):
+            with zipfile.ZipFile(io.BytesIO(contents)) as archive:
+                members = sorted(
+                    (
+                        member for member in archive.infolist()
+                        if member.filename.lower().endswith(IMAGE_EXTENSIONS)
+                        and not member.filename.startswith('__MACOSX/') and not member.is_dir()
+                    ),
+                    key=lambda member: member.filename,
+                )
+                # file_size also bounds what read() returns, a member cannot inflate past it
+                total_bytes += sum(member.file_size for member in members)
+                check_batch_limits(len(uploads) + len(members), total_bytes)
+                for member in members:
+                    uploads.append((os.path.basename(member.filename), archive.read(member)))
+        else:
+            total_bytes += len(contents)
+            check_batch_limits(len(uploads) + 1, total_bytes)
+            uploads.append((upload.filename, contents))
+    return uploads
+
+def draw_clock_visualization(image, detections_by_class, result):
+    """Helper function to generate clock visualization, returns the annotated copy or None"""
     try:
-        # Read the original image
-        img = cv2.imread(image_path)
-        if img is None:
-            print(f"Failed to read image at {image_path}")
-            return False
+        img = image.copy()
 
         circle_box_point = get_box_center(detections_by_class['circle']['box'])
         center_point = get_box_center(detections_by_class['center']['box']) if 'center' in detections_by_class else circle_box_point
@@ -68,40 +213,35 @@ def draw_clock_visualization(image_path, detections_by_class, result, output_pat
             time_str += f":{result['seconds']:02d}"
         cv2.putText(img, f"Time: {time_str}", (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 0), 2)
 
-        # Save the visualization
-        os.makedirs(os.path.dirname(output_path), exist_ok=True)
-        cv2.imwrite(output_path, img)
-        return os.path.exists(output_path)
+        return img
     except Exception as e:
         print(f"Error in draw_clock_visualization: {e}")
-        return False
+        return None
 
 @app.post("/api/detect-time")
 async def detect_time(file: UploadFile = File(...)):
     try:
-        # Create temporary directory for processing
-        temp_dir = tempfile.mkdtemp()
-
-        # Read and validate the uploaded image
+        # Read and decode the uploaded image in memory
         contents = await file.read()
-        image = Image.open(io.BytesIO(contents))
-
-        # Save to temporary file for processing
-        temp_path = os.path.join(temp_dir, "input.jpg")
-        image.save(temp_path)
-
-        # Create results directories
-        results_dir = os.path.join(temp_dir, "results")
-        os.makedirs(os.path.join(results_dir, "images"), exist_ok=True)
-        os.makedirs(os.path.join(results_dir, "image_detections"), exist_ok=True)
+        with STAGE_SECONDS.time(stage="decode"):
+            image = decode_image(contents)
+        if image is None:
+            raise HTTPException(
+                status_code=400,
+                detail={
+                    "message": "Invalid image",
+                    "technical_details": "The file could not be decoded as an image"
+                }
+            )
 
-        # Run detection
-        detections = run_detection(temp_path, confidence=0.01, 
-                                   save_path=os.path.join(results_dir, "detections.json"))
+        # Run detection, batched with any concurrent requests (includes the wait for the batch)
+        with STAGE_SECONDS.time(stage="detection"):
+            detections = await batcher.submit(image)
 
         # Process clock time
         try:
-            result = process_clock_time(detections, temp_path)
+            with STAGE_SECONDS.time(stage="postprocess"):
+                result = process_clock_time(detections, file.filename)
         except KeyError as e:
             raise HTTPException(
                 status_code=400, 
@@ -119,6 +259,21 @@ async def detect_time(file: UploadFile = File(...)):
                 }
             )
 
+        if not result:
+            detections_by_class = best_detections_by_class(detections[0])
+            for class_name in REQUIRED_CLASSES:
+                if class_name not in detections_by_class:
+                    MISSING_CLASS_TOTAL.inc(class_name=class_name)
+
+        if not result and ZOOM_FALLBACK:
+            with STAGE_SECONDS.time(stage="fallback"):
+                zoomed = await run_in_threadpool(process_clock_with_zoom, image, detections, 0.01)
+            if zoomed and zoomed[1]:
+                FALLBACK_TOTAL.inc(outcome="success")
+                detections, result, image = zoomed
+            else:
+                FALLBACK_TOTAL.inc(outcome="failure" if zoomed else "no_circle")
+
         if not result:
             raise HTTPException(
                 status_code=400, 
@@ -128,38 +283,20 @@ async def detect_time(file: UploadFile = File(...)):
                 }
             )
 
-        # Calculate confidence scores
-        confidence_scores = []
-        detection_classes = ['hours', 'minutes', 'seconds', 'center', '12']
-
-        for detection in detections[0]:
-            if detection['class_name'] in detection_classes:
-                confidence_scores.append(detection['confidence'])
-
         # Calculate average confidence
-        avg_confidence = sum(confidence_scores) / len(confidence_scores) if confidence_scores else 0
+        avg_confidence = average_confidence(detections)
 
         # Generate detection visualization
-        detections_by_class = {}
-        for detection in detections[0]:
-            class_name = detection['class_name']
-            if class_name not in detections_by_class or detection['confidence'] > detections_by_class[class_name]['confidence']:
-                detections_by_class[class_name] = detection
+        detections_by_class = best_detections_by_class(detections[0])
 
         detection_image = None
         if all(key in detections_by_class for key in ['hours', '12', 'circle']):
-            viz_path = os.path.join(results_dir, "images", "detection_viz.jpg")
-
             # Generate visualization using the new helper function
-            if draw_clock_visualization(temp_path, detections_by_class, result, viz_path):
-                detection_image = encode_image_to_base64(viz_path)
-
-        # Clean up temporary files
-        try:
-            import shutil
-            shutil.rmtree(temp_dir)
-        except Exception as e:
-            print(f"Error cleaning up temporary files: {e}")
+            with STAGE_SECONDS.time(stage="visualization"):
+                visualization = draw_clock_visualization(image, detections_by_class, result)
+            if visualization is not None:
+                with STAGE_SECONDS.time(stage="encoding"):
+                    detection_image = encode_image_to_base64(visualization)
 
         return JSONResponse({
             "time": {
@@ -171,6 +308,8 @@ async def detect_time(file: UploadFile = File(...)):
             "detectionImage": f"data:image/jpeg;base64,{detection_image}" if detection_image else None
         })
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500, 
@@ -180,7 +319,82 @@ async def detect_time(file: UploadFile = File(...)):
             }
     )
 
-    
+
+@app.post("/api/detect-time/batch")
+async def detect_time_batch(
+    files: List[UploadFile] = File(...),
+    batch_size: Optional[int] = Query(None, ge=1),
+):
+    """Detect the time on many images (multipart files and/or zip archives) in batched forward passes"""
+    try:
+        uploads = await read_batch_uploads(files)
+    except zipfile.BadZipFile as e:
+        raise HTTPException(
+            status_code=400,
+            detail={
+                "message": "Invalid zip archive",
+                "technical_details": str(e)
+            }
+        )
+
+    if not uploads:
+        raise HTTPException(
+            status_code=400,
+            detail={
+                "message": "No images provided",
+                "technical_details": "Upload image files or a zip archive of images"
+            }
+        )
+    try:
+        # Decode everything in memory, keeping track of undecodable uploads
+        responses = [{"filename": filename} for filename, _ in uploads]
+        images = []
+        image_indices = []
+        for index, (_, contents) in enumerate(uploads):
+            image = decode_image(contents)
+            if image is None:
+                responses[index]["error"] = {
+                    "message": "Invalid image",
+                    "technical_details": "The file could not be decoded as an image"
+                }
+                continue
+            images.append(image)
+            image_indices.append(index)
+
+        batch_detections = await run_in_threadpool(
+            run_batch_detection, images, confidence=0.01, batch_size=batch_size or BATCH_SIZE
+        )
+
+        # Post-process every image of the batch at once
+        batch_results = clock_times_from_detections(batch_detections)
+
+        for index, detections, result in zip(image_indices, batch_detections, batch_results):
+            if not result:
+                responses[index]["error"] = {
+                    "message": "It was not possible to process the clock time",
+                    "technical_details": "No clock elements detected"
+                }
+                continue
+
+            responses[index]["time"] = {
+                "hours": result['hours'],
+                "minutes": result.get('minutes', 0),
+                "seconds": result.get('seconds', 0)
+            }
+            responses[index]["confidence"] = average_confidence(detections)
+
+        return JSONResponse(responses)
+
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail={
+                "message": "Error processing images",
+                "technical_details": str(e)
+            }
+        )
+
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["http://localhost:5173"],  # URL do seu frontend React
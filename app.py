@@ -2,12 +2,21 @@ import os
 import tkinter as tk
 from tkinter import filedialog, messagebox, ttk
 from PIL import Image, ImageTk
-import csv
 import re
+import cv2
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from utils.detections_utils import run_detection
-from utils.clock_utils import draw_clock, get_box_center, calculate_angle, process_clock_with_fallback, process_clock_time
+from utils.clock_utils import draw_clock, get_box_center, calculate_angle, process_clock_with_zoom, process_clock_time, best_detections_by_class, format_predicted_time
+from utils.evaluation import time_deviation
+from utils.prediction_store import GroundTruthIndex, PredictionStore
 from ttkthemes import ThemedTk
 
+# Every image goes through the one shared model and its inference lock, so a
+# second thread only overlaps decoding, drawing and file I/O with inference
+FOLDER_WORKERS = 2
+
 class ClockDetectionApp:
     def __init__(self, master):
         self.master = master
@@ -55,10 +64,20 @@ class ClockDetectionApp:
         self.single_image_button.grid(row=0, column=0, padx=10, pady=5, sticky="e")
         self.folder_button = ttk.Button(button_frame, text="Select Folder", command=self.process_folder)
         self.folder_button.grid(row=0, column=1, padx=10, pady=5, sticky="w")
+        self.cancel_button = ttk.Button(button_frame, text="Cancel", command=self.cancel_folder, state=tk.DISABLED)
+        self.cancel_button.grid(row=0, column=2, padx=10, pady=5, sticky="w")
+
+        # Folder progress
+        self.progress_var = tk.DoubleVar(value=0)
+        self.progress_bar = ttk.Progressbar(button_frame, variable=self.progress_var, maximum=1)
+        self.progress_bar.grid(row=1, column=0, columnspan=3, sticky="ew", padx=10, pady=(5, 0))
+        self.progress_label = ttk.Label(button_frame, text="")
+        self.progress_label.grid(row=2, column=0, columnspan=3, pady=(2, 0))
 
         # Center the buttons using columnspan and rowspan
         button_frame.grid_columnconfigure(0, weight=1)
         button_frame.grid_columnconfigure(1, weight=1) 
+        button_frame.grid_columnconfigure(2, weight=1)
         button_frame.grid_rowconfigure(0, weight=1)  
 
         # Results section
@@ -97,7 +116,16 @@ class ClockDetectionApp:
         self.image_paths = []
         self.current_index = 0
         self.ground_truth_path = "ground_truths/ground_truths_test.csv"
+        self.ground_truths = GroundTruthIndex(self.ground_truth_path)
         self.loaded_predictions = {}
+        self.prediction_stores = {}
+
+        # Background folder processing state
+        self.executor = None
+        self.folder_futures = []
+        self.folder_results = queue.Queue()
+        self.cancel_event = threading.Event()
+        self.folder_done = 0
 
 
     def process_single_image(self):
@@ -136,20 +164,106 @@ class ClockDetectionApp:
             self.predictions = []  # Clear predictions for a new batch
             self.results_text.delete(1.0, tk.END)
 
-            # Process each image and store predictions
-            for image_path in self.image_paths:
-                self.process_image(image_path, append_results=True)
+            # Process the images off the Tk thread, results are streamed back by poll_folder_results
+            confidence = self.confidence_var.get()
+
+            self.cancel_event.clear()
+            self.folder_done = 0
+            self.folder_results = queue.Queue()
+            self.progress_bar.config(maximum=len(self.image_paths))
+            self.progress_var.set(0)
+            self.progress_label.config(text=f"0 / {len(self.image_paths)}")
+            self.set_processing_state(True)
+
+            self.executor = ThreadPoolExecutor(max_workers=FOLDER_WORKERS)
+            self.folder_futures = [
+                self.executor.submit(self.analyze_folder_image, image_path, confidence)
+                for image_path in self.image_paths
+            ]
+            self.master.after(100, self.poll_folder_results)
+
+    def analyze_folder_image(self, image_path, confidence):
+        """Worker-side wrapper around analyze_image that never raises and honours cancel"""
+        if self.cancel_event.is_set():
+            return
+        try:
+            analysis = self.analyze_image(image_path, confidence)
+        except Exception as e:
+            print(f"Error processing image {image_path}: {e}")
+            image_name = os.path.splitext(os.path.basename(image_path))[0]
+            analysis = {
+                'image_path': image_path,
+                'image_name': image_name,
+                'time_str': "failed",
+                'result_text': f"Image: {os.path.basename(image_path)}\nError: {e}\n" + "-" * 40 + "\n",
+                'detection_path': f'results/image_detections/{image_name}_detection.jpg',
+                'clock_path': None,
+            }
+        self.folder_results.put(analysis)
+
+    def poll_folder_results(self):
+        """Stream finished images into the results pane and finish the batch when all are done"""
+        while True:
+            try:
+                analysis = self.folder_results.get_nowait()
+            except queue.Empty:
+                break
+            self.folder_done += 1
+            self.predictions.append((analysis['image_name'], analysis['time_str']))
+            self.results_text.insert(tk.END, analysis['result_text'])
+            self.results_text.see(tk.END)
+
+        self.progress_var.set(self.folder_done)
+        self.progress_label.config(text=f"{self.folder_done} / {len(self.image_paths)}")
 
+        if all(future.done() for future in self.folder_futures) and self.folder_results.empty():
+            self.finish_folder()
+        else:
+            self.master.after(100, self.poll_folder_results)
+
+    def finish_folder(self):
+        self.executor.shutdown(wait=False)
+        self.executor = None
+        self.folder_futures = []
+        cancelled = self.cancel_event.is_set()
+        self.set_processing_state(False)
+
+        # Keep predictions in folder order, whatever order the workers finished in
+        order = {os.path.splitext(os.path.basename(p))[0]: i for i, p in enumerate(self.image_paths)}
+        self.predictions.sort(key=lambda prediction: order.get(prediction[0], len(order)))
+
+        if cancelled:
+            processed = {image_name for image_name, _ in self.predictions}
+            self.image_paths = [
+                p for p in self.image_paths
+                if os.path.splitext(os.path.basename(p))[0] in processed
+            ]
+            self.progress_label.config(text=f"Cancelled after {self.folder_done} images")
+
+        if self.image_paths:
             # Save all predictions after processing
             self.save_predictions()
-            self.load_predictions() 
+            self.load_predictions()
 
             # Set up scrolling functionality
             self.current_index = 0
             self.update_image_display()
             self.update_navigation_buttons()
 
-            self.predictions = []
+        self.predictions = []
+
+    def cancel_folder(self):
+        """Stop handing out new images; images already running finish normally"""
+        self.cancel_event.set()
+        for future in self.folder_futures:
+            future.cancel()
+        self.cancel_button.config(state=tk.DISABLED)
+
+    def set_processing_state(self, processing):
+        state = tk.DISABLED if processing else tk.NORMAL
+        self.single_image_button.config(state=state)
+        self.folder_button.config(state=state)
+        self.cancel_button.config(state=tk.NORMAL if processing else tk.DISABLED)
 
     def update_image_display(self):
         if not self.image_paths:
@@ -198,166 +312,170 @@ class ClockDetectionApp:
         confidence = self.confidence_var.get()
 
         try:
-            zoom = False
-            # Use the new fallback detection method
-            detections = run_detection(image_path, confidence=confidence)
+            analysis = self.analyze_image(image_path, confidence)
+            self.predictions.append((analysis['image_name'], analysis['time_str']))
+            self.show_analysis(analysis, append_results=append_results)
+        except Exception as e:
+            print(f"Error processing image: {e}")
+            messagebox.showerror("Error", f"An error occurred: {e}")
 
-            result = process_clock_time(detections, image_path)
-            
-            if result is None:
-                detections, result = process_clock_with_fallback(image_path, confidence)
-                print("Fallback detection method succeeded.") if result else print("Fallback detection method failed.")
-                zoom = True
-                
-            # Display results
-            
-            image_name = os.path.splitext(os.path.basename(image_path))[0]
-            result_text = f"Image: {os.path.basename(image_path)}\n"
-
-            if result:
-                if result['seconds'] is not None:
-                    time_str = f"{result['hours']:02d}:{result['minutes']:02d}:{result['seconds']:02d}"
-                    self.predictions.append((image_name, time_str))
-                if result['hours'] is not None and result['minutes'] is None:
-                    time_str = f"{result['hours']:02d}:00:00"
-                    self.predictions.append((image_name, time_str))
-                else:
-                    time_str = f"{result['hours']:02d}:{result['minutes']:02d}:00"
-                    self.predictions.append((image_name, time_str))
-                
-                # Find and calculate ground truth deviation
-                ground_truth = self.find_ground_truth(image_name)
-                deviation = self.calculate_time_deviation(time_str, ground_truth)
-                
-                # Add time and deviation to result text
-                result_text += f"Predicted Time: {time_str}\n"
-                if ground_truth:
-                    result_text += f"Ground Truth: {ground_truth}\n"
-                    if deviation is not None:
-                        result_text += f"Time Deviation: {deviation} seconds\n"
-                    else:
-                        result_text += "Time Deviation: Unable to calculate\n"
+    def analyze_image(self, image_path, confidence):
+        """
+        Run detection, fallback and clock drawing for one image without touching the UI,
+        so it can run on a worker thread.
+
+        Returns:
+            dict: Image name, predicted time, result text and the paths of the images to display
+        """
+        zoom = False
+        image_name = os.path.splitext(os.path.basename(image_path))[0]
+
+        # Decode once, the fallback crops from the same in-memory image
+        image = cv2.imread(image_path)
+        if image is None:
+            raise ValueError(f"Could not read image {image_path}")
+        detections = run_detection(image_path, confidence=confidence, image=image)
+
+        result = process_clock_time(detections, image_path)
+        drawing_image = image
+
+        if result is None:
+            # Reuse the full-image detections, only the circle crop is detected again
+            fallback = process_clock_with_zoom(
+                image, detections, confidence,
+                image_name=f"{image_name}_zoomed", save_visualization=True
+            )
+            if fallback:
+                detections, result, drawing_image = fallback
+            print("Fallback detection method succeeded.") if result else print("Fallback detection method failed.")
+            zoom = True
+
+        result_text = f"Image: {os.path.basename(image_path)}\n"
+
+        if result:
+            time_str = format_predicted_time(result)
+
+            # Find and calculate ground truth deviation
+            ground_truth = self.find_ground_truth(image_name)
+            deviation = self.calculate_time_deviation(time_str, ground_truth)
+
+            # Add time and deviation to result text
+            result_text += f"Predicted Time: {time_str}\n"
+            if ground_truth:
+                result_text += f"Ground Truth: {ground_truth}\n"
+                if deviation is not None:
+                    result_text += f"Time Deviation: {deviation} seconds\n"
                 else:
-                    result_text += "Ground Truth: Not found\n"
+                    result_text += "Time Deviation: Unable to calculate\n"
             else:
-                # If detection fails completely
-                time_str = "failed"
-                self.predictions.append((image_name, time_str))
-                result_text += "Time detection failed\n"
-            
-            result_text += "-" * 40 + "\n"
+                result_text += "Ground Truth: Not found\n"
+        else:
+            # If detection fails completely
+            time_str = "failed"
+            result_text += "Time detection failed\n"
 
-            if append_results:
-                self.results_text.insert(tk.END, result_text)
-            else:
-                self.results_text.delete(1.0, tk.END)
-                self.results_text.insert(tk.END, result_text)
+        result_text += "-" * 40 + "\n"
 
-            self.results_text.see(tk.END)
+        # Detection image written by run_detection
+        if zoom:
+            detection_path = f'results/image_detections/{image_name}_zoomed_detection.jpg'
+        else:
+            detection_path = f'results/image_detections/{image_name}_detection.jpg'
 
-            # Display the original image in the final image section
-            try:
-                original_pil_img = Image.open(image_path)
-                original_pil_img = original_pil_img.resize((215, 215), Image.LANCZOS)
-                original_photo = ImageTk.PhotoImage(original_pil_img)
-                self.original_image_label.config(image=original_photo, text="")
-                self.original_image_label.image = original_photo
-            except Exception as e:
-                print(f"Error displaying original image: {e}")
-                self.original_image_label.config(image='', text="Failed to load original image")
-
-            # Display the detection image, if it exists
-            if zoom:
-                # Regex para capturar 'watch_test' seguido de números
-                match = re.search(r'(watch_test\d+)', image_path)
-                if match:
-                    extracted_id = match.group(1)
-                detection_path = f'results/image_detections/{extracted_id}_zoomed_detection.jpg'
-            else:
-                detection_path = f'results/image_detections/{os.path.splitext(os.path.basename(image_path))[0]}_detection.jpg'
-                
-            if os.path.exists(detection_path):
-                try:
-                    detection_pil_img = Image.open(detection_path)
-                    detection_pil_img = detection_pil_img.resize((215, 215), Image.LANCZOS)
-                    detection_photo = ImageTk.PhotoImage(detection_pil_img)
-                    self.detection_image_label.config(image=detection_photo, text="")
-                    self.detection_image_label.image = detection_photo
-                except Exception as e:
-                    print(f"Error displaying detection image: {e}")
-                    self.detection_image_label.config(image='', text="Failed to load detection image")
+        # Draw clock visualization if detections exist
+        clock_path = None
+        try:
+            detections_by_class = best_detections_by_class(detections[0])
+
+            if result and all(key in detections_by_class for key in ['hours', '12', 'circle']):
+                # Calculate points
+                circle_box_point = get_box_center(detections_by_class['circle']['box'])
+                center_point = get_box_center(detections_by_class['center']['box']) if 'center' in detections_by_class else circle_box_point
+                hours_point = get_box_center(detections_by_class['hours']['box'])
+                number_12_point = get_box_center(detections_by_class['12']['box'])
+
+                # Prepare for drawing
+                seconds_point = get_box_center(detections_by_class['seconds']['box']) if 'seconds' in detections_by_class else None
+                minutes_point = get_box_center(detections_by_class['minutes']['box']) if 'minutes' in detections_by_class else None
+
+                # Calculate angles
+                hour_angle = calculate_angle(center_point, hours_point, number_12_point)
+                minute_angle = calculate_angle(center_point, minutes_point, number_12_point) if minutes_point else None
+                seconds_angle = calculate_angle(center_point, seconds_point, number_12_point) if seconds_point else None
+                # Draw the clock visualization
+                if zoom:
+                    clock_name = f"{image_name}_clock_zoomed.jpg"
+                else:
+                    clock_name = f"{image_name}_clock.jpg"
+                draw_clock(
+                    image_path,
+                    center_point,
+                    hours_point,
+                    minutes_point,
+                    seconds_point,
+                    number_12_point,
+                    hour_angle,
+                    minute_angle,
+                    seconds_angle,
+                    result['hours'],
+                    result.get('minutes', 0),
+                    result.get('seconds', 0),
+                    clock_name,
+                    image=drawing_image
+                )
+                clock_path = f'results/images/{clock_name}'
             else:
-                self.detection_image_label.config(image='', text="No Detection Image")
+                print("Missing detections required to draw clock.")
+        except Exception as e:
+            print(f"Error drawing clock: {e}")
+
+        return {
+            'image_path': image_path,
+            'image_name': image_name,
+            'time_str': time_str,
+            'result_text': result_text,
+            'detection_path': detection_path,
+            'clock_path': clock_path,
+        }
+
+    def show_analysis(self, analysis, append_results=False):
+        """Show the output of analyze_image in the results pane and image previews"""
+        if append_results:
+            self.results_text.insert(tk.END, analysis['result_text'])
+        else:
+            self.results_text.delete(1.0, tk.END)
+            self.results_text.insert(tk.END, analysis['result_text'])
 
-            # Draw clock visualization if detections exist
+        self.results_text.see(tk.END)
+
+        # Display the drawn clock, or the original image if none was drawn, in the final image section
+        final_path = analysis['clock_path']
+        if not final_path or not os.path.exists(final_path):
+            final_path = analysis['image_path']
+        try:
+            final_pil_img = Image.open(final_path)
+            final_pil_img = final_pil_img.resize((215, 215), Image.LANCZOS)
+            final_photo = ImageTk.PhotoImage(final_pil_img)
+            self.original_image_label.config(image=final_photo, text="")
+            self.original_image_label.image = final_photo
+        except Exception as e:
+            print(f"Error displaying original image: {e}")
+            self.original_image_label.config(image='', text="Failed to load original image")
+
+        # Display the detection image, if it exists
+        detection_path = analysis['detection_path']
+        if os.path.exists(detection_path):
             try:
-                detections_by_class = {}
-                for detection in detections[0]:
-                    class_name = detection['class_name']
-                    if class_name not in detections_by_class or detection['confidence'] > detections_by_class[class_name]['confidence']:
-                        detections_by_class[class_name] = detection
-
-                if all(key in detections_by_class for key in ['hours', '12', 'circle']):
-                    # Calculate points
-                    circle_box_point = get_box_center(detections_by_class['circle']['box'])
-                    center_point = get_box_center(detections_by_class['center']['box']) if 'center' in detections_by_class else circle_box_point
-                    hours_point = get_box_center(detections_by_class['hours']['box'])
-                    number_12_point = get_box_center(detections_by_class['12']['box'])
-
-                    # Prepare for drawing
-                    seconds_point = get_box_center(detections_by_class['seconds']['box']) if 'seconds' in detections_by_class else None
-                    minutes_point = get_box_center(detections_by_class['minutes']['box']) if 'minutes' in detections_by_class else None
-
-                    # Calculate angles
-                    hour_angle = calculate_angle(center_point, hours_point, number_12_point)
-                    minute_angle = calculate_angle(center_point, minutes_point, number_12_point) if minutes_point else None
-                    seconds_angle = calculate_angle(center_point, seconds_point, number_12_point) if seconds_point else None
-                    # Draw the clock visualization
-                    if zoom:
-                        p = f"{os.path.splitext(os.path.basename(image_path))[0]}_clock_zoomed.jpg"
-                    else:
-                        p = f"{os.path.splitext(os.path.basename(image_path))[0]}_clock.jpg"
-                    if zoom:
-                        image_path = f'results/zoomed_images/{os.path.splitext(os.path.basename(image_path))[0]}_zoomed.jpg'
-                    draw_clock(
-                        image_path, 
-                        center_point, 
-                        hours_point, 
-                        minutes_point, 
-                        seconds_point, 
-                        number_12_point, 
-                        hour_angle, 
-                        minute_angle, 
-                        seconds_angle, 
-                        result['hours'], 
-                        result.get('minutes', 0),
-                        result.get('seconds', 0),
-                        p
-                    )
-                    
-
-                    # Display the newly drawn clock image
-                    if zoom:
-                        # Regex para capturar 'watch_test' seguido de números
-                        match = re.search(r'(watch_test\d+)', image_path)
-                        if match:
-                            extracted_id = match.group(1)
-                        clock_final_path = f'results/images/{extracted_id}_clock_zoomed.jpg'
-                    else:
-                        clock_final_path = f'results/images/{os.path.splitext(os.path.basename(image_path))[0]}_clock.jpg'
-                    if os.path.exists(clock_final_path):
-                        final_pil_img = Image.open(clock_final_path)
-                        final_pil_img = final_pil_img.resize((215, 215), Image.LANCZOS)
-                        final_photo = ImageTk.PhotoImage(final_pil_img)
-                        self.original_image_label.config(image=final_photo, text="")
-                        self.original_image_label.image = final_photo
-                else:
-                    print("Missing detections required to draw clock.")
+                detection_pil_img = Image.open(detection_path)
+                detection_pil_img = detection_pil_img.resize((215, 215), Image.LANCZOS)
+                detection_photo = ImageTk.PhotoImage(detection_pil_img)
+                self.detection_image_label.config(image=detection_photo, text="")
+                self.detection_image_label.image = detection_photo
             except Exception as e:
-                print(f"Error drawing clock: {e}")
-        except Exception as e:
-            print(f"Error processing image: {e}")
-            messagebox.showerror("Error", f"An error occurred: {e}")
+                print(f"Error displaying detection image: {e}")
+                self.detection_image_label.config(image='', text="Failed to load detection image")
+        else:
+            self.detection_image_label.config(image='', text="No Detection Image")
 
 
     def show_previous_image(self):
@@ -378,48 +496,44 @@ class ClockDetectionApp:
         self.next_button.config(state=tk.NORMAL if self.current_index < len(self.image_paths) - 1 else tk.DISABLED)
         
 
-    def save_predictions(self):
-        # Get the custom CSV filename
+    def prediction_file(self):
+        """Path of the predictions CSV named in the UI, under results/files"""
         output_filename = self.csv_filename_var.get()
         if not output_filename.endswith('.csv'):
             output_filename += '.csv'
+        return os.path.join("results/files", output_filename)
+
+    def prediction_store(self):
+        """Indexed store of the current predictions CSV, opened once per file"""
+        output_file = self.prediction_file()
+        store = self.prediction_stores.get(output_file)
+        if store is None:
+            store = self.prediction_stores[output_file] = PredictionStore(output_file)
+        else:
+            store.reload_if_changed()
+        return store
 
-        # Define the output folder and file
-        output_folder = "results/files"
-        os.makedirs(output_folder, exist_ok=True)
-        output_file = os.path.join(output_folder, output_filename)
-
-        # Load existing predictions from the CSV file
-        existing_predictions = {}
-        if os.path.exists(output_file):
-            with open(output_file, mode='r', newline='') as csvfile:
-                csv_reader = csv.reader(csvfile)
-                next(csv_reader, None)  # Skip header
-                for row in csv_reader:
-                    if len(row) == 2:  # Ensure row has the correct format
-                        existing_predictions[row[0]] = row[1]
+    def save_predictions(self):
+        store = self.prediction_store()
 
         # Update existing predictions or add new ones
+        updates = {}
         for image_path, predicted_time in self.predictions:
             # Extract just the filename without extension
             image_name = os.path.splitext(os.path.basename(image_path))[0]
-            existing_predictions[image_name] = predicted_time
+            updates[image_name] = predicted_time
 
         # Add "Time detection failed" cases to the CSV
         for image_path in self.image_paths:
             # Extract just the filename without extension
             image_name = os.path.splitext(os.path.basename(image_path))[0]
-            if image_name not in existing_predictions:
-                existing_predictions[image_name] = "failed"
+            if image_name not in updates and image_name not in store:
+                updates[image_name] = "failed"
 
-        # Write the updated predictions back to the CSV file
+        # Only new or changed rows are appended to the file
         try:
-            with open(output_file, mode='w', newline='') as csvfile:
-                csv_writer = csv.writer(csvfile)
-                csv_writer.writerow(["Image Name", "Predicted Time"])
-                for image_name, predicted_time in existing_predictions.items():
-                    csv_writer.writerow([image_name, predicted_time])
-            messagebox.showinfo("Success", f"Predictions saved to {output_file}")
+            store.update(updates.items())
+            messagebox.showinfo("Success", f"Predictions saved to {store.path}")
         except Exception as e:
             messagebox.showerror("Error", f"Failed to save predictions: {e}")
             
@@ -427,36 +541,15 @@ class ClockDetectionApp:
         """
         Calculate the absolute time difference in seconds between predicted and ground truth times.
         """
-        if predicted_time == "failed" or ground_truth_time is None:
-            return None
-        
-        try:
-            # Split times into hours, minutes, seconds
-            pred_parts = predicted_time.split(':')
-            truth_parts = ground_truth_time.split(':')
-            
-            # Convert to total seconds
-            pred_seconds = int(pred_parts[0]) * 3600 + int(pred_parts[1]) * 60 + (int(pred_parts[2]) if len(pred_parts) > 2 else 0)
-            truth_seconds = int(truth_parts[0]) * 3600 + int(truth_parts[1]) * 60 + (int(truth_parts[2]) if len(truth_parts) > 2 else 0)
-            
-            # Calculate absolute deviation
-            return abs(pred_seconds - truth_seconds)
-        except (ValueError, IndexError):
-            return None
+        return time_deviation(predicted_time, ground_truth_time)
 
     # Modified method to find ground truth for an image
     def find_ground_truth(self, image_name):
         """
-        Search for ground truth time for a given image name in the ground truth CSV.
+        Look up the ground truth time of an image (the CSV is indexed once and re-read only when it changes).
         """
         try:
-            with open(self.ground_truth_path, mode='r') as file:
-                csv_reader = csv.reader(file)
-                for row in csv_reader:
-                    if row[0] == image_name:
-                        return row[1]
-        except FileNotFoundError:
-            print(f"Ground truth file {self.ground_truth_path} not found.")
+            return self.ground_truths.get(image_name)
         except Exception as e:
             print(f"Error reading ground truth file: {e}")
         return None
@@ -465,25 +558,12 @@ class ClockDetectionApp:
         """
         Load predictions from the CSV file into memory.
         """
-        output_filename = self.csv_filename_var.get()
-        if not output_filename.endswith('.csv'):
-            output_filename += '.csv'
-
-        output_folder = "results/files"
-        output_file = os.path.join(output_folder, output_filename)
-
         self.loaded_predictions.clear()
-        if os.path.exists(output_file):
-            try:
-                with open(output_file, mode='r', newline='') as csvfile:
-                    csv_reader = csv.reader(csvfile)
-                    next(csv_reader, None)  # Skip header
-                    for row in csv_reader:
-                        if len(row) == 2:
-                            self.loaded_predictions[row[0]] = row[1]
-            except Exception as e:
-                print(f"Error loading predictions: {e}")
-                
+        try:
+            self.loaded_predictions.update(self.prediction_store().items())
+        except Exception as e:
+            print(f"Error loading predictions: {e}")
+
     def display_image(self, image_path):
         try:
             # Define clock image path
@@ -537,6 +617,7 @@ class ClockDetectionApp:
             self.ground_truth_path_var.set(ground_truth_path)
             # Also update the ground_truth_path attribute
             self.ground_truth_path = ground_truth_path
+            self.ground_truths.path = ground_truth_path
     
     
 
@@ -0,0 +1,164 @@
+import os
+import re
+import sys
+import glob
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import cv2
+
+from utils.evaluation import IMAGE_EXTENSIONS, predict_image_time
+from utils.model_registry import get_model, resolve_backend, resolve_model_path
+from utils.onnx_backend import export_onnx
+from utils.prediction_store import PredictionStore
+
+# Set in each worker process by init_worker
+_WORKER_MODEL = None
+_WORKER_CONFIDENCE = 0.01
+
+
+def natural_sort_key(path):
+    """Sort watch10 after watch9, like the desktop app"""
+    return [int(text) if text.isdigit() else text.lower() for text in re.split(r'(\d+)', os.path.basename(path))]
+
+
+def collect_images(inputs):
+    """Image paths from folders and glob patterns, naturally sorted and de-duplicated"""
+    image_paths = set()
+    for pattern in inputs:
+        if os.path.isdir(pattern):
+            pattern = os.path.join(pattern, '*')
+        image_paths.update(
+            os.path.abspath(path) for path in glob.glob(pattern)
+            if path.lower().endswith(IMAGE_EXTENSIONS) and os.path.isfile(path)
+        )
+    return sorted(image_paths, key=natural_sort_key)
+
+
+def resolve_worker_model(model_path, backend):
+    """
+    Weights the workers load, exported to ONNX here for the onnx backend
+
+    Exporting once in the parent keeps every worker from exporting the same
+    file at the same time.
+    """
+    weights_path = resolve_model_path(model_path)
+    if weights_path.endswith('.onnx') or resolve_backend(backend) != 'onnx':
+        return weights_path
+    return export_onnx(weights_path)
+
+
+def init_worker(model_path, backend, device, confidence, threads):
+    """Load one model per worker process"""
+    global _WORKER_MODEL, _WORKER_CONFIDENCE
+    # Split the cores between workers instead of every worker using all of them
+    cv2.setNumThreads(threads)
+    _WORKER_MODEL = get_model(model_path, device=device, backend=backend, threads=threads)
+    torch = sys.modules.get('torch')
+    if torch is not None:
+        torch.set_num_threads(threads)
+    _WORKER_CONFIDENCE = confidence
+
+
+def predict_shard(image_paths):
+    """Predicted time of every image of a shard, "failed" when the clock cannot be read"""
+    predictions = []
+    for image_path in image_paths:
+        image_name = os.path.splitext(os.path.basename(image_path))[0]
+        image = cv2.imread(image_path)
+        if image is None:
+            predictions.append((image_name, "failed"))
+            continue
+        try:
+            predictions.append((image_name, predict_image_time(image, _WORKER_MODEL, _WORKER_CONFIDENCE)))
+        except Exception as e:
+            print(f"Error processing {image_path}: {e}")
+            predictions.append((image_name, "failed"))
+    return predictions
+
+
+def run_batch(inputs, output_file, workers=None, shard_size=8, confidence=0.01, model_path=None,
+              backend=None, device=None, resume=True, retry_failed=False):
+    """
+    Predict the time of every image on a process pool and save them to a CSV
+
+    Rows are appended as soon as each shard finishes, so an interrupted run
+    can be resumed; at the end the file is rewritten in image order.
+
+    Returns:
+        dict: {image name: predicted time} of every image in the output
+    """
+    image_paths = collect_images(inputs)
+    store = PredictionStore(output_file)
+    if not resume:
+        store.clear()
+
+    def done(image_path):
+        predicted_time = store.get(os.path.splitext(os.path.basename(image_path))[0])
+        return predicted_time is not None and not (retry_failed and predicted_time == "failed")
+
+    pending = [image_path for image_path in image_paths if not done(image_path)]
+    print(f"{len(image_paths)} images, {len(image_paths) - len(pending)} already predicted, {len(pending)} to process")
+
+    if pending:
+        model_path = resolve_worker_model(model_path, backend)
+
+    workers = max(1, min(workers or os.cpu_count() or 1, len(pending) or 1))
+    threads = max(1, (os.cpu_count() or 1) // workers)
+    shards = [pending[start:start + shard_size] for start in range(0, len(pending), shard_size)]
+
+    started = time.perf_counter()
+    processed = 0
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=init_worker,
+        initargs=(model_path, backend, device, confidence, threads),
+    ) as executor:
+        futures = [executor.submit(predict_shard, shard) for shard in shards]
+        for future in as_completed(futures):
+            # Appended right away, an interrupted run resumes from here
+            shard_predictions = future.result()
+            store.update(shard_predictions)
+            processed += len(shard_predictions)
+            rate = processed / (time.perf_counter() - started)
+            print(f"{processed} / {len(pending)} images ({rate:.1f} images/s)", end='\r')
+
+    # Order rows like the input folder, the appended rows are in completion order
+    store.compact(order=[os.path.splitext(os.path.basename(image_path))[0] for image_path in image_paths])
+
+    failed = sum(predicted_time == "failed" for _, predicted_time in store.items())
+    print(f"\nPredictions saved to {output_file} ({failed} failed)")
+    return dict(store.items())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Predict the time of every clock image in folders or glob patterns, without a display")
+    parser.add_argument("inputs", nargs='+', help="Image folders or glob patterns (quote globs)")
+    parser.add_argument("--output", default="results/files/predictions.csv", help="Output CSV (Image Name,Predicted Time)")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes, defaults to the number of cores")
+    parser.add_argument("--shard-size", type=int, default=8, help="Images sent to a worker at a time")
+    parser.add_argument("--confidence", type=float, default=0.01)
+    parser.add_argument("--model", default=os.environ.get("MODEL_PATH"), help="Weights, defaults to the latest train run")
+    parser.add_argument("--backend", choices=('torch', 'onnx'), default=None)
+    parser.add_argument("--device", default=None)
+    parser.add_argument("--no-resume", action="store_true", help="Ignore predictions already in the output CSV")
+    parser.add_argument("--retry-failed", action="store_true", help="Predict again the images recorded as failed")
+    args = parser.parse_args()
+
+    run_batch(
+        args.inputs,
+        args.output,
+        workers=args.workers,
+        shard_size=max(1, args.shard_size),
+        confidence=args.confidence,
+        model_path=args.model,
+        backend=args.backend,
+        device=args.device,
+        resume=not args.no_resume,
+        retry_failed=args.retry_failed,
+    )
+
+
+if __name__ == "__main__":
+    main()
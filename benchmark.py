@@ -0,0 +1,207 @@
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+from datetime import datetime
+
+import cv2
+import numpy as np
+
+from utils.detections_utils import run_detection
+from utils.evaluation import IMAGE_EXTENSIONS, load_ground_truths, read_image_time, time_deviation
+from utils.model_registry import get_model, model_fingerprint
+from utils.onnx_backend import OnnxDetector
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def latency_stats(samples_ms):
+    """Mean and percentiles (ms) of a list of latencies"""
+    if not samples_ms:
+        return None
+    samples = np.asarray(samples_ms, dtype=np.float64)
+    return {
+        'count': int(samples.size),
+        'mean': float(samples.mean()),
+        'p50': float(np.percentile(samples, 50)),
+        'p90': float(np.percentile(samples, 90)),
+        'p95': float(np.percentile(samples, 95)),
+        'p99': float(np.percentile(samples, 99)),
+        'max': float(samples.max()),
+    }
+
+
+def deviation_stats(deviations, images):
+    """Time deviation summary (seconds) over the images that produced a time"""
+    if not deviations:
+        return {'scored': 0, 'failed': images}
+    deviations = np.asarray(deviations, dtype=np.float64)
+    return {
+        'scored': int(deviations.size),
+        'failed': images - int(deviations.size),
+        'mean': float(deviations.mean()),
+        'median': float(np.median(deviations)),
+        'p90': float(np.percentile(deviations, 90)),
+        'max': float(deviations.max()),
+        'within_1_min': float((deviations <= 60).mean()),
+        'within_5_min': float((deviations <= 300).mean()),
+    }
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB, None where unavailable"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / 2**20 if sys.platform == 'darwin' else peak / 2**10
+
+
+def benchmark(image_dir='test_set', ground_truth_path='ground_truths/ground_truths_test.csv', confidence=0.01,
+              model_path=None, backend=None, device=None, fallback=True, warmup=3, limit=None):
+    """
+    Run the full clock reading pipeline over a labelled folder and measure it
+
+    Stages timed per image: decode, detection (with the model's own
+    preprocess/inference/postprocess split when available), time extraction
+    and the zoom fallback when it is needed.
+
+    Returns:
+        dict: JSON-serialisable report
+    """
+    ground_truths = load_ground_truths(ground_truth_path)
+    filenames = [
+        f for f in sorted(os.listdir(image_dir))
+        if f.lower().endswith(IMAGE_EXTENSIONS) and os.path.splitext(f)[0] in ground_truths
+    ][:limit]
+    if not filenames:
+        raise FileNotFoundError(f"No labelled images found in {image_dir}")
+
+    load_started = time.perf_counter()
+    model = get_model(model_path, device=device, backend=backend)
+    model_load_ms = (time.perf_counter() - load_started) * 1000
+
+    # Warm up on real images so lazy initialisation does not skew the first samples
+    for filename in filenames[:warmup]:
+        run_detection(image=cv2.imread(os.path.join(image_dir, filename)), model=model, confidence=confidence,
+                      save_visualization=False, cache=False)
+
+    stages = {name: [] for name in ('decode', 'detection', 'preprocess', 'inference', 'postprocess',
+                                    'time_extraction', 'fallback', 'total')}
+    deviations = []
+    fallbacks = 0
+    fallback_successes = 0
+    predictions = {}
+
+    started = time.perf_counter()
+    for filename in filenames:
+        image_name = os.path.splitext(filename)[0]
+        image_started = time.perf_counter()
+
+        image = cv2.imread(os.path.join(image_dir, filename))
+        stages['decode'].append((time.perf_counter() - image_started) * 1000)
+        if image is None:
+            continue
+
+        # Same pipeline, stage for stage, as evaluate_model and batch_predict.py
+        predicted_time, timings, fallback_used = read_image_time(image, model, confidence, fallback=fallback)
+        for name, milliseconds in timings.items():
+            stages[name].append(milliseconds)
+        if fallback_used:
+            fallbacks += 1
+            fallback_successes += predicted_time != "failed"
+
+        stages['total'].append((time.perf_counter() - image_started) * 1000)
+
+        predictions[image_name] = predicted_time
+        deviation = time_deviation(predicted_time, ground_truths[image_name])
+        if deviation is not None:
+            deviations.append(deviation)
+    elapsed = time.perf_counter() - started
+
+    images = len(predictions)
+    return {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'environment': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+        },
+        'config': {
+            'image_dir': image_dir,
+            'ground_truths': ground_truth_path,
+            'model': model_fingerprint(model),
+            'backend': 'onnx' if isinstance(model, OnnxDetector) else 'torch',
+            'device': device,
+            'confidence': confidence,
+            'fallback': fallback,
+        },
+        'images': images,
+        'elapsed_s': elapsed,
+        'images_per_s': images / elapsed if elapsed else None,
+        'model_load_ms': model_load_ms,
+        'peak_rss_mb': peak_rss_mb(),
+        'latency_ms': {name: latency_stats(samples) for name, samples in stages.items() if samples},
+        'fallback': {
+            'rate': fallbacks / images if images else 0.0,
+            'success_rate': fallback_successes / fallbacks if fallbacks else None,
+        },
+        'deviation_s': deviation_stats(deviations, images),
+        'predictions': predictions,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure speed and accuracy of the clock reading pipeline")
+    parser.add_argument("--images", default='test_set', help="Folder with the labelled images")
+    parser.add_argument("--ground-truths", default='ground_truths/ground_truths_test.csv')
+    parser.add_argument("--confidence", type=float, default=0.01)
+    parser.add_argument("--model", default=os.environ.get("MODEL_PATH"), help="Weights, defaults to the latest train run")
+    parser.add_argument("--backend", choices=('torch', 'onnx'), default=None)
+    parser.add_argument("--device", default=None)
+    parser.add_argument("--no-fallback", action="store_true", help="Skip the zoom fallback")
+    parser.add_argument("--warmup", type=int, default=3, help="Images run before timing starts")
+    parser.add_argument("--limit", type=int, default=None, help="Only benchmark the first N images")
+    parser.add_argument("--output", help="JSON report, defaults to results/benchmarks/benchmark_<timestamp>.json")
+    args = parser.parse_args()
+
+    report = benchmark(
+        args.images,
+        args.ground_truths,
+        confidence=args.confidence,
+        model_path=args.model,
+        backend=args.backend,
+        device=args.device,
+        fallback=not args.no_fallback,
+        warmup=max(0, args.warmup),
+        limit=args.limit,
+    )
+
+    output_path = args.output or os.path.join(
+        'results/benchmarks', f"benchmark_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    )
+    output_dir = os.path.dirname(output_path)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    with open(output_path, 'w') as f:
+        json.dump(report, f, indent=2)
+
+    total = report['latency_ms'].get('total') or {}
+    deviation = report['deviation_s']
+    print(f"{report['images']} images, {report['images_per_s']:.2f} images/s, "
+          f"p50 {total.get('p50', 0):.1f} ms, p95 {total.get('p95', 0):.1f} ms, "
+          f"peak RSS {report['peak_rss_mb'] or 0:.0f} MB")
+    accuracy = f"Fallback rate {report['fallback']['rate']:.1%}, failed {deviation['failed']}"
+    if 'mean' in deviation:
+        accuracy += f", mean deviation {deviation['mean']:.1f} s, median {deviation['median']:.1f} s"
+    print(accuracy)
+    print(f"Report saved to: {output_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -9,18 +9,19 @@ image.
 from __future__ import annotations
 
 import os
-from typing import Optional, Tuple
+from typing import Optional, Tuple, TYPE_CHECKING
 
 import cv2
 import gradio as gr
 import numpy as np
-from ultralytics import YOLO
 
 from utils.clock_utils import process_clock_time
-from utils.detections_utils import get_latest_train_dir, run_detection
+from utils.detections_utils import get_latest_train_dir, plot_detections, run_detection
+from utils.inference_cache import configure_inference_cache
+from utils.model_registry import get_model
 
-
-_MODEL: Optional[YOLO] = None
+if TYPE_CHECKING:
+    from ultralytics import YOLO
 
 
 def _resolve_model_path() -> str:
@@ -42,13 +43,9 @@ def _resolve_model_path() -> str:
         ) from exc
 
 
-def _load_model() -> YOLO:
-    """Lazy-load the YOLO model to keep the interface responsive."""
-    global _MODEL
-    if _MODEL is None:
-        model_path = _resolve_model_path()
-        _MODEL = YOLO(model_path)
-    return _MODEL
+def _load_model() -> "YOLO":
+    """Fetch the shared YOLO model from the process-wide registry."""
+    return get_model(_resolve_model_path())
 
 
 def _format_time(prediction: Optional[dict]) -> str:
@@ -88,23 +85,22 @@ def predict(image: np.ndarray, confidence: float) -> Tuple[np.ndarray, str]:
 
     image_bgr = cv2.cvtColor(image, cv2.COLOR_RGB2BGR)
 
-    detections, results = run_detection(
+    # Plain detections (no YOLO results) so repeated uploads hit the inference cache
+    detections = run_detection(
+        model=_load_model(),
         image=image_bgr,
         image_path=None,
         confidence=confidence,
         save_path=None,
         save_visualization=False,
-        return_prediction_results=True,
     )
 
     if not detections or not detections[0]:
         return image, "No clock components detected in the provided image."
 
     prediction = process_clock_time(detections, "uploaded_image")
-    annotated = image
-    if results:
-        annotated_bgr = results[0].plot()
-        annotated = cv2.cvtColor(annotated_bgr, cv2.COLOR_BGR2RGB)
+    annotated_bgr = plot_detections(image_bgr, detections[0])
+    annotated = cv2.cvtColor(annotated_bgr, cv2.COLOR_BGR2RGB)
 
     return annotated, _format_time(prediction)
 
@@ -165,6 +161,13 @@ def build_interface() -> gr.Blocks:
 
 
 if __name__ == "__main__":
+    # Re-uploads of the same picture are answered from the inference cache
+    configure_inference_cache(
+        int(os.environ.get("INFERENCE_CACHE_SIZE", 128)),
+        os.environ.get("INFERENCE_CACHE_DIR") or None,
+    )
+    # Load and warm up the model before the first request arrives
+    _load_model()
     demo = build_interface()
     # Limit concurrency and queue size; bind only to localhost; avoid public share
     try:
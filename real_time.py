@@ -1,36 +1,124 @@
+import os
+import time
+import argparse
+import threading
+
 import cv2
-from ultralytics import YOLO
 
+from utils.clock_tracking import ClockTracker
+from utils.clock_utils import format_clock_reading, process_clock_time
+from utils.detections_utils import plot_detections, run_detection
+from utils.model_registry import get_model
+from utils.stream_utils import FrameGrabber, LatestQueue
+
+ESC_KEY = 27
+
+
+def inference_worker(model, frames, results, stop_event, confidence=0.01, device=None, tracker=None):
+    """
+    Detect the clock in the newest captured frame, over and over
+
+    Frames that arrive while the model is busy are dropped by the queue, so
+    each inference starts on the latest frame and results never lag behind.
+    With a ClockTracker, most frames only re-localize the hands in the dial.
+    """
+    while not stop_event.is_set():
+        item = frames.get(timeout=0.1)
+        if item is None:
+            continue
+        frame_index, capture_time, frame = item
+
+        if tracker is not None:
+            image_detections, prediction, _ = tracker.update(frame)
+            results.put((frame_index, capture_time, frame, image_detections, prediction))
+            continue
+
+        detections = run_detection(
+            model=model,
+            image=frame,
+            confidence=confidence,
+            save_visualization=False,
+            device=device,
+            cache=False,
+        )
+        prediction = process_clock_time(detections, f"frame_{frame_index}") if detections and detections[0] else None
+        results.put((frame_index, capture_time, frame, detections[0] if detections else [], prediction))
 
-model = YOLO('runs\detect\train44\weights\best.pt') #Model
 
+def main():
+    parser = argparse.ArgumentParser(description="Read the time of an analog clock from a camera feed")
+    parser.add_argument("--source", default="0", help="Camera index, video file or stream URL")
+    parser.add_argument("--model", default=os.environ.get("MODEL_PATH"), help="YOLO weights, defaults to the latest train run")
+    parser.add_argument("--confidence", type=float, default=0.01)
+    parser.add_argument("--device", default=None)
+    parser.add_argument("--track", action="store_true", help="Track the dial and only run full detections every few frames")
+    parser.add_argument("--detect-every", type=int, default=10, help="Frames between full detections when tracking")
+    parser.add_argument("--crop-imgsz", type=int, default=320, help="Inference size of the dial crop when tracking")
+    parser.add_argument("--smoothing", type=float, default=0.5, help="Weight of the previous reading when tracking (0 disables it)")
+    args = parser.parse_args()
 
-cap = cv2.VideoCapture(0)
+    source = int(args.source) if args.source.isdigit() else args.source
+    model = get_model(args.model, device=args.device)
+    tracker = None
+    if args.track:
+        tracker = ClockTracker(
+            model,
+            detect_every=args.detect_every,
+            smoothing=args.smoothing,
+            confidence=args.confidence,
+            device=args.device,
+            crop_imgsz=args.crop_imgsz,
+        )
 
-if not cap.isOpened():
-    print("Error accessing the camera. Exiting...")
-    exit()
+    # Capture -> inference -> display, each stage only keeps the newest item
+    stop_event = threading.Event()
+    frames = LatestQueue(maxsize=1)
+    results = LatestQueue(maxsize=1)
 
-while True:
-    # Capturing a frame
-    ret, frame = cap.read()
-    if not ret:
-        print("Não foi possível capturar o frame. Encerrando...")
-        break
+    grabber = FrameGrabber(source, frames, stop_event)
+    if not grabber.is_opened():
+        print("Error accessing the camera. Exiting...")
+        return
 
-    # Executing the model in the frame
-    results = model(frame)
+    worker = threading.Thread(
+        target=inference_worker,
+        args=(model, frames, results, stop_event, args.confidence, args.device, tracker),
+        daemon=True,
+        name="inference-worker",
+    )
+    grabber.start()
+    worker.start()
 
-    # Annotating the frame with the detections
-    annotated_frame = results[0].plot()
+    processed = 0
+    started = time.perf_counter()
+    try:
+        # The display stays on the main thread, HighGUI is not thread-safe
+        while not stop_event.is_set():
+            item = results.get(timeout=0.05)
+            if item is not None:
+                frame_index, capture_time, frame, image_detections, prediction = item
+                processed += 1
+                latency_ms = (time.perf_counter() - capture_time) * 1000
+                fps = processed / max(time.perf_counter() - started, 1e-6)
 
-    # Displaying the frame
-    cv2.imshow("Detection YOLO", annotated_frame)
+                annotated = plot_detections(frame, image_detections, min_confidence=0.1)
+                overlay = f"{format_clock_reading(prediction) or '--:--:--'}  {latency_ms:.0f} ms  {fps:.1f} fps"
+                cv2.putText(annotated, overlay, (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 255, 0), 2)
+                cv2.imshow("Detection YOLO", annotated)
 
-    # Press 'esc' to exit
-    if cv2.waitKey(1) & 0xFF == ord('esc'):
-        break
+            # Press 'esc' or 'q' to exit
+            key = cv2.waitKey(1) & 0xFF
+            if key in (ESC_KEY, ord('q')):
+                break
+    finally:
+        stop_event.set()
+        grabber.join(timeout=2)
+        worker.join(timeout=2)
+        cv2.destroyAllWindows()
+        print(f"Processed {processed} frames, dropped {frames.dropped} stale frames")
+        if tracker is not None:
+            print(f"Full detections: {tracker.full_detections}, tracked frames: {tracker.tracked_frames}")
 
 
-cap.release()
-cv2.destroyAllWindows()
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,31 @@
+import json
+import os
+import subprocess
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules the clock reading helpers must not pull in at import time
+HEAVY_MODULES = ('torch', 'ultralytics', 'matplotlib')
+# Seconds; cv2 and numpy take ~0.1 s warm, the rest is headroom for cold caches and slow CI
+IMPORT_BUDGET = 1.5
+
+SCRIPT = f"""
+import json, sys, time
+started = time.perf_counter()
+import utils.clock_utils, utils.detections_utils, utils.clock_geometry
+seconds = time.perf_counter() - started
+print(json.dumps({{"seconds": seconds, "loaded": [m for m in {HEAVY_MODULES!r} if m in sys.modules]}}))
+"""
+
+
+def test_clock_helpers_import_fast_without_heavy_modules():
+    # A fresh interpreter, so modules imported by other tests do not hide a regression
+    env = dict(os.environ, PYTHONPATH=REPO_ROOT)
+    output = subprocess.run(
+        [sys.executable, "-c", SCRIPT], cwd=REPO_ROOT, env=env, capture_output=True, text=True, check=True
+    ).stdout
+    result = json.loads(output.strip().splitlines()[-1])
+
+    assert result["loaded"] == []
+    assert result["seconds"] < IMPORT_BUDGET, f"imports took {result['seconds']:.2f}s, budget {IMPORT_BUDGET}s"
@@ -0,0 +1,84 @@
+import numpy as np
+import pytest
+
+from annotations_utils.label_transforms import (
+    format_labels, load_labels, rotate_labels, rotated_size, save_labels, scale_pad_labels,
+)
+from annotations_utils.resized_annotations import adjust_annotations, read_annotations
+from annotations_utils.rotate_img_ann import rotate_point, rotate_yolo_annotations
+
+SIZE = (480, 640)  # (height, width)
+
+
+@pytest.fixture
+def labels():
+    """Boxes fully inside the image, so clipping never kicks in for the right angles"""
+    rng = np.random.default_rng(0)
+    count = 20
+    widths, heights = rng.uniform(0.02, 0.4, count), rng.uniform(0.02, 0.4, count)
+    return np.column_stack((
+        rng.integers(0, 5, count),
+        rng.uniform(widths / 2, 1 - widths / 2),
+        rng.uniform(heights / 2, 1 - heights / 2),
+        widths,
+        heights,
+    ))
+
+
+@pytest.fixture
+def label_file(tmp_path, labels):
+    path = tmp_path / "labels.txt"
+    save_labels(str(path), labels)
+    return path
+
+
+def reference_rotation(labels, size, angle):
+    """Box enclosing the corners rotated one by one with rotate_point from rotate_img_ann.py"""
+    height, width = size
+    new_height, new_width = rotated_size(size, angle)
+    rows = []
+    for cls, x_c, y_c, w, h in labels.tolist():
+        corners = []
+        for dx in (-0.5, 0.5):
+            for dy in (-0.5, 0.5):
+                # rotate_point turns clockwise on screen for positive angles, PIL counter-clockwise
+                x, y = rotate_point(((x_c + dx * w) * width, (y_c + dy * h) * height), (width / 2, height / 2), -angle)
+                x += new_width / 2 - width / 2
+                y += new_height / 2 - height / 2
+                corners.append((min(max(x, 0), new_width), min(max(y, 0), new_height)))
+        xs, ys = [x for x, _ in corners], [y for _, y in corners]
+        rows.append((
+            cls,
+            (min(xs) + max(xs)) / 2 / new_width,
+            (min(ys) + max(ys)) / 2 / new_height,
+            (max(xs) - min(xs)) / new_width,
+            (max(ys) - min(ys)) / new_height,
+        ))
+    return np.array(rows)
+
+
+@pytest.mark.parametrize("angle", [-90, 180, -270])
+def test_rotate_labels_matches_rotate_yolo_annotations(tmp_path, label_file, angle):
+    height, width = SIZE
+    new_height, new_width = rotated_size(SIZE, angle)
+    output = tmp_path / "rotated.txt"
+    rotate_yolo_annotations(str(label_file), str(output), angle, width, height, new_width, new_height)
+
+    assert format_labels(rotate_labels(load_labels(str(label_file)), SIZE, angle)) == output.read_text()
+
+
+@pytest.mark.parametrize("angle", [-90, 180, -270, 37, -12.5, 145])
+def test_rotate_labels_matches_rotate_point(labels, angle):
+    assert np.allclose(rotate_labels(labels, SIZE, angle), reference_rotation(labels, SIZE, angle))
+
+
+def test_rotate_labels_empty():
+    assert rotate_labels(np.zeros((0, 5)), SIZE, 37).shape == (0, 5)
+
+
+@pytest.mark.parametrize("resized_size, padded_size", [((128, 128), (256, 256)), ((300, 400), (320, 640))])
+def test_scale_pad_labels_matches_adjust_annotations(label_file, resized_size, padded_size):
+    expected = adjust_annotations(read_annotations(str(label_file)), SIZE, resized_size, padded_size)
+    adjusted = scale_pad_labels(load_labels(str(label_file)), SIZE, resized_size, padded_size)
+
+    assert np.allclose(adjusted, np.array(expected))
@@ -0,0 +1,133 @@
+import asyncio
+from functools import partial
+
+from utils.detections_utils import run_batch_detection
+
+
+class MicroBatcher:
+    """
+    Coalesce concurrent single-image detection requests into batched inference
+
+    Requests arriving within max_wait_ms of the first queued one (up to
+    max_batch_size of them) are stacked into one run_batch_detection call,
+    which runs in a worker thread so the event loop keeps accepting requests.
+    Each caller gets back its own image's detections.
+    """
+
+    def __init__(self, max_batch_size=8, max_wait_ms=10, confidence=0.01, model=None, observer=None):
+        """
+        Args:
+            max_batch_size (int): Maximum number of images per forward pass
+            max_wait_ms (float): Longest time the first request of a batch waits for company
+            confidence (float): Confidence threshold passed to the detector
+            model (YOLO, optional): Already loaded model, defaults to the shared registry model
+            observer (callable, optional): Called after each batch with (batch size, per-image
+                speeds from run_batch_detection, wall-clock seconds of the batch)
+        """
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000
+        self.confidence = confidence
+        self.model = model
+        self.observer = observer
+        self._queue = None
+        self._worker = None
+
+    async def start(self):
+        """Start the background batching task on the running event loop"""
+        if self._worker is None:
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the batching task and fail any request still waiting"""
+        if self._worker is None:
+            return
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        self._worker = None
+
+        while not self._queue.empty():
+            _, future = self._queue.get_nowait()
+            if not future.done():
+                future.set_exception(RuntimeError("Detector is shutting down"))
+
+    async def submit(self, image):
+        """
+        Queue one decoded BGR image and wait for its detections
+
+        Args:
+            image (np.ndarray): Decoded BGR image
+
+        Returns:
+            list: Detections shaped like run_detection's output
+        """
+        if self._worker is None:
+            raise RuntimeError("MicroBatcher.start() must be awaited before submitting")
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((image, future))
+        return await future
+
+    async def _collect_batch(self, batch):
+        """Wait for one request, then gather more until the batch is full or the window closes"""
+        loop = asyncio.get_running_loop()
+        batch.append(await self._queue.get())
+        deadline = loop.time() + self.max_wait
+
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        batch = []
+        try:
+            while True:
+                batch = []
+                await self._collect_batch(batch)
+
+                # Skip requests whose handler already went away
+                batch = [(image, future) for image, future in batch if not future.done()]
+                if not batch:
+                    continue
+
+                images = [image for image, _ in batch]
+                speeds = []
+                started = loop.time()
+                try:
+                    detections = await loop.run_in_executor(
+                        None,
+                        partial(
+                            run_batch_detection,
+                            images,
+                            confidence=self.confidence,
+                            model=self.model,
+                            batch_size=len(images),
+                            speeds=speeds,
+                        ),
+                    )
+                except Exception as e:
+                    for _, future in batch:
+                        if not future.done():
+                            future.set_exception(e)
+                    continue
+
+                if self.observer is not None:
+                    self.observer(len(images), speeds, loop.time() - started)
+
+                for (_, future), image_detections in zip(batch, detections):
+                    if not future.done():
+                        future.set_result(image_detections)
+        except asyncio.CancelledError:
+            # Requests already taken off the queue would otherwise wait forever
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(RuntimeError("Detector is shutting down"))
+            raise
@@ -0,0 +1,244 @@
+import numpy as np
+
+# Class order used by dataset.yaml and the trained models
+CLASS_NAMES = ['circle', 'hours', 'minutes', 'seconds', '12']
+
+# One row per image returned by batch_clock_times. Missing values are -1 / NaN.
+CLOCK_TIME_DTYPE = np.dtype([
+    ('valid', bool),
+    ('hours', np.int16),
+    ('minutes', np.int16),
+    ('seconds', np.int16),
+    ('hour_angle', np.float64),
+    ('minute_angle', np.float64),
+    ('seconds_angle', np.float64),
+])
+
+
+def box_centers(boxes):
+    """Center points of [x_min, y_min, x_max, y_max] boxes, shape (..., 4) -> (..., 2)"""
+    boxes = np.asarray(boxes, dtype=np.float64)
+    return np.stack(
+        ((boxes[..., 0] + boxes[..., 2]) / 2, (boxes[..., 1] + boxes[..., 3]) / 2),
+        axis=-1,
+    )
+
+
+def hand_angles(center, points, reference_points):
+    """
+    Angles (degrees, 0-360) of points around center relative to the 12 o'clock reference
+
+    Vectorized equivalent of clock_utils.calculate_angle, all inputs have shape (..., 2).
+    """
+    center = np.asarray(center, dtype=np.float64)
+    points = np.asarray(points, dtype=np.float64)
+    reference_points = np.asarray(reference_points, dtype=np.float64)
+
+    ref_angle = np.arctan2(reference_points[..., 1] - center[..., 1], reference_points[..., 0] - center[..., 0])
+    point_angle = np.arctan2(points[..., 1] - center[..., 1], points[..., 0] - center[..., 0])
+
+    return np.mod(np.degrees(point_angle - ref_angle) + 360, 360)
+
+
+def angles_to_time(hour_angle, minute_angle, seconds_angle):
+    """
+    Convert hand angles to clock readings, same rounding rules as process_clock_time
+
+    NaN angles give -1 for the corresponding reading.
+    """
+    hour_angle = np.asarray(hour_angle, dtype=np.float64)
+    minute_angle = np.asarray(minute_angle, dtype=np.float64)
+    seconds_angle = np.asarray(seconds_angle, dtype=np.float64)
+
+    # Each hour is 30 degrees, each minute/second 6 degrees
+    hours = np.mod(np.floor(np.nan_to_num(hour_angle) / 30), 12)
+    hours = np.where(hours == 0, 12, hours)
+    minutes = np.mod(np.rint(np.nan_to_num(minute_angle) / 6), 60)
+    seconds = np.mod(np.rint(np.nan_to_num(seconds_angle) / 6), 60)
+
+    hours = np.where(np.isnan(hour_angle), -1, hours).astype(np.int16)
+    minutes = np.where(np.isnan(minute_angle), -1, minutes).astype(np.int16)
+    seconds = np.where(np.isnan(seconds_angle), -1, seconds).astype(np.int16)
+    return hours, minutes, seconds
+
+
+def best_boxes_per_class(image_ids, boxes, confidences, class_ids, num_images, num_classes):
+    """
+    Highest-confidence box of every class in every image
+
+    Ties keep the first detection, like the dict scan in process_clock_time.
+
+    Args:
+        image_ids (np.ndarray): (N,) image index of each detection
+        boxes (np.ndarray): (N, 4) boxes
+        confidences (np.ndarray): (N,) confidences
+        class_ids (np.ndarray): (N,) class ids
+        num_images (int): Number of images in the batch
+        num_classes (int): Number of classes
+
+    Returns:
+        tuple: (num_images, num_classes, 4) boxes and (num_images, num_classes)
+            confidences, NaN where a class was not detected
+    """
+    best_boxes = np.full((num_images, num_classes, 4), np.nan)
+    best_confidences = np.full((num_images, num_classes), np.nan)
+
+    image_ids = np.asarray(image_ids, dtype=np.int64)
+    class_ids = np.asarray(class_ids, dtype=np.int64)
+    confidences = np.asarray(confidences, dtype=np.float64)
+    boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+
+    keep = (class_ids >= 0) & (class_ids < num_classes)
+    if not keep.any():
+        return best_boxes, best_confidences
+    image_ids, class_ids, confidences, boxes = image_ids[keep], class_ids[keep], confidences[keep], boxes[keep]
+
+    # Sort by (image, class, confidence, -index) so each group's winner is its last element
+    order = np.lexsort((-np.arange(len(confidences)), confidences, class_ids, image_ids))
+    keys = image_ids[order] * num_classes + class_ids[order]
+    last_in_group = np.append(keys[1:] != keys[:-1], True)
+    winners = order[last_in_group]
+
+    best_boxes[image_ids[winners], class_ids[winners]] = boxes[winners]
+    best_confidences[image_ids[winners], class_ids[winners]] = confidences[winners]
+    return best_boxes, best_confidences
+
+
+def batch_clock_times(batch, class_names=CLASS_NAMES):
+    """
+    Compute clock times for many images at once
+
+    Args:
+        batch (list): One (boxes, confidences, class_ids) tuple of arrays per image
+        class_names (list or dict): Class id -> name mapping of the model
+
+    Returns:
+        np.ndarray: Structured array with CLOCK_TIME_DTYPE, one row per image.
+            Rows missing hours, minutes, 12 or circle have valid=False.
+    """
+    if hasattr(class_names, 'items'):
+        class_names = {int(k): v for k, v in class_names.items()}
+    else:
+        class_names = dict(enumerate(class_names))
+    num_classes = max(class_names) + 1 if class_names else 0
+    class_index = {name: cls_id for cls_id, name in class_names.items()}
+
+    num_images = len(batch)
+    times = np.zeros(num_images, dtype=CLOCK_TIME_DTYPE)
+    times['hours'] = times['minutes'] = times['seconds'] = -1
+    times['hour_angle'] = times['minute_angle'] = times['seconds_angle'] = np.nan
+    if num_images == 0:
+        return times
+
+    counts = [len(np.asarray(confidences)) for _, confidences, _ in batch]
+    image_ids = np.repeat(np.arange(num_images), counts)
+    if sum(counts):
+        boxes = np.concatenate([np.asarray(b, dtype=np.float64).reshape(-1, 4) for b, _, _ in batch])
+        confidences = np.concatenate([np.asarray(c, dtype=np.float64).reshape(-1) for _, c, _ in batch])
+        class_ids = np.concatenate([np.asarray(k).reshape(-1) for _, _, k in batch])
+    else:
+        boxes, confidences, class_ids = np.empty((0, 4)), np.empty(0), np.empty(0, dtype=np.int64)
+
+    best_boxes, _ = best_boxes_per_class(image_ids, boxes, confidences, class_ids, num_images, num_classes)
+
+    def centers_of(name):
+        if name not in class_index:
+            return np.full((num_images, 2), np.nan)
+        return box_centers(best_boxes[:, class_index[name]])
+
+    circle = centers_of('circle')
+    center = centers_of('center')
+    hours = centers_of('hours')
+    minutes = centers_of('minutes')
+    seconds = centers_of('seconds')
+    twelve = centers_of('12')
+
+    # Use 'center' if detected, otherwise the circle center
+    center = np.where(np.isnan(center), circle, center)
+
+    valid = ~(np.isnan(hours).any(-1) | np.isnan(minutes).any(-1)
+              | np.isnan(twelve).any(-1) | np.isnan(circle).any(-1))
+
+    hour_angle = hand_angles(center, hours, twelve)
+    minute_angle = hand_angles(center, minutes, twelve)
+    seconds_angle = hand_angles(center, seconds, twelve)
+
+    hour_angle[~valid] = np.nan
+    minute_angle[~valid] = np.nan
+    seconds_angle[~valid] = np.nan
+
+    times['valid'] = valid
+    times['hour_angle'] = hour_angle
+    times['minute_angle'] = minute_angle
+    times['seconds_angle'] = seconds_angle
+    times['hours'], times['minutes'], times['seconds'] = angles_to_time(hour_angle, minute_angle, seconds_angle)
+    return times
+
+
+def detections_to_arrays(detections_data, class_names=CLASS_NAMES):
+    """
+    Convert run_detection output for one image into (boxes, confidences, class_ids) arrays
+
+    Class ids are taken from class_names so that results of different models line up.
+    """
+    class_index = {name: cls_id for cls_id, name in enumerate(class_names)}
+    image_detections = detections_data[0] if detections_data else []
+
+    # Detections containers already hold the arrays, only the class ids need remapping
+    if hasattr(image_detections, 'xyxy'):
+        cls = image_detections.cls
+        size = max(max(image_detections.names, default=-1), int(cls.max(initial=-1))) + 1
+        lookup = np.full(size, -1, dtype=np.int64)
+        for cls_id, name in image_detections.names.items():
+            lookup[cls_id] = class_index.get(name, -1)
+        return image_detections.xyxy, image_detections.conf, lookup[cls]
+
+    boxes = np.array([d['box'] for d in image_detections], dtype=np.float64).reshape(-1, 4)
+    confidences = np.array([d['confidence'] for d in image_detections], dtype=np.float64)
+    class_ids = np.array([class_index.get(d['class_name'], -1) for d in image_detections], dtype=np.int64)
+    return boxes, confidences, class_ids
+
+
+def clock_times_from_detections(batch_detections, class_names=CLASS_NAMES):
+    """
+    Batched replacement for calling process_clock_time on every image
+
+    Args:
+        batch_detections (list): run_detection-style output for every image
+
+    Returns:
+        list: process_clock_time-style dict (or None when required classes are missing) per image
+    """
+    # Keep classes the model knows beyond class_names (e.g. 'center')
+    class_names = list(class_names)
+    for detections in batch_detections:
+        image_detections = detections[0] if detections else []
+        if hasattr(image_detections, 'names'):
+            names = [image_detections.names[cls_id] for cls_id in sorted(image_detections.names)]
+        else:
+            names = [detection['class_name'] for detection in image_detections]
+        for name in names:
+            if name not in class_names:
+                class_names.append(name)
+
+    times = batch_clock_times(
+        [detections_to_arrays(detections, class_names) for detections in batch_detections],
+        class_names,
+    )
+    return clock_times_to_results(times)
+
+
+def clock_times_to_results(times):
+    """Convert a CLOCK_TIME_DTYPE array into process_clock_time-style dicts"""
+    results = []
+    for row in times.tolist():
+        valid, hours, minutes, seconds = row[:4]
+        if not valid:
+            results.append(None)
+            continue
+        results.append({
+            'hours': hours,
+            'minutes': minutes,
+            'seconds': seconds if seconds >= 0 else None,
+        })
+    return results
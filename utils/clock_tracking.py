@@ -0,0 +1,174 @@
+import math
+
+import numpy as np
+
+from utils.clock_utils import best_detections_by_class, clock_crop_box, process_clock_time
+from utils.detections import Detections
+from utils.detections_utils import run_detection
+from utils.model_registry import get_model
+
+# Classes re-localized inside the dial crop, 'circle' and '12' are propagated
+HAND_CLASSES = ('hours', 'minutes', 'seconds', 'center')
+ANCHOR_CLASSES = ('circle', '12')
+
+SECONDS_PER_DIAL = 12 * 3600
+
+
+class ClockTracker:
+    """
+    Frame-to-frame clock reader that skips most full-frame detections
+
+    A full YOLO pass runs every detect_every frames, or whenever tracking
+    loses the hands. In between, the 'circle' and '12' boxes of the last
+    full pass are propagated and only the padded dial crop is run through
+    the detector, at the smaller crop_imgsz, to re-localize the hands.
+    Readings are smoothed on the 12-hour dial so the output does not
+    flicker between neighbouring minutes.
+    """
+
+    def __init__(self, model=None, detect_every=10, min_confidence=0.25, smoothing=0.5, confidence=0.01, device=None,
+                 crop_imgsz=320):
+        """
+        Args:
+            model (YOLO, optional): Already loaded model, defaults to the shared registry model
+            detect_every (int): Run a full-frame detection at least every this many frames
+            min_confidence (float): Hours/minutes confidence below which tracking is considered lost
+            smoothing (float): Weight of the previous reading in the exponential smoothing (0 disables it)
+            confidence (float): Confidence threshold passed to the detector
+            device (str, optional): Inference device
+            crop_imgsz (int): Inference size of the dial crop. The crop is square, so at the
+                default 640 it would cost as much as a 16:9 frame (640x384)
+        """
+        self.model = model if model is not None else get_model(device=device)
+        self.detect_every = max(1, int(detect_every))
+        self.min_confidence = min_confidence
+        self.smoothing = min(max(float(smoothing), 0.0), 0.99)
+        self.confidence = confidence
+        self.device = device
+        self.crop_imgsz = crop_imgsz
+        self.full_detections = 0
+        self.tracked_frames = 0
+        self.reset()
+
+    def reset(self):
+        """Forget the tracked dial and smoothed reading"""
+        self._anchors = {}
+        self._frames_since_detection = 0
+        self._smoothed = None
+
+    def _detect(self, image, imgsz=None):
+        detections = run_detection(
+            model=self.model,
+            image=image,
+            confidence=self.confidence,
+            save_visualization=False,
+            device=self.device,
+            cache=False,
+            imgsz=imgsz,
+        )
+        return detections[0] if detections else Detections([], [], [])
+
+    def _hands_confidence(self, detections_by_class):
+        """Weakest of the hours/minutes confidences, 0 when either is missing"""
+        if 'hours' not in detections_by_class or 'minutes' not in detections_by_class:
+            return 0.0
+        return min(detections_by_class['hours']['confidence'], detections_by_class['minutes']['confidence'])
+
+    def _full_detection(self, frame):
+        image_detections = self._detect(frame)
+        detections_by_class = best_detections_by_class(image_detections)
+        self._anchors = {name: detections_by_class[name] for name in ANCHOR_CLASSES if name in detections_by_class}
+        self._frames_since_detection = 0
+        self.full_detections += 1
+        return image_detections
+
+    def _track(self, frame):
+        """
+        Re-localize the hands inside the dial crop
+
+        Returns:
+            Detections or None: Full-frame detections, or None if the hands were lost
+        """
+        x1, y1, x2, y2 = clock_crop_box(frame.shape, self._anchors['circle']['box'])
+        if x2 <= x1 or y2 <= y1:
+            return None
+
+        crop_detections = self._detect(frame[y1:y2, x1:x2], imgsz=self.crop_imgsz)
+        crop_by_class = best_detections_by_class(crop_detections)
+        if self._hands_confidence(crop_by_class) < self.min_confidence:
+            return None
+
+        # Anchors seen confidently in the crop follow the dial, the others are propagated
+        for name in ANCHOR_CLASSES:
+            detection = crop_by_class.get(name)
+            if detection and detection['confidence'] >= self.min_confidence:
+                self._anchors[name] = {
+                    **detection,
+                    'box': (np.asarray(detection['box']) + (x1, y1, x1, y1)).tolist(),
+                }
+
+        hands = crop_detections.mask(HAND_CLASSES)
+        names = {**crop_detections.names, **{a['class_id']: a['class_name'] for a in self._anchors.values()}}
+        anchors = list(self._anchors.values())
+        self._frames_since_detection += 1
+        self.tracked_frames += 1
+        return Detections(
+            np.concatenate((crop_detections.xyxy[hands] + (x1, y1, x1, y1), np.array([a['box'] for a in anchors]).reshape(-1, 4))),
+            np.concatenate((crop_detections.conf[hands], [a['confidence'] for a in anchors])),
+            np.concatenate((crop_detections.cls[hands], [a['class_id'] for a in anchors])),
+            names,
+        )
+
+    def _smooth(self, prediction):
+        """Exponential smoothing of the reading on the 12-hour dial (handles 12 -> 1 wrap-around)"""
+        if prediction is None:
+            return None
+        if not self.smoothing:
+            return prediction
+
+        minutes = prediction['minutes'] or 0
+        seconds = prediction['seconds'] or 0
+        angle = 2 * math.pi * ((prediction['hours'] % 12) * 3600 + minutes * 60 + seconds) / SECONDS_PER_DIAL
+        point = (math.cos(angle), math.sin(angle))
+        if self._smoothed is None:
+            self._smoothed = point
+        else:
+            self._smoothed = tuple(
+                self.smoothing * previous + (1 - self.smoothing) * current
+                for previous, current in zip(self._smoothed, point)
+            )
+
+        total = round(math.atan2(self._smoothed[1], self._smoothed[0]) / (2 * math.pi) * SECONDS_PER_DIAL)
+        total %= SECONDS_PER_DIAL
+        hours = total // 3600 or 12
+        return {
+            'hours': hours,
+            'minutes': (total // 60) % 60 if prediction['minutes'] is not None else None,
+            'seconds': total % 60 if prediction['seconds'] is not None else None,
+        }
+
+    def update(self, frame):
+        """
+        Read the clock in the next frame
+
+        Args:
+            frame (np.ndarray): BGR frame
+
+        Returns:
+            tuple: (Detections in frame coordinates, smoothed process_clock_time-style dict or None,
+                whether a full-frame detection was run)
+        """
+        image_detections = None
+        full_detection = False
+        if 'circle' in self._anchors and self._frames_since_detection + 1 < self.detect_every:
+            image_detections = self._track(frame)
+
+        if image_detections is None:
+            image_detections = self._full_detection(frame)
+            full_detection = True
+
+        prediction = process_clock_time([image_detections], "frame") if len(image_detections) else None
+        if prediction is None:
+            # Nothing usable to track, look at the whole frame again next time
+            self._anchors = {}
+        return image_detections, self._smooth(prediction), full_detection
@@ -1,7 +1,6 @@
 import cv2
 import math
 import numpy as np
-import matplotlib.pyplot as plt
 from utils.detections_utils import run_detection
 import os
 
@@ -30,14 +29,23 @@ def calculate_angle(center, point, reference_point):
     
     return angle
 
-def process_clock_time(detections_data, image_path):
-    """Process clock time from detections"""
-    # Organize detections by class_name and select the one with highest confidence for each class
+def best_detections_by_class(image_detections):
+    """Select the detection with highest confidence for each class_name"""
+    # Detections containers already know their best detection per class
+    if hasattr(image_detections, 'best_by_class'):
+        return image_detections.best_by_class()
+
     detections_by_class = {}
-    for detection in detections_data[0]:
+    for detection in image_detections:
         class_name = detection['class_name']
         if class_name not in detections_by_class or detection['confidence'] > detections_by_class[class_name]['confidence']:
             detections_by_class[class_name] = detection
+    return detections_by_class
+
+def process_clock_time(detections_data, image_path):
+    """Process clock time from detections"""
+    # Organize detections by class_name and select the one with highest confidence for each class
+    detections_by_class = best_detections_by_class(detections_data[0])
 
     # Validate required keys
     required_keys = ['hours', 'minutes', '12', 'circle']
@@ -105,10 +113,26 @@ def process_clock_time(detections_data, image_path):
         'seconds': calculated_seconds if seconds_angle is not None else None
     }
 
-def draw_clock(image_path, center_point, hours_point, minutes_point, seconds_point, number_12_point, hour_angle, minute_angle, seconds_angle, calculated_hours, calculated_minutes, calculated_seconds, image_name):
-    """Draw clock and reference points on the image"""
+def format_clock_reading(prediction):
+    """hh:mm:ss string of a process_clock_time result (missing minutes/seconds read as 00), or None"""
+    if not prediction:
+        return None
+    minutes = prediction['minutes'] if prediction['minutes'] is not None else 0
+    seconds = prediction['seconds'] if prediction['seconds'] is not None else 0
+    return f"{prediction['hours']:02d}:{minutes:02d}:{seconds:02d}"
+
+def format_predicted_time(result):
+    """Time string stored for a prediction: hh:mm:00 (hh:00:00 without minutes), or 'failed'"""
+    if not result:
+        return "failed"
+    if result['minutes'] is None:
+        return f"{result['hours']:02d}:00:00"
+    return f"{result['hours']:02d}:{result['minutes']:02d}:00"
+
+def draw_clock(image_path, center_point, hours_point, minutes_point, seconds_point, number_12_point, hour_angle, minute_angle, seconds_angle, calculated_hours, calculated_minutes, calculated_seconds, image_name, image=None):
+    """Draw clock and reference points on the image (read from image_path unless an in-memory image is given)"""
 
-    img = cv2.imread(image_path)
+    img = image.copy() if image is not None else cv2.imread(image_path)
     
     # To int
     center = (int(center_point[0]), int(center_point[1]))
@@ -155,6 +179,59 @@ def draw_clock(image_path, center_point, hours_point, minutes_point, seconds_poi
     cv2.imwrite(output_path, img)
     print(f"Annotated image saved to {output_path}")
     
+def clock_crop_box(image_shape, box, padding=0.2):
+    """
+    Integer crop region around a circle box, padded on each side and clipped to the image.
+    
+    Args:
+        image_shape (tuple): Shape of the image the box refers to
+        box (list): [x_min, y_min, x_max, y_max] of the clock circle
+        padding (float): Fraction of the box size added on each side
+    
+    Returns:
+        tuple: (x1, y1, x2, y2) of the crop
+    """
+    x1, y1, x2, y2 = box
+    
+    # Add some padding (20% on each side by default)
+    height, width = image_shape[:2]
+    pad_x = int((x2 - x1) * padding)
+    pad_y = int((y2 - y1) * padding)
+    
+    # Calculate padded coordinates with boundary checks
+    return (
+        int(max(0, x1 - pad_x)),
+        int(max(0, y1 - pad_y)),
+        int(min(width, x2 + pad_x)),
+        int(min(height, y2 + pad_y)),
+    )
+
+def crop_clock_circle(image, detections, confidence=0.01):
+    """
+    Crop the highest-confidence clock circle, padded by 20% on each side.
+    
+    Args:
+        image (np.ndarray): Image the detections were computed on
+        detections (list): Detections from run_detection for that image
+        confidence (float): Minimum confidence for the circle detection
+    
+    Returns:
+        np.ndarray: Cropped view of the image, or None if no suitable circle found
+    """
+    # Find the circle detection with highest confidence
+    circle_detection = best_detections_by_class(detections[0]).get('circle')
+    
+    if not circle_detection or circle_detection['confidence'] < confidence:
+        return None
+    
+    x1_pad, y1_pad, x2_pad, y2_pad = clock_crop_box(image.shape, circle_detection['box'])
+    
+    # Crop the image
+    zoomed_image = image[y1_pad:y2_pad, x1_pad:x2_pad]
+    if zoomed_image.size == 0:
+        return None
+    return zoomed_image
+
 def zoom_into_clock_circle(image_path, confidence=0.01):
     """
     Attempt to find the clock circle and zoom into it for more precise detection.
@@ -172,33 +249,10 @@ def zoom_into_clock_circle(image_path, confidence=0.01):
     # Run detection to find clock circle
     detections = run_detection(image_path, confidence=confidence)
     
-    # Find the circle detection with highest confidence
-    circle_detection = None
-    for detection in detections[0]:
-        if detection['class_name'] == 'circle' and detection['confidence'] >= confidence:
-            if not circle_detection or detection['confidence'] > circle_detection['confidence']:
-                circle_detection = detection
-    
-    if not circle_detection:
+    zoomed_image = crop_clock_circle(image, detections, confidence)
+    if zoomed_image is None:
         return None
     
-    # Extract bounding box
-    x1, y1, x2, y2 = circle_detection['box']
-    
-    # Add some padding (20% on each side)
-    height, width = image.shape[:2]
-    pad_x = int((x2 - x1) * 0.2)
-    pad_y = int((y2 - y1) * 0.2)
-    
-    # Calculate padded coordinates with boundary checks
-    x1_pad = max(0, x1 - pad_x)
-    y1_pad = max(0, y1 - pad_y)
-    x2_pad = min(width, x2 + pad_x)
-    y2_pad = min(height, y2 + pad_y)
-    
-    # Crop the image
-    zoomed_image = image[int(y1_pad):int(y2_pad), int(x1_pad):int(x2_pad)]
-    
     # Save the zoomed image
     zoomed_image_path = f'results/zoomed_images/{os.path.splitext(os.path.basename(image_path))[0]}_zoomed.jpg'
     os.makedirs('results/zoomed_images', exist_ok=True)
@@ -237,6 +291,39 @@ def process_clock_with_fallback(image_path, confidence=0.01):
     
     return detections, zoomed_result
 
-
-
+def process_clock_with_zoom(image, detections, confidence=0.01, image_name=None, save_visualization=False, model=None):
+    """
+    Fallback that reuses the detections already computed on the full image.
+    
+    The clock circle is cropped from the in-memory image and only the crop is
+    run through the detector, so no extra full-image inference and no disk
+    round-trip is needed.
+    
+    Args:
+        image (np.ndarray): Full BGR image the detections were computed on
+        detections (list): Detections from run_detection for that image
+        confidence (float): Confidence threshold for detection
+        image_name (str, optional): Name used for saved outputs of the zoomed detection
+        save_visualization (bool): Save the YOLO visualization of the zoomed detection
+        model (YOLO, optional): Model to run on the crop, defaults to the shared registry model
+    
+    Returns:
+        tuple or None: (zoomed detections, processed clock time, zoomed image),
+            or None if no suitable circle was found
+    """
+    zoomed_image = crop_clock_circle(image, detections, confidence)
+    if zoomed_image is None:
+        return None
     
+    zoomed_detections = run_detection(
+        image=zoomed_image,
+        confidence=confidence,
+        save_path=None,
+        zoom=True,
+        save_visualization=save_visualization,
+        image_name=image_name,
+        model=model,
+    )
+    zoomed_result = process_clock_time(zoomed_detections, image_name)
+    
+    return zoomed_detections, zoomed_result, zoomed_image
@@ -0,0 +1,164 @@
+import os
+import json
+
+import numpy as np
+
+from utils.clock_geometry import batch_clock_times
+from utils.detections import Detections
+
+
+class DetectionStore:
+    """
+    Detections of many images in one binary .npz file
+
+    All boxes, confidences and class ids are concatenated into flat arrays and
+    an offsets array marks where each image starts, so thousands of images load
+    with a handful of array reads instead of parsing JSON. Time extraction can
+    then be re-run over a whole run without touching the model.
+    """
+
+    def __init__(self):
+        self._index = {}
+        self._image_names = []
+        self._xyxy = []
+        self._conf = []
+        self._cls = []
+        self.names = {}
+
+    def __len__(self):
+        return len(self._image_names)
+
+    def __contains__(self, image_name):
+        return image_name in self._index
+
+    def image_names(self):
+        return list(self._image_names)
+
+    def add(self, image_name, image_detections):
+        """
+        Add (or replace) the detections of one image
+
+        Args:
+            image_name (str): Image identifier
+            image_detections (Detections or list): Detections of that image
+        """
+        image_detections = Detections.from_list(image_detections)
+        self.names.update(image_detections.names)
+
+        if image_name in self._index:
+            position = self._index[image_name]
+            self._xyxy[position] = image_detections.xyxy
+            self._conf[position] = image_detections.conf
+            self._cls[position] = image_detections.cls
+            return
+
+        self._index[image_name] = len(self._image_names)
+        self._image_names.append(image_name)
+        self._xyxy.append(image_detections.xyxy)
+        self._conf.append(image_detections.conf)
+        self._cls.append(image_detections.cls)
+
+    def get(self, image_name):
+        """Detections of one image shaped like run_detection's output, or None"""
+        position = self._index.get(image_name)
+        if position is None:
+            return None
+        return [Detections(self._xyxy[position], self._conf[position], self._cls[position], self.names)]
+
+    def items(self):
+        for image_name in self._image_names:
+            yield image_name, self.get(image_name)
+
+    def save(self, path):
+        """
+        Write the store to an uncompressed .npz file
+
+        np.savez appends .npz to any other path, so the extension is added
+        here and the path actually written is returned.
+
+        Returns:
+            str: Path of the written file
+        """
+        if not path.endswith('.npz'):
+            path += '.npz'
+        counts = np.array([len(conf) for conf in self._conf], dtype=np.int64)
+        offsets = np.concatenate(([0], np.cumsum(counts)))
+        class_ids = np.array(sorted(self.names), dtype=np.int64)
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        np.savez(
+            path,
+            image_names=np.array(self._image_names, dtype=str),
+            offsets=offsets,
+            xyxy=np.concatenate(self._xyxy) if self._xyxy else np.empty((0, 4), dtype=np.float32),
+            conf=np.concatenate(self._conf) if self._conf else np.empty(0, dtype=np.float32),
+            cls=np.concatenate(self._cls) if self._cls else np.empty(0, dtype=np.int64),
+            class_ids=class_ids,
+            class_names=np.array([self.names[i] for i in class_ids], dtype=str),
+        )
+        return path
+
+    @classmethod
+    def load(cls, path):
+        """Read a store written by save()"""
+        store = cls()
+        with np.load(path, allow_pickle=False) as data:
+            image_names = data['image_names'].tolist()
+            offsets = data['offsets']
+            xyxy = data['xyxy']
+            conf = data['conf']
+            classes = data['cls']
+            store.names = dict(zip(data['class_ids'].tolist(), data['class_names'].tolist()))
+
+        # Per-image entries are views into the flat arrays, nothing is copied
+        for position, image_name in enumerate(image_names):
+            start, end = offsets[position], offsets[position + 1]
+            store._index[image_name] = position
+            store._image_names.append(image_name)
+            store._xyxy.append(xyxy[start:end])
+            store._conf.append(conf[start:end])
+            store._cls.append(classes[start:end])
+        return store
+
+    @classmethod
+    def from_directory(cls, directory):
+        """Collect the per-image files in results/detections (JSON or .npz) into one store"""
+        store = cls()
+        for filename in sorted(os.listdir(directory)):
+            name, ext = os.path.splitext(filename)
+            path = os.path.join(directory, filename)
+            if ext == '.npz':
+                detections = load_detections_npz(path)
+            elif ext == '.json':
+                with open(path, 'r') as f:
+                    detections = json.load(f)
+            else:
+                continue
+            image_name = name[:-len('_detection')] if name.endswith('_detection') else name
+            if detections:
+                store.add(image_name, detections[0])
+        return store
+
+    def batch(self):
+        """(boxes, confidences, class_ids) per image, ready for clock_geometry.batch_clock_times"""
+        return list(zip(self._xyxy, self._conf, self._cls))
+
+    def clock_times(self):
+        """Clock time of every stored image, computed without running the model"""
+        return self.image_names(), batch_clock_times(self.batch(), self.names)
+
+
+def save_detections_npz(path, detections, image_name="image"):
+    """Save run_detection output for one image as a single-entry .npz store, returning the path written"""
+    store = DetectionStore()
+    for position, image_detections in enumerate(detections):
+        store.add(image_name if position == 0 else f"{image_name}_{position}", image_detections)
+    return store.save(path)
+
+
+def load_detections_npz(path):
+    """Load a .npz store as a run_detection-style list of Detections"""
+    store = DetectionStore.load(path)
+    return [store.get(image_name)[0] for image_name in store.image_names()]
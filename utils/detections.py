@@ -0,0 +1,136 @@
+import numpy as np
+
+
+class Detections:
+    """
+    Detections of one image stored as contiguous NumPy arrays
+
+    Behaves like the legacy list of {'box', 'confidence', 'class_id', 'class_name'}
+    dicts (len, indexing, iteration), but the dicts are only built if someone
+    asks for them. The best detection of each class is found once, vectorized,
+    and looked up in O(1) afterwards.
+    """
+
+    __slots__ = ('xyxy', 'conf', 'cls', 'names', '_best', '_dicts')
+
+    def __init__(self, xyxy, conf, cls, names=None):
+        """
+        Args:
+            xyxy (np.ndarray): (N, 4) boxes as [x_min, y_min, x_max, y_max]
+            conf (np.ndarray): (N,) confidences
+            cls (np.ndarray): (N,) class ids
+            names (dict, optional): Class id -> class name
+        """
+        self.xyxy = np.ascontiguousarray(xyxy, dtype=np.float32).reshape(-1, 4)
+        self.conf = np.ascontiguousarray(conf, dtype=np.float32).reshape(-1)
+        self.cls = np.ascontiguousarray(cls, dtype=np.int64).reshape(-1)
+        self.names = dict(names) if names else {}
+        self._best = None
+        self._dicts = None
+
+    @classmethod
+    def from_result(cls, result):
+        """Build from an ultralytics Results object"""
+        boxes = result.boxes
+        classes = boxes.cls.cpu().numpy()
+        if hasattr(result.names, 'items'):
+            names = {int(k): v for k, v in result.names.items()}
+        else:
+            names = {int(cls_id): str(cls_id) for cls_id in np.unique(classes)}
+        return cls(boxes.xyxy.cpu().numpy(), boxes.conf.cpu().numpy(), classes, names)
+
+    @classmethod
+    def from_list(cls, image_detections):
+        """Build from the legacy list-of-dicts format"""
+        if isinstance(image_detections, Detections):
+            return image_detections
+        names = {int(d['class_id']): d['class_name'] for d in image_detections}
+        return cls(
+            np.array([d['box'] for d in image_detections], dtype=np.float32).reshape(-1, 4),
+            np.array([d['confidence'] for d in image_detections], dtype=np.float32),
+            np.array([d['class_id'] for d in image_detections], dtype=np.int64),
+            names,
+        )
+
+    def copy(self):
+        """Independent copy, changes to it (or to its dict view) never reach this one"""
+        return Detections(self.xyxy.copy(), self.conf.copy(), self.cls.copy(), self.names)
+
+    def __len__(self):
+        return len(self.conf)
+
+    def __getitem__(self, index):
+        return self.to_list()[index]
+
+    def __iter__(self):
+        return iter(self.to_list())
+
+    def __repr__(self):
+        return f"Detections(n={len(self)}, classes={sorted(set(self.class_names()))})"
+
+    def class_name(self, class_id):
+        return self.names.get(int(class_id), "unknown")
+
+    def class_names(self):
+        """Class name of every detection"""
+        return [self.class_name(class_id) for class_id in self.cls]
+
+    def _detection(self, index):
+        """Single legacy dict, without building the whole list view"""
+        if self._dicts is not None:
+            return self._dicts[index]
+        cls_id = int(self.cls[index])
+        return {
+            'box': self.xyxy[index].tolist(),
+            'confidence': float(self.conf[index]),
+            'class_id': cls_id,
+            'class_name': self.class_name(cls_id),
+        }
+
+    def to_list(self):
+        """Legacy list-of-dicts view, built once on first use"""
+        if self._dicts is None:
+            self._dicts = [
+                {
+                    'box': box,  # [x_min, y_min, x_max, y_max]
+                    'confidence': score,
+                    'class_id': cls_id,
+                    'class_name': self.class_name(cls_id),
+                }
+                for box, score, cls_id in zip(self.xyxy.tolist(), self.conf.tolist(), self.cls.tolist())
+            ]
+        return self._dicts
+
+    def _best_indices(self):
+        """Index of the highest-confidence detection per class name (ties keep the first)"""
+        if self._best is None:
+            best = {}
+            if len(self):
+                order = np.lexsort((-np.arange(len(self)), self.conf, self.cls))
+                sorted_cls = self.cls[order]
+                last_in_group = np.append(sorted_cls[1:] != sorted_cls[:-1], True)
+                for index in order[last_in_group].tolist():
+                    name = self.class_name(self.cls[index])
+                    # Different ids may share a name, keep the most confident
+                    if name not in best or self.conf[index] > self.conf[best[name]]:
+                        best[name] = index
+            self._best = best
+        return self._best
+
+    def best_index(self, class_name):
+        """Index of the most confident detection of class_name, or None"""
+        return self._best_indices().get(class_name)
+
+    def best(self, class_name):
+        """Most confident detection of class_name as a dict, or None"""
+        index = self.best_index(class_name)
+        return None if index is None else self._detection(index)
+
+    def best_by_class(self):
+        """{class_name: most confident detection dict}"""
+        return {name: self._detection(index) for name, index in self._best_indices().items()}
+
+    def mask(self, class_names):
+        """Boolean mask of the detections whose class is in class_names"""
+        class_ids = [cls_id for cls_id, name in self.names.items() if name in set(class_names)]
+        return np.isin(self.cls, class_ids)
@@ -1,30 +1,27 @@
 import os
-import re
 import json
-from ultralytics import YOLO
 import cv2
-import numpy as np
-import torch
+from utils.detections import Detections
+from utils.detection_store import save_detections_npz, load_detections_npz
+from utils.inference_cache import get_inference_cache, hash_image
+from utils.model_registry import get_latest_train_dir, get_model, inference_lock, model_fingerprint
+
+
+def result_to_detections(result):
+    """
+    Convert a single YOLO result into a Detections container
+
+    Args:
+        result (Results or Detections): Ultralytics prediction result for one image
+            (the ONNX backend already returns Detections)
+
+    Returns:
+        Detections: Detections for the image (iterates like the legacy list of dicts)
+    """
+    if isinstance(result, Detections):
+        return result
+    return Detections.from_result(result)
 
-def get_latest_train_dir(base_path="runs/detect"):
-    """Find the most recent training directory (train, train1, train2, etc.)"""
-    if not os.path.exists(base_path):
-        raise FileNotFoundError(f"Directory {base_path} does not exist")
-    
-    train_dirs = [d for d in os.listdir(base_path) 
-                  if os.path.isdir(os.path.join(base_path, d)) and d.startswith('train')]
-    
-    if not train_dirs:
-        raise FileNotFoundError("No 'train' directory found")
-    
-    def get_train_number(dirname):
-        match = re.search(r'train(\d+)?$', dirname)
-        if not match or not match.group(1):
-            return -1
-        return int(match.group(1))
-    
-    latest_train = max(train_dirs, key=get_train_number)
-    return os.path.join(base_path, latest_train)
 
 def run_detection(
     image_path=None,
@@ -36,6 +33,11 @@ def run_detection(
     image=None,
     save_visualization=True,
     return_prediction_results=False,
+    device=None,
+    image_name=None,
+    cache=None,
+    backend=None,
+    imgsz=None,
 ):
     """
     Run object detection on an image without Non-Maximum Suppression
@@ -44,7 +46,16 @@ def run_detection(
         image_path (str): Path to the input image
         model_path (str, optional): Path to the YOLO model weights
         confidence (float, optional): Initial confidence threshold
-        save_path (str, optional): Path to save detection results JSON
+        save_path (str, optional): Path to save detection results (.npz binary, or .json)
+        model (YOLO, optional): Already loaded model, defaults to the shared registry model
+        device (str, optional): Inference device used when loading from the registry
+        image_name (str, optional): Name used for saved outputs, defaults to the image_path basename
+        cache (InferenceCache or bool, optional): Inference cache, defaults to the process-wide one
+            (if enabled); False disables it. Not used when YOLO results are needed for
+            save_visualization or return_prediction_results.
+        backend (str, optional): 'torch' or 'onnx' model from the registry, see model_registry.get_model.
+            With 'onnx', return_prediction_results gives Detections instead of YOLO results.
+        imgsz (int, optional): Inference size in pixels (a multiple of 32), defaults to the model's own
 
     Returns:
         list: Detections from the image
@@ -54,91 +65,83 @@ def run_detection(
         raise ValueError("Either 'image_path' or 'image' must be provided for detection.")
 
     if model is None:
-        if not model_path:
-            env_model = os.environ.get("MODEL_PATH")
-            if env_model and os.path.exists(env_model):
-                model_path = env_model
-            else:
-                weights_dir = os.path.join(get_latest_train_dir(), "weights")
-                safetensors_path = os.path.join(weights_dir, "best.safetensors")
-                pt_path = os.path.join(weights_dir, "best.pt")
-                model_path = safetensors_path if os.path.exists(safetensors_path) else pt_path
-        model = YOLO(model_path)
+        model = get_model(model_path, device=device, backend=backend)
 
     # Default save path if not specified
-    image_identifier = (
-        os.path.splitext(os.path.basename(image_path))[0]
-        if image_path
-        else "uploaded_image"
-    )
+    if image_name:
+        image_identifier = image_name
+    elif image_path:
+        image_identifier = os.path.splitext(os.path.basename(image_path))[0]
+    else:
+        image_identifier = "uploaded_image"
+
     if not save_path and image_path:
-        save_path = os.path.join('results/detections', f'{image_identifier}_detection.json')
+        save_path = os.path.join('results/detections', f'{image_identifier}_detection.npz')
 
     # Ensure detections directory exists
     if save_path:
-        os.makedirs(os.path.dirname(save_path), exist_ok=True)
-    if save_visualization and image_path:
+        os.makedirs(os.path.dirname(save_path) or '.', exist_ok=True)
+    if save_visualization:
         os.makedirs('results/image_detections', exist_ok=True)
 
     # Determine prediction source
     source = image if image is not None else image_path
 
-    # Run detection
-    results = model.predict(
-        source=source,
-        save=save_visualization,
-        save_txt=False,
-        conf=confidence,
-        max_det=50,
-        verbose=False,
-    )
-
-    # Convert detections to list format
-    detections = []
-    for result in results:
-        # Extract raw detections
-        boxes = result.boxes.xyxy.cpu().numpy()
-        confidences = result.boxes.conf.cpu().numpy()
-        classes = result.boxes.cls.cpu().numpy()
-
-        # Get class names
-        if hasattr(result.names, 'items'):
-            class_names = {int(k): v for k, v in result.names.items()}
-        else:
-            class_names = {int(cls_id): str(cls_id) for cls_id in np.unique(classes)}
-
-        # Create list of detections for this image
-        image_detections = []
-        for box, score, cls_id in zip(boxes, confidences, classes):
-            cls_name = class_names.get(int(cls_id), "unknown")
-            detection = {
-                'box': box.tolist(),  # [x_min, y_min, x_max, y_max]
-                'confidence': float(score),
-                'class_id': int(cls_id),
-                'class_name': cls_name
-            }
-            image_detections.append(detection)
-
-        detections.append(image_detections)
+    # Serve repeated images from the inference cache
+    if cache is None:
+        cache = get_inference_cache()
+    cache_key = None
+    if cache and not save_visualization and not return_prediction_results:
+        cache_key = cache.make_key(hash_image(image, image_path), model_fingerprint(model), confidence, imgsz)
+
+    detections = cache.get(cache_key) if cache_key else None
+    results = None
+    if detections is None:
+        # Run detection
+        with inference_lock(model):
+            results = model.predict(
+                source=source,
+                save=save_visualization,
+                save_txt=False,
+                conf=confidence,
+                max_det=50,
+                device=device,
+                verbose=False,
+                **({'imgsz': imgsz} if imgsz else {}),
+            )
+
+        # Convert detections to list format
+        detections = [result_to_detections(result) for result in results]
+        if cache_key:
+            cache.put(cache_key, detections)
 
     # Create a visualization only for detections with confidence > 0.1
     if save_visualization and results:
-        filtered_results = results.copy()
+        if isinstance(results[0], Detections):
+            # ONNX backend, there is no ultralytics result to plot
+            res_plotted = plot_detections(
+                image if image is not None else cv2.imread(image_path), detections[0], min_confidence=0.1
+            )
+        else:
+            filtered_results = results.copy()
 
-        # Filtred results with confidence > 0.1
-        filtered_results[0].boxes = filtered_results[0].boxes[filtered_results[0].boxes.conf > 0.1]
+            # Filtred results with confidence > 0.1
+            filtered_results[0].boxes = filtered_results[0].boxes[filtered_results[0].boxes.conf > 0.1]
 
-        # Plot the detections
-        res_plotted = filtered_results[0].plot()
+            # Plot the detections
+            res_plotted = filtered_results[0].plot()
 
         output_path = f"results/image_detections/{image_identifier}_detection.jpg"
         cv2.imwrite(output_path, res_plotted)
         print(f"Imagem salva com as detecções em: results/image_detections/{image_identifier}")
 
-    # Save to JSON file
+    # Save to a binary .npz file (or compact JSON if a .json path was requested)
     if save_path:
-        with open(save_path, 'w') as f:
-            json.dump(detections, f, indent=4)
+        if save_path.endswith('.json'):
+            with open(save_path, 'w') as f:
+                json.dump([image_detections.to_list() for image_detections in detections], f)
+        else:
+            save_path = save_detections_npz(save_path, detections, image_identifier)
 
         print(f"Detections saved to: {save_path}")
 
@@ -148,18 +151,134 @@ def run_detection(
     return detections
 
 
+def average_confidence(detections):
+    """Average confidence over the clock element detections of one image"""
+    detection_classes = ['hours', 'minutes', 'seconds', 'center', '12']
+    image_detections = Detections.from_list(detections[0])
+    confidence_scores = image_detections.conf[image_detections.mask(detection_classes)]
+    return float(confidence_scores.mean()) if confidence_scores.size else 0
+
+
+_BOX_COLORS = [(56, 56, 255), (151, 157, 255), (31, 112, 255), (29, 178, 255), (49, 210, 207), (10, 249, 72)]
+
+
+def plot_detections(image, image_detections, min_confidence=0.0):
+    """
+    Draw labelled detection boxes on a copy of a BGR image
+
+    Args:
+        image (np.ndarray): BGR image
+        image_detections (Detections or list): Detections of that image
+        min_confidence (float, optional): Boxes below this confidence are not drawn
+
+    Returns:
+        np.ndarray: Annotated copy of the image
+    """
+    annotated = image.copy()
+    line_width = max(round(sum(annotated.shape[:2]) / 2 * 0.003), 2)
+    for detection in image_detections:
+        if detection['confidence'] < min_confidence:
+            continue
+        x1, y1, x2, y2 = (int(v) for v in detection['box'])
+        color = _BOX_COLORS[detection['class_id'] % len(_BOX_COLORS)]
+        label = f"{detection['class_name']} {detection['confidence']:.2f}"
+        cv2.rectangle(annotated, (x1, y1), (x2, y2), color, line_width)
+        cv2.putText(
+            annotated,
+            label,
+            (x1, max(y1 - 4, 12)),
+            cv2.FONT_HERSHEY_SIMPLEX,
+            line_width / 3,
+            color,
+            max(line_width - 1, 1),
+        )
+    return annotated
+
+
+def run_batch_detection(
+    images,
+    model_path=None,
+    confidence=0.01,
+    model=None,
+    batch_size=8,
+    device=None,
+    cache=None,
+    backend=None,
+    speeds=None,
+):
+    """
+    Run object detection on many in-memory images, batch_size images per forward pass
+
+    Args:
+        images (list): Decoded BGR images (numpy arrays)
+        model_path (str, optional): Path to the YOLO model weights
+        confidence (float, optional): Confidence threshold
+        model (YOLO, optional): Already loaded model, defaults to the shared registry model
+        batch_size (int, optional): Number of images stacked into each model.predict call
+        device (str, optional): Inference device used when loading from the registry
+        cache (InferenceCache or bool, optional): Inference cache, defaults to the process-wide one
+            (if enabled); False disables it. Only cache misses reach the model.
+        backend (str, optional): 'torch' or 'onnx' model from the registry, see model_registry.get_model
+        speeds (list, optional): Receives the preprocess/inference/postprocess milliseconds of every
+            image that went through the model (cache hits are not included)
+
+    Returns:
+        list: One entry per image, each shaped like run_detection's output
+            (a single-element list holding that image's detections)
+    """
+    if model is None:
+        model = get_model(model_path, device=device, backend=backend)
+
+    if cache is None:
+        cache = get_inference_cache()
+
+    detections = [None] * len(images)
+    cache_keys = [None] * len(images)
+    if cache:
+        fingerprint = model_fingerprint(model)
+        for index, image in enumerate(images):
+            cache_keys[index] = cache.make_key(hash_image(image), fingerprint, confidence)
+            detections[index] = cache.get(cache_keys[index])
+    pending = [index for index, image_detections in enumerate(detections) if image_detections is None]
+
+    batch_size = max(1, int(batch_size))
+    for start in range(0, len(pending), batch_size):
+        batch_indices = pending[start:start + batch_size]
+        with inference_lock(model):
+            results = model.predict(
+                source=[images[index] for index in batch_indices],
+                save=False,
+                save_txt=False,
+                conf=confidence,
+                max_det=50,
+                device=device,
+                verbose=False,
+            )
+            if speeds is not None:
+                # Ultralytics results carry their own timings, the ONNX detector keeps them on the model
+                speeds.extend(getattr(result, 'speed', None) or dict(model.speed) for result in results)
+        for index, result in zip(batch_indices, results):
+            detections[index] = [result_to_detections(result)]
+            if cache_keys[index]:
+                cache.put(cache_keys[index], detections[index])
+
+    return detections
+
 
 def load_detections(input_file):
     """
-    Load detections from a JSON file
+    Load detections from a .npz or JSON file
     
     Args:
-        input_file (str): Path to the JSON detection file
+        input_file (str): Path to the detection file
         
     Returns:
-        list: Loaded detections
+        list: Loaded detections, one Detections container per image
     """
+    if input_file.endswith('.npz'):
+        return load_detections_npz(input_file)
+
     with open(input_file, 'r') as f:
         detections = json.load(f)
-    return detections
+    return [Detections.from_list(image_detections) for image_detections in detections]
 
@@ -0,0 +1,152 @@
+import os
+import csv
+import time
+
+import cv2
+import numpy as np
+
+from utils.clock_utils import format_predicted_time, process_clock_time, process_clock_with_zoom
+from utils.detections_utils import run_detection
+from utils.model_registry import get_model
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp', '.tiff')
+
+
+def time_to_seconds(time_str):
+    """Seconds since 00:00:00 of an hh:mm[:ss] string"""
+    parts = time_str.split(':')
+    return int(parts[0]) * 3600 + int(parts[1]) * 60 + (int(parts[2]) if len(parts) > 2 else 0)
+
+
+def time_deviation(predicted_time, ground_truth_time):
+    """
+    Absolute difference in seconds between a predicted and a ground truth time
+
+    Returns:
+        int or None: Deviation, or None if the prediction failed or a time cannot be parsed
+    """
+    if predicted_time == "failed" or predicted_time is None or ground_truth_time is None:
+        return None
+    try:
+        return abs(time_to_seconds(predicted_time) - time_to_seconds(ground_truth_time))
+    except (ValueError, IndexError):
+        return None
+
+
+def load_ground_truths(ground_truth_path):
+    """{watch name: hh:mm:ss} from a ground truth CSV with Watch,Time columns"""
+    with open(ground_truth_path, mode='r', newline='') as f:
+        csv_reader = csv.reader(f)
+        next(csv_reader, None)  # Skip header
+        return {row[0]: row[1] for row in csv_reader if len(row) >= 2}
+
+
+def read_image_time(image, model=None, confidence=0.01, fallback=True):
+    """
+    Predicted time of one image with the same pipeline as the desktop app, timing each stage
+
+    Stages (milliseconds): detection, the model's own preprocess/inference/
+    postprocess split when it reports one, time_extraction and, only when
+    it runs, fallback.
+
+    Args:
+        image (np.ndarray): BGR image
+        model (YOLO or OnnxDetector, optional): Defaults to the shared registry model
+        confidence (float): Detection confidence threshold
+        fallback (bool): Retry on the zoomed clock circle when the full image cannot be read
+
+    Returns:
+        tuple: (hh:mm:00 reading or "failed", {stage: milliseconds}, whether the fallback ran)
+    """
+    model = model if model is not None else get_model()
+    timings = {}
+
+    started = time.perf_counter()
+    detections, results = run_detection(
+        image=image,
+        model=model,
+        confidence=confidence,
+        save_visualization=False,
+        return_prediction_results=True,
+        cache=False,
+    )
+    timings['detection'] = (time.perf_counter() - started) * 1000
+    # Ultralytics results carry their own stage split, the ONNX detector keeps it on the model
+    speed = (getattr(results[0], 'speed', None) if results else None) or getattr(model, 'speed', None)
+    for stage in ('preprocess', 'inference', 'postprocess'):
+        if speed and speed.get(stage) is not None:
+            timings[stage] = speed[stage]
+
+    started = time.perf_counter()
+    result = process_clock_time(detections, "evaluation")
+    timings['time_extraction'] = (time.perf_counter() - started) * 1000
+
+    fallback_used = result is None and fallback
+    if fallback_used:
+        started = time.perf_counter()
+        zoomed = process_clock_with_zoom(image, detections, confidence, model=model)
+        timings['fallback'] = (time.perf_counter() - started) * 1000
+        if zoomed:
+            result = zoomed[1]
+    return format_predicted_time(result), timings, fallback_used
+
+
+def predict_image_time(image, model=None, confidence=0.01):
+    """
+    Predicted time of one image with the same pipeline as the desktop app (zoom fallback included)
+
+    Returns:
+        str: hh:mm:00 reading, or "failed"
+    """
+    return read_image_time(image, model, confidence)[0]
+
+
+def evaluate_model(model=None, image_dir='test_set', ground_truth_path='ground_truths/ground_truths_test.csv', confidence=0.01):
+    """
+    Run the clock-time evaluation of a model over a labelled image folder
+
+    Args:
+        model (YOLO or OnnxDetector, optional): Model to evaluate, defaults to the shared registry model
+        image_dir (str): Folder with the test images
+        ground_truth_path (str): CSV with the ground truth time of each image
+        confidence (float): Confidence threshold
+
+    Returns:
+        dict: Number of images, failures, mean/median deviation in seconds (over
+            the images that produced a time), mean latency and per-image predictions
+    """
+    ground_truths = load_ground_truths(ground_truth_path)
+    predictions = {}
+    deviations = []
+    failed = 0
+    elapsed = 0.0
+
+    for filename in sorted(os.listdir(image_dir)):
+        image_name, ext = os.path.splitext(filename)
+        if ext.lower() not in IMAGE_EXTENSIONS or image_name not in ground_truths:
+            continue
+        image = cv2.imread(os.path.join(image_dir, filename))
+        if image is None:
+            continue
+
+        started = time.perf_counter()
+        predicted_time = predict_image_time(image, model, confidence)
+        elapsed += time.perf_counter() - started
+
+        predictions[image_name] = predicted_time
+        deviation = time_deviation(predicted_time, ground_truths[image_name])
+        if deviation is None:
+            failed += 1
+        else:
+            deviations.append(deviation)
+
+    images = len(predictions)
+    return {
+        'images': images,
+        'failed': failed,
+        'failure_rate': failed / images if images else 0.0,
+        'mean_deviation': float(np.mean(deviations)) if deviations else None,
+        'median_deviation': float(np.median(deviations)) if deviations else None,
+        'mean_latency_ms': elapsed / images * 1000 if images else None,
+        'predictions': predictions,
+    }
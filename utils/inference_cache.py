@@ -0,0 +1,154 @@
+import os
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from utils.detection_store import save_detections_npz, load_detections_npz
+from utils.detections import Detections
+
+_DEFAULT_CACHE = None
+_DEFAULT_CACHE_CONFIGURED = False
+_DEFAULT_CACHE_LOCK = threading.Lock()
+
+
+def _copy_detections(detections):
+    """Fresh Detections for every image, so callers never share (and mutate) a cached entry"""
+    return [Detections.from_list(image_detections).copy() for image_detections in detections]
+
+
+def hash_image(image=None, image_path=None):
+    """Content hash of a decoded image array, or of the raw file bytes if only a path is given"""
+    digest = hashlib.blake2b(digest_size=20)
+    if image is not None:
+        image = np.ascontiguousarray(image)
+        digest.update(f"{image.shape}|{image.dtype}|".encode())
+        digest.update(memoryview(image).cast('B'))
+    else:
+        with open(image_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+    return digest.hexdigest()
+
+
+class InferenceCache:
+    """
+    Raw detections keyed by image content hash + model fingerprint + confidence
+
+    A bounded in-memory LRU tier sits in front of an optional on-disk tier of
+    .npz files, so re-uploads of the same photo skip inference entirely.
+    Entries are copied on the way in and on the way out, callers are free to
+    modify what they get.
+    """
+
+    def __init__(self, max_entries=256, cache_dir=None):
+        """
+        Args:
+            max_entries (int): Entries kept in memory before the least recently used is evicted
+            cache_dir (str, optional): Directory for the on-disk tier, disabled if None
+        """
+        self.max_entries = max(1, int(max_entries))
+        self.cache_dir = cache_dir
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(image_hash, model_fingerprint, confidence, imgsz=None):
+        # Inference at the model's own size keeps the key it always had
+        size = f"|{int(imgsz)}" if imgsz else ""
+        return hashlib.blake2b(
+            f"{image_hash}|{model_fingerprint}|{float(confidence)!r}{size}".encode(), digest_size=20
+        ).hexdigest()
+
+    def _disk_path(self, key):
+        return os.path.join(self.cache_dir, key[:2], f"{key}.npz")
+
+    def get(self, key):
+        """Cached detections (run_detection-shaped list) or None"""
+        with self._lock:
+            detections = self._entries.get(key)
+            if detections is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return _copy_detections(detections)
+
+        if self.cache_dir:
+            path = self._disk_path(key)
+            if os.path.exists(path):
+                try:
+                    detections = load_detections_npz(path)
+                except (OSError, ValueError, KeyError) as e:
+                    print(f"Ignoring unreadable cache entry {path}: {e}")
+                else:
+                    self._remember(key, detections)
+                    with self._lock:
+                        self.hits += 1
+                    return _copy_detections(detections)
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key, detections):
+        """Store detections in memory and, if enabled, on disk"""
+        self._remember(key, detections)
+
+        if self.cache_dir:
+            path = self._disk_path(key)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write next to the final file and rename, readers never see partial files
+            temp_path = f"{path[:-len('.npz')]}.{os.getpid()}.{threading.get_ident()}.tmp.npz"
+            try:
+                save_detections_npz(temp_path, detections)
+                os.replace(temp_path, path)
+            except OSError as e:
+                print(f"Could not write cache entry {path}: {e}")
+
+    def _remember(self, key, detections):
+        detections = _copy_detections(detections)
+        with self._lock:
+            self._entries[key] = detections
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+def configure_inference_cache(max_entries=256, cache_dir=None):
+    """
+    Set the process-wide cache used by run_detection (max_entries=0 disables it)
+
+    Returns:
+        InferenceCache or None: The new default cache
+    """
+    global _DEFAULT_CACHE, _DEFAULT_CACHE_CONFIGURED
+    with _DEFAULT_CACHE_LOCK:
+        _DEFAULT_CACHE = InferenceCache(max_entries, cache_dir) if max_entries else None
+        _DEFAULT_CACHE_CONFIGURED = True
+    return _DEFAULT_CACHE
+
+
+def get_inference_cache():
+    """
+    Process-wide cache, None when disabled
+
+    Unless configure_inference_cache was called, it is configured from the
+    INFERENCE_CACHE_SIZE (entries, 0/unset disables) and INFERENCE_CACHE_DIR
+    environment variables.
+    """
+    if not _DEFAULT_CACHE_CONFIGURED:
+        configure_inference_cache(
+            int(os.environ.get("INFERENCE_CACHE_SIZE", 0)),
+            os.environ.get("INFERENCE_CACHE_DIR") or None,
+        )
+    return _DEFAULT_CACHE
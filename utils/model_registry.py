@@ -0,0 +1,158 @@
+import os
+import re
+import threading
+from contextlib import nullcontext
+from functools import lru_cache
+
+import numpy as np
+
+from utils.onnx_backend import OnnxDetector, export_onnx
+
+INFERENCE_BACKENDS = ('torch', 'onnx')
+
+# Loaded models keyed by (resolved weight path, device, backend)
+_MODELS = {}
+# One inference lock per loaded model, YOLO predictors are not thread-safe
+_INFERENCE_LOCKS = {}
+# Identity of the weights behind each loaded model, used by the inference cache
+_FINGERPRINTS = {}
+_REGISTRY_LOCK = threading.Lock()
+
+
+def get_latest_train_dir(base_path="runs/detect"):
+    """Find the most recent training directory (train, train1, train2, etc.)"""
+    if not os.path.exists(base_path):
+        raise FileNotFoundError(f"Directory {base_path} does not exist")
+
+    train_dirs = [d for d in os.listdir(base_path)
+                  if os.path.isdir(os.path.join(base_path, d)) and d.startswith('train')]
+
+    if not train_dirs:
+        raise FileNotFoundError("No 'train' directory found")
+
+    def get_train_number(dirname):
+        match = re.search(r'train(\d+)?$', dirname)
+        if not match or not match.group(1):
+            return -1
+        return int(match.group(1))
+
+    latest_train = max(train_dirs, key=get_train_number)
+    return os.path.join(base_path, latest_train)
+
+
+@lru_cache(maxsize=None)
+def _default_model_path():
+    """Resolve the default weights once per process (MODEL_PATH or latest train run)"""
+    env_model = os.environ.get("MODEL_PATH")
+    if env_model and os.path.exists(env_model):
+        return env_model
+
+    weights_dir = os.path.join(get_latest_train_dir(), "weights")
+    safetensors_path = os.path.join(weights_dir, "best.safetensors")
+    pt_path = os.path.join(weights_dir, "best.pt")
+    return safetensors_path if os.path.exists(safetensors_path) else pt_path
+
+
+def resolve_model_path(model_path=None):
+    """
+    Resolve the weights file to load
+
+    Args:
+        model_path (str, optional): Explicit path to the YOLO model weights
+
+    Returns:
+        str: Absolute path to the weights file
+    """
+    return os.path.abspath(model_path or _default_model_path())
+
+
+def get_model(model_path=None, device=None, warmup=True, backend=None, threads=None):
+    """
+    Return a shared YOLO model, loading it on first use
+
+    Models are cached per process and keyed by resolved weight path, device
+    and backend, so every caller (API, desktop app, Gradio demo, zoom
+    fallback) shares the same instance.
+
+    Args:
+        model_path (str, optional): Path to the YOLO model weights
+        device (str, optional): Inference device (e.g. 'cpu', '0')
+        warmup (bool, optional): Run a dummy inference after loading
+        backend (str, optional): 'torch' (ultralytics) or 'onnx' (ONNX Runtime), defaults to
+            'onnx' for .onnx weights, else the INFERENCE_BACKEND environment variable or 'torch'
+        threads (int, optional): ONNX Runtime intra-op threads, only used when the model is first loaded
+
+    Returns:
+        YOLO or OnnxDetector: Loaded model
+    """
+    weights_path = resolve_model_path(model_path)
+    # Exported .onnx files (e.g. the quantized model) can only run on ONNX Runtime
+    if backend is None and weights_path.endswith('.onnx'):
+        backend = 'onnx'
+    backend = resolve_backend(backend)
+    key = (weights_path, device, backend)
+
+    model = _MODELS.get(key)
+    if model is not None:
+        return model
+
+    with _REGISTRY_LOCK:
+        # Another thread may have loaded it while we were waiting
+        model = _MODELS.get(key)
+        if model is None:
+            if backend == 'onnx':
+                weights_path = key[0] if key[0].endswith('.onnx') else export_onnx(key[0])
+                model = OnnxDetector(weights_path, device=device, threads=threads)
+            else:
+                # Imported on first load, importing torch/ultralytics takes seconds
+                from ultralytics import YOLO
+
+                weights_path = key[0]
+                model = YOLO(weights_path)
+                # ONNX Runtime sessions can run concurrently, YOLO predictors cannot
+                _INFERENCE_LOCKS[id(model)] = threading.Lock()
+            if warmup:
+                dummy = np.zeros((640, 640, 3), dtype=np.uint8)
+                model.predict(source=dummy, device=device, save=False, verbose=False)
+            _FINGERPRINTS[id(model)] = weights_fingerprint(weights_path)
+            _MODELS[key] = model
+    return model
+
+
+def resolve_backend(backend=None):
+    """Inference backend to use, 'torch' unless set explicitly or via INFERENCE_BACKEND"""
+    backend = (backend or os.environ.get("INFERENCE_BACKEND") or 'torch').lower()
+    if backend not in INFERENCE_BACKENDS:
+        raise ValueError(f"Unknown inference backend '{backend}', expected one of {INFERENCE_BACKENDS}")
+    return backend
+
+
+def inference_lock(model):
+    """Lock guarding inference on a registry model (no-op for unregistered models)"""
+    return _INFERENCE_LOCKS.get(id(model)) or nullcontext()
+
+
+def weights_fingerprint(weights_path):
+    """Path, size and modification time of a weights file, changes whenever it is retrained"""
+    stat = os.stat(weights_path)
+    return f"{os.path.abspath(weights_path)}|{stat.st_size}|{stat.st_mtime_ns}"
+
+
+def model_fingerprint(model):
+    """Fingerprint of the weights behind a model, falling back to its checkpoint path or identity"""
+    fingerprint = _FINGERPRINTS.get(id(model))
+    if fingerprint:
+        return fingerprint
+    ckpt_path = getattr(model, 'ckpt_path', None)
+    if ckpt_path and os.path.exists(ckpt_path):
+        return weights_fingerprint(ckpt_path)
+    return f"model-{id(model)}"
+
+
+def clear_models():
+    """Drop every cached model (e.g. after retraining)"""
+    with _REGISTRY_LOCK:
+        _MODELS.clear()
+        _INFERENCE_LOCKS.clear()
+        _FINGERPRINTS.clear()
+        _default_model_path.cache_clear()
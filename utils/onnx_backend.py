@@ -0,0 +1,190 @@
+import os
+import ast
+import time
+import shutil
+import tempfile
+
+import cv2
+import numpy as np
+
+from utils.detections import Detections
+
+
+def export_onnx(weights_path, imgsz=640):
+    """
+    Export YOLO weights to ONNX once, next to the weights file
+
+    The export is reused as long as it is newer than the weights, so only
+    the first call after (re)training pays for it. It is written in a
+    temporary folder and moved into place, so concurrent processes never
+    load a half-written file.
+
+    Args:
+        weights_path (str): Path to the trained .pt weights
+        imgsz (int): Input size the model is exported for
+
+    Returns:
+        str: Path to the .onnx file
+    """
+    onnx_path = os.path.splitext(weights_path)[0] + '.onnx'
+    if os.path.exists(onnx_path) and os.path.getmtime(onnx_path) >= os.path.getmtime(weights_path):
+        return onnx_path
+
+    # Only the export needs PyTorch, inference does not
+    from ultralytics import YOLO
+
+    print(f"Exporting {weights_path} to ONNX...")
+    # Ultralytics writes the export next to the weights it loaded, so export a copy
+    with tempfile.TemporaryDirectory(dir=os.path.dirname(onnx_path) or '.', prefix='.onnx_export_') as temp_dir:
+        temp_weights = os.path.join(temp_dir, os.path.basename(weights_path))
+        shutil.copy2(weights_path, temp_weights)
+        exported_path = YOLO(temp_weights).export(format='onnx', imgsz=imgsz, dynamic=True)
+        os.replace(exported_path, onnx_path)
+    return onnx_path
+
+
+def letterbox(image, new_shape=640, color=(114, 114, 114)):
+    """
+    Resize keeping the aspect ratio and pad to a square, like the YOLO preprocessing
+
+    Returns:
+        tuple: (padded image, scale ratio, (pad_x, pad_y))
+    """
+    height, width = image.shape[:2]
+    ratio = min(new_shape / height, new_shape / width)
+    resized_width, resized_height = int(round(width * ratio)), int(round(height * ratio))
+    pad_x, pad_y = (new_shape - resized_width) / 2, (new_shape - resized_height) / 2
+
+    if (width, height) != (resized_width, resized_height):
+        image = cv2.resize(image, (resized_width, resized_height), interpolation=cv2.INTER_LINEAR)
+    top, bottom = int(round(pad_y - 0.1)), int(round(pad_y + 0.1))
+    left, right = int(round(pad_x - 0.1)), int(round(pad_x + 0.1))
+    image = cv2.copyMakeBorder(image, top, bottom, left, right, cv2.BORDER_CONSTANT, value=color)
+    return image, ratio, (left, top)
+
+
+def non_max_suppression(boxes, scores, iou_threshold=0.7):
+    """
+    Greedy NMS over [x_min, y_min, x_max, y_max] boxes
+
+    Returns:
+        np.ndarray: Indices of the kept boxes, highest score first
+    """
+    x1, y1, x2, y2 = boxes[:, 0], boxes[:, 1], boxes[:, 2], boxes[:, 3]
+    areas = (x2 - x1).clip(0) * (y2 - y1).clip(0)
+    order = scores.argsort()[::-1]
+
+    keep = []
+    while order.size:
+        best = order[0]
+        keep.append(best)
+        rest = order[1:]
+        inter_w = (np.minimum(x2[best], x2[rest]) - np.maximum(x1[best], x1[rest])).clip(0)
+        inter_h = (np.minimum(y2[best], y2[rest]) - np.maximum(y1[best], y1[rest])).clip(0)
+        inter = inter_w * inter_h
+        iou = inter / (areas[best] + areas[rest] - inter + 1e-9)
+        order = rest[iou <= iou_threshold]
+    return np.array(keep, dtype=np.int64)
+
+
+class OnnxDetector:
+    """
+    YOLO detector running on ONNX Runtime instead of PyTorch
+
+    predict() accepts the same sources as YOLO.predict (path, BGR array or a
+    list of them) and returns one Detections container per image, so it can
+    stand in for the ultralytics model in run_detection and run_batch_detection.
+    """
+
+    def __init__(self, onnx_path, imgsz=640, device=None, threads=None):
+        """
+        Args:
+            onnx_path (str): Exported ONNX model
+            imgsz (int): Input size the model was exported for
+            device (str, optional): 'cpu' (default) or a CUDA device index
+            threads (int, optional): Intra-op threads of the session, defaults to one per core
+        """
+        import onnxruntime as ort
+
+        providers = ['CPUExecutionProvider']
+        if device not in (None, 'cpu') and 'CUDAExecutionProvider' in ort.get_available_providers():
+            providers.insert(0, 'CUDAExecutionProvider')
+
+        self.onnx_path = onnx_path
+        self.ckpt_path = onnx_path
+        self.imgsz = imgsz
+        options = ort.SessionOptions()
+        if threads:
+            options.intra_op_num_threads = int(threads)
+        self.session = ort.InferenceSession(onnx_path, sess_options=options, providers=providers)
+        self.input_name = self.session.get_inputs()[0].name
+
+        metadata = self.session.get_modelmeta().custom_metadata_map
+        self.names = ast.literal_eval(metadata['names']) if 'names' in metadata else {}
+        self.end2end = metadata.get('end2end') == 'True'
+        self.speed = {}
+
+    def preprocess(self, images, imgsz=None):
+        """Letterbox, BGR -> RGB, HWC -> CHW and scale to [0, 1]"""
+        batch, transforms = [], []
+        for image in images:
+            padded, ratio, pad = letterbox(image, imgsz or self.imgsz)
+            batch.append(padded[:, :, ::-1].transpose(2, 0, 1))
+            transforms.append((ratio, pad, image.shape[:2]))
+        return np.ascontiguousarray(np.stack(batch), dtype=np.float32) / 255, transforms
+
+    def postprocess(self, prediction, transform, conf=0.01, iou=0.7, max_det=50):
+        """Turn the raw output of one image into Detections in original image coordinates"""
+        ratio, (pad_x, pad_y), (height, width) = transform
+
+        if self.end2end:
+            # (max_det, 6) rows of [x_min, y_min, x_max, y_max, score, class], already suppressed
+            prediction = prediction[prediction[:, 4] > conf][:max_det]
+            boxes, scores, classes = prediction[:, :4], prediction[:, 4], prediction[:, 5].astype(np.int64)
+        else:
+            # (4 + num_classes, anchors) with boxes as center x, center y, width, height
+            prediction = prediction.T
+            class_scores = prediction[:, 4:]
+            classes = class_scores.argmax(1)
+            scores = class_scores[np.arange(len(classes)), classes]
+            keep = scores > conf
+            xywh, scores, classes = prediction[keep, :4], scores[keep], classes[keep]
+            boxes = np.concatenate((xywh[:, :2] - xywh[:, 2:] / 2, xywh[:, :2] + xywh[:, 2:] / 2), axis=1)
+
+            # Offset boxes per class so NMS never suppresses across classes
+            keep = non_max_suppression(boxes + classes[:, None] * 7680, scores, iou)[:max_det]
+            boxes, scores, classes = boxes[keep], scores[keep], classes[keep]
+
+        boxes = (boxes - (pad_x, pad_y, pad_x, pad_y)) / ratio
+        boxes[:, [0, 2]] = boxes[:, [0, 2]].clip(0, width)
+        boxes[:, [1, 3]] = boxes[:, [1, 3]].clip(0, height)
+        return Detections(boxes, scores, classes, self.names)
+
+    def predict(self, source, conf=0.01, iou=0.7, max_det=50, imgsz=None, **kwargs):
+        """
+        Run inference (extra YOLO.predict arguments such as save or verbose are ignored)
+
+        imgsz overrides the export size, the model is exported with dynamic axes.
+
+        Returns:
+            list: One Detections container per image
+        """
+        images = source if isinstance(source, (list, tuple)) else [source]
+        images = [cv2.imread(image) if isinstance(image, str) else image for image in images]
+
+        started = time.perf_counter()
+        batch, transforms = self.preprocess(images, imgsz)
+        preprocessed = time.perf_counter()
+        outputs = self.session.run(None, {self.input_name: batch})[0]
+        inferred = time.perf_counter()
+        detections = [
+            self.postprocess(prediction, transform, conf=conf, iou=iou, max_det=max_det)
+            for prediction, transform in zip(outputs, transforms)
+        ]
+        # Milliseconds per image of the last call, like ultralytics' Results.speed
+        self.speed = {
+            'preprocess': (preprocessed - started) * 1000 / len(images),
+            'inference': (inferred - preprocessed) * 1000 / len(images),
+            'postprocess': (time.perf_counter() - inferred) * 1000 / len(images),
+        }
+        return detections
@@ -0,0 +1,182 @@
+import os
+import csv
+import threading
+
+from utils.evaluation import load_ground_truths
+
+PREDICTIONS_HEADER = ["Image Name", "Predicted Time"]
+
+
+class GroundTruthIndex:
+    """
+    Ground truth times of a Watch,Time CSV, held in a dict
+
+    The file is read with load_ground_truths once and read again only when
+    its modification time changes, so looking up an image is a dict access
+    instead of a file scan.
+    """
+
+    def __init__(self, path):
+        self._lock = threading.Lock()
+        self._times = {}
+        self._mtime = None
+        self.path = path
+
+    @property
+    def path(self):
+        return self._path
+
+    @path.setter
+    def path(self, path):
+        with self._lock:
+            self._path = path
+            self._mtime = None
+
+    def _refresh(self):
+        try:
+            mtime = os.stat(self._path).st_mtime_ns
+        except FileNotFoundError:
+            if self._mtime != 'missing':
+                print(f"Ground truth file {self._path} not found.")
+            self._times, self._mtime = {}, 'missing'
+            return
+        if mtime == self._mtime:
+            return
+
+        self._times = load_ground_truths(self._path)
+        self._mtime = mtime
+
+    def get(self, image_name):
+        """Ground truth hh:mm:ss of an image, or None"""
+        with self._lock:
+            self._refresh()
+            return self._times.get(image_name)
+
+    def __len__(self):
+        with self._lock:
+            self._refresh()
+            return len(self._times)
+
+
+class PredictionStore:
+    """
+    Predictions CSV (Image Name,Predicted Time) indexed in memory, written incrementally
+
+    New or changed predictions are appended to the file instead of rewriting
+    it; when read back the last row of an image wins. The file is compacted
+    (rewritten without superseded rows) once they outnumber the live ones.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._predictions = {}
+        self._stale_rows = 0
+        self._mtime = None
+        self._load()
+
+    def _load(self):
+        self._predictions = {}
+        self._stale_rows = 0
+        self._mtime = None
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, mode='r', newline='') as csvfile:
+            csv_reader = csv.reader(csvfile)
+            next(csv_reader, None)  # Skip header
+            for row in csv_reader:
+                if len(row) == 2:  # Ensure row has the correct format
+                    if row[0] in self._predictions:
+                        self._stale_rows += 1
+                    self._predictions[row[0]] = row[1]
+        self._mtime = os.stat(self.path).st_mtime_ns
+
+    def reload_if_changed(self):
+        """Re-read the file if another process modified it"""
+        with self._lock:
+            mtime = os.stat(self.path).st_mtime_ns if os.path.exists(self.path) else None
+            if mtime != self._mtime:
+                self._load()
+
+    def get(self, image_name, default=None):
+        return self._predictions.get(image_name, default)
+
+    def __contains__(self, image_name):
+        return image_name in self._predictions
+
+    def __len__(self):
+        return len(self._predictions)
+
+    def items(self):
+        return list(self._predictions.items())
+
+    def update(self, predictions):
+        """
+        Record predictions, appending only the rows that are new or changed
+
+        Args:
+            predictions (iterable): (image name, predicted time) pairs
+        """
+        with self._lock:
+            rows = []
+            for image_name, predicted_time in predictions:
+                previous = self._predictions.get(image_name)
+                if previous == predicted_time:
+                    continue
+                if previous is not None:
+                    self._stale_rows += 1
+                self._predictions[image_name] = predicted_time
+                rows.append((image_name, predicted_time))
+            if not rows:
+                return
+
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            new_file = not os.path.exists(self.path)
+            with open(self.path, mode='a', newline='') as csvfile:
+                csv_writer = csv.writer(csvfile)
+                if new_file:
+                    csv_writer.writerow(PREDICTIONS_HEADER)
+                csv_writer.writerows(rows)
+            self._mtime = os.stat(self.path).st_mtime_ns
+
+            if self._stale_rows > len(self._predictions):
+                self._write()
+
+    def add(self, image_name, predicted_time):
+        self.update([(image_name, predicted_time)])
+
+    def clear(self):
+        """Drop every prediction and truncate the file to its header"""
+        with self._lock:
+            self._predictions = {}
+            self._write()
+
+    def compact(self, order=None):
+        """
+        Rewrite the file with one row per image
+
+        Args:
+            order (list, optional): Image names to write first, in this order
+        """
+        with self._lock:
+            if order is not None:
+                ordered = {name: self._predictions[name] for name in order if name in self._predictions}
+                for image_name, predicted_time in self._predictions.items():
+                    ordered.setdefault(image_name, predicted_time)
+                self._predictions = ordered
+            self._write()
+
+    def _write(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, mode='w', newline='') as csvfile:
+            csv_writer = csv.writer(csvfile)
+            csv_writer.writerow(PREDICTIONS_HEADER)
+            csv_writer.writerows(self._predictions.items())
+        os.replace(temp_path, self.path)
+        self._stale_rows = 0
+        self._mtime = os.stat(self.path).st_mtime_ns
@@ -0,0 +1,161 @@
+import os
+import sys
+import json
+import argparse
+
+import cv2
+
+from utils.evaluation import IMAGE_EXTENSIONS, evaluate_model
+from utils.model_registry import get_latest_train_dir
+from utils.onnx_backend import OnnxDetector, export_onnx
+
+
+class ImageCalibrationReader:
+    """Feed letterboxed calibration images to onnxruntime's static quantizer, one at a time"""
+
+    def __init__(self, detector, image_dir, max_images=100):
+        filenames = sorted(f for f in os.listdir(image_dir) if f.lower().endswith(IMAGE_EXTENSIONS))
+        self.image_paths = [os.path.join(image_dir, f) for f in filenames[:max_images]]
+        self.detector = detector
+        self._position = 0
+
+    def get_next(self):
+        while self._position < len(self.image_paths):
+            image = cv2.imread(self.image_paths[self._position])
+            self._position += 1
+            if image is not None:
+                batch, _ = self.detector.preprocess([image])
+                return {self.detector.input_name: batch}
+        return None
+
+    def rewind(self):
+        self._position = 0
+
+
+def quantize_onnx(onnx_path, output_path, mode='static', calibration_dir='dataset/images/val', calibration_images=100):
+    """
+    Quantize an exported ONNX model to INT8
+
+    Args:
+        onnx_path (str): FP32 ONNX model
+        output_path (str): Quantized model to write
+        mode (str): 'static' (activations calibrated on real images) or 'dynamic' (weights only)
+        calibration_dir (str): Images used to calibrate the activation ranges in static mode
+        calibration_images (int): Maximum number of calibration images
+
+    Returns:
+        str: output_path
+    """
+    from onnxruntime.quantization import (
+        CalibrationMethod, QuantFormat, QuantType, quantize_dynamic, quantize_static,
+    )
+
+    if mode == 'dynamic':
+        quantize_dynamic(onnx_path, output_path, weight_type=QuantType.QInt8)
+        return output_path
+
+    reader = ImageCalibrationReader(OnnxDetector(onnx_path), calibration_dir, calibration_images)
+    if not reader.image_paths:
+        raise FileNotFoundError(f"No calibration images found in {calibration_dir}")
+    print(f"Calibrating on {len(reader.image_paths)} images from {calibration_dir}...")
+    quantize_static(
+        onnx_path,
+        output_path,
+        reader,
+        quant_format=QuantFormat.QDQ,
+        activation_type=QuantType.QUInt8,
+        weight_type=QuantType.QInt8,
+        per_channel=True,
+        calibrate_method=CalibrationMethod.MinMax,
+    )
+    return output_path
+
+
+def print_report(name, report):
+    mean_deviation = report['mean_deviation']
+    print(
+        f"{name}: {report['images']} images, {report['failed']} failed, "
+        f"mean deviation {'n/a' if mean_deviation is None else f'{mean_deviation:.1f}s'}, "
+        f"latency {report['mean_latency_ms'] or 0:.1f} ms/image"
+    )
+
+
+def accuracy_regressions(baseline, candidate, max_deviation_increase=60.0, max_failure_increase=0.02):
+    """
+    Reasons why the candidate model is worse than the baseline, empty if it passes the gate
+
+    Args:
+        baseline (dict): evaluate_model report of the unquantized model
+        candidate (dict): evaluate_model report of the quantized model
+        max_deviation_increase (float): Allowed increase of the mean time deviation, in seconds
+        max_failure_increase (float): Allowed increase of the failure rate (fraction of images)
+    """
+    reasons = []
+    if candidate['mean_deviation'] is None and baseline['mean_deviation'] is not None:
+        reasons.append("quantized model did not read any clock")
+    elif baseline['mean_deviation'] is not None and candidate['mean_deviation'] > baseline['mean_deviation'] + max_deviation_increase:
+        reasons.append(
+            f"mean deviation {candidate['mean_deviation']:.1f}s vs {baseline['mean_deviation']:.1f}s "
+            f"(allowed +{max_deviation_increase:.0f}s)"
+        )
+    if candidate['failure_rate'] > baseline['failure_rate'] + max_failure_increase:
+        reasons.append(
+            f"failure rate {candidate['failure_rate']:.1%} vs {baseline['failure_rate']:.1%} "
+            f"(allowed +{max_failure_increase:.1%})"
+        )
+    return reasons
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Quantize the trained model to INT8 and publish it only if the clock readout stays correct")
+    parser.add_argument("--weights", help="Trained .pt weights, defaults to the latest train run")
+    parser.add_argument("--mode", choices=('static', 'dynamic'), default='static')
+    parser.add_argument("--calibration-dir", default='dataset/images/val')
+    parser.add_argument("--calibration-images", type=int, default=100)
+    parser.add_argument("--test-dir", default='test_set')
+    parser.add_argument("--ground-truths", default='ground_truths/ground_truths_test.csv')
+    parser.add_argument("--confidence", type=float, default=0.01)
+    parser.add_argument("--max-deviation-increase", type=float, default=60.0, help="Seconds the mean deviation may grow by")
+    parser.add_argument("--max-failure-increase", type=float, default=0.02, help="Fraction the failure rate may grow by")
+    args = parser.parse_args()
+
+    weights_path = args.weights or os.path.join(get_latest_train_dir(), "weights", "best.pt")
+    onnx_path = export_onnx(weights_path)
+    output_path = os.path.splitext(weights_path)[0] + '.int8.onnx'
+    candidate_path = os.path.splitext(weights_path)[0] + '.int8.candidate.onnx'
+
+    quantize_onnx(onnx_path, candidate_path, args.mode, args.calibration_dir, args.calibration_images)
+
+    baseline = evaluate_model(OnnxDetector(onnx_path), args.test_dir, args.ground_truths, args.confidence)
+    candidate = evaluate_model(OnnxDetector(candidate_path), args.test_dir, args.ground_truths, args.confidence)
+    print_report("FP32", baseline)
+    print_report("INT8", candidate)
+
+    reasons = accuracy_regressions(baseline, candidate, args.max_deviation_increase, args.max_failure_increase)
+    report_path = os.path.splitext(weights_path)[0] + '.int8.report.json'
+    with open(report_path, 'w') as f:
+        json.dump({
+            'weights': weights_path,
+            'mode': args.mode,
+            'published': not reasons,
+            'regressions': reasons,
+            'fp32': {k: v for k, v in baseline.items() if k != 'predictions'},
+            'int8': {k: v for k, v in candidate.items() if k != 'predictions'},
+            'fp32_size_mb': os.path.getsize(onnx_path) / 2**20,
+            'int8_size_mb': os.path.getsize(candidate_path) / 2**20,
+        }, f, indent=2)
+
+    if reasons:
+        os.remove(candidate_path)
+        print("Quantized model NOT published: " + "; ".join(reasons))
+        print(f"Report saved to: {report_path}")
+        sys.exit(1)
+
+    os.replace(candidate_path, output_path)
+    print(f"Quantized model published to: {output_path}")
+    print(f"Report saved to: {report_path}")
+    print(f"Serve it with MODEL_PATH={output_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+import time
+import queue
+import threading
+from collections import deque
+
+import cv2
+
+
+class LatestQueue:
+    """
+    Bounded thread-safe queue that drops the oldest item when full
+
+    Producers never block, so a slow consumer always sees the newest items
+    instead of a growing backlog. dropped counts the items thrown away.
+    """
+
+    def __init__(self, maxsize=1):
+        self._items = deque(maxlen=max(1, int(maxsize)))
+        self._not_empty = threading.Condition()
+        self.dropped = 0
+
+    def put(self, item):
+        with self._not_empty:
+            if len(self._items) == self._items.maxlen:
+                self.dropped += 1
+            self._items.append(item)
+            self._not_empty.notify()
+
+    def get(self, timeout=None):
+        """Oldest queued item, or None if nothing arrived within timeout"""
+        with self._not_empty:
+            if not self._not_empty.wait_for(lambda: self._items, timeout=timeout):
+                return None
+            return self._items.popleft()
+
+    def __len__(self):
+        with self._not_empty:
+            return len(self._items)
+
+
+class FrameGrabber(threading.Thread):
+    """
+    Read frames from a cv2.VideoCapture source as fast as it delivers them
+
+    Every frame is pushed as (frame_index, capture_time, frame) into a
+    LatestQueue, so consumers pick up the newest frame instead of whatever
+    is stale in the driver buffer.
+    """
+
+    def __init__(self, source, frames, stop_event=None):
+        """
+        Args:
+            source (int or str): Camera index, video file or stream URL
+            frames (LatestQueue): Queue receiving the frames
+            stop_event (threading.Event, optional): Set to stop grabbing
+        """
+        super().__init__(daemon=True, name="frame-grabber")
+        self.source = source
+        self.frames = frames
+        self.stop_event = stop_event or threading.Event()
+        self.capture = cv2.VideoCapture(source)
+        # Keep the driver from buffering frames we would only skip later
+        self.capture.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+        self.frame_count = 0
+
+    def is_opened(self):
+        return self.capture.isOpened()
+
+    def run(self):
+        try:
+            while not self.stop_event.is_set():
+                ret, frame = self.capture.read()
+                if not ret:
+                    print("Could not read a frame from the source. Stopping capture...")
+                    break
+                self.frames.put((self.frame_count, time.perf_counter(), frame))
+                self.frame_count += 1
+        finally:
+            self.capture.release()
+            self.stop_event.set()
+
+    def stop(self):
+        self.stop_event.set()
+
+
+class VideoReader(threading.Thread):
+    """
+    Decode a video file or stream in the background, keeping every stride-th frame
+
+    Skipped frames are only grabbed, never decoded into images. Kept frames are
+    pushed as (frame_index, timestamp_seconds, frame) into a bounded queue.Queue,
+    so decoding never runs more than a few frames ahead of inference and long
+    videos are never held in memory. None marks the end of the video.
+    """
+
+    def __init__(self, source, frames, stride=1, max_frames=None, stop_event=None):
+        """
+        Args:
+            source (int or str): Video file, stream URL or camera index
+            frames (queue.Queue): Bounded queue receiving the kept frames
+            stride (int): Keep one frame out of every stride frames
+            max_frames (int, optional): Stop after reading this many source frames
+            stop_event (threading.Event, optional): Set to stop reading early
+        """
+        super().__init__(daemon=True, name="video-reader")
+        self.source = source
+        self.frames = frames
+        self.stride = max(1, int(stride))
+        self.max_frames = max_frames
+        self.stop_event = stop_event or threading.Event()
+        self.capture = cv2.VideoCapture(source)
+        self.fps = self.capture.get(cv2.CAP_PROP_FPS) or 0.0
+        self.frame_count = 0
+
+    def is_opened(self):
+        return self.capture.isOpened()
+
+    def _put(self, item):
+        # Wait for the consumer, but keep checking whether we were asked to stop
+        while not self.stop_event.is_set():
+            try:
+                self.frames.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def run(self):
+        started = time.perf_counter()
+        try:
+            while not self.stop_event.is_set():
+                if self.max_frames is not None and self.frame_count >= self.max_frames:
+                    break
+
+                if self.frame_count % self.stride:
+                    if not self.capture.grab():
+                        break
+                    self.frame_count += 1
+                    continue
+
+                ret, frame = self.capture.read()
+                if not ret:
+                    break
+                # Files report their frame rate, live streams fall back to wall-clock time
+                timestamp = self.frame_count / self.fps if self.fps > 0 else time.perf_counter() - started
+                if not self._put((self.frame_count, timestamp, frame)):
+                    break
+                self.frame_count += 1
+        finally:
+            self.capture.release()
+            self._put(None)
+
+    def stop(self):
+        self.stop_event.set()
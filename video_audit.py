@@ -0,0 +1,132 @@
+import os
+import csv
+import time
+import queue
+import argparse
+
+from utils.clock_geometry import clock_times_from_detections
+from utils.clock_utils import format_clock_reading
+from utils.detections_utils import average_confidence, run_batch_detection
+from utils.model_registry import get_model
+from utils.stream_utils import VideoReader
+
+
+def audit_video(source, output_path, stride=1, sample_fps=None, batch_size=8, confidence=0.01,
+                model_path=None, device=None, max_frames=None):
+    """
+    Read the clock over a whole video and write one CSV row per sampled frame
+
+    Frames are decoded in a background thread and sent to the model in
+    batches; rows are written as soon as each batch is done, so memory use
+    does not grow with the length of the video.
+
+    Args:
+        source (str or int): Video file, stream URL or camera index
+        output_path (str): CSV file to write
+        stride (int): Keep one frame out of every stride frames
+        sample_fps (float, optional): Target sampling rate, overrides stride when the source reports its fps
+        batch_size (int): Frames per forward pass
+        confidence (float): Confidence threshold
+        model_path (str, optional): Path to the YOLO model weights
+        device (str, optional): Inference device
+        max_frames (int, optional): Stop after this many source frames
+
+    Returns:
+        int: Number of frames written
+    """
+    model = get_model(model_path, device=device)
+
+    frames = queue.Queue(maxsize=batch_size * 2)
+    reader = VideoReader(source, frames, stride=stride, max_frames=max_frames)
+    if not reader.is_opened():
+        raise RuntimeError(f"Could not open video source {source}")
+    if sample_fps and reader.fps > 0:
+        reader.stride = max(1, round(reader.fps / sample_fps))
+
+    output_dir = os.path.dirname(output_path)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+
+    written = 0
+    started = time.perf_counter()
+    reader.start()
+    try:
+        with open(output_path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['frame_index', 'timestamp', 'time', 'confidence'])
+
+            finished = False
+            while not finished:
+                batch = []
+                while len(batch) < batch_size:
+                    item = frames.get()
+                    if item is None:
+                        finished = True
+                        break
+                    batch.append(item)
+                if not batch:
+                    break
+
+                # Every frame is new, hashing them for the inference cache would be wasted work
+                detections = run_batch_detection(
+                    [frame for _, _, frame in batch],
+                    confidence=confidence,
+                    model=model,
+                    batch_size=batch_size,
+                    device=device,
+                    cache=False,
+                )
+                predictions = clock_times_from_detections(detections)
+
+                for (frame_index, timestamp, _), frame_detections, prediction in zip(batch, detections, predictions):
+                    writer.writerow([
+                        frame_index,
+                        f"{timestamp:.3f}",
+                        format_clock_reading(prediction) or "",
+                        f"{average_confidence(frame_detections):.4f}" if prediction else "",
+                    ])
+                written += len(batch)
+                f.flush()
+                print(f"Processed {written} frames ({written / (time.perf_counter() - started):.1f} frames/s)", end='\r')
+    finally:
+        reader.stop()
+        reader.join(timeout=2)
+
+    print(f"\nTime series saved to: {output_path}")
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Read the clock time over a video file or stream")
+    parser.add_argument("source", help="Video file, stream URL or camera index")
+    parser.add_argument("--output", help="CSV file, defaults to results/video_audit/<video name>_times.csv")
+    parser.add_argument("--stride", type=int, default=1, help="Keep one frame out of every N")
+    parser.add_argument("--fps", type=float, default=None, help="Target sampling rate, overrides --stride")
+    parser.add_argument("--batch-size", type=int, default=8)
+    parser.add_argument("--confidence", type=float, default=0.01)
+    parser.add_argument("--model", default=os.environ.get("MODEL_PATH"), help="YOLO weights, defaults to the latest train run")
+    parser.add_argument("--device", default=None)
+    parser.add_argument("--max-frames", type=int, default=None)
+    args = parser.parse_args()
+
+    source = int(args.source) if args.source.isdigit() else args.source
+    output_path = args.output
+    if not output_path:
+        video_name = os.path.splitext(os.path.basename(str(args.source).rstrip('/')))[0] or "stream"
+        output_path = os.path.join('results/video_audit', f'{video_name}_times.csv')
+
+    audit_video(
+        source,
+        output_path,
+        stride=args.stride,
+        sample_fps=args.fps,
+        batch_size=max(1, args.batch_size),
+        confidence=args.confidence,
+        model_path=args.model,
+        device=args.device,
+        max_frames=args.max_frames,
+    )
+
+
+if __name__ == "__main__":
+    main()